@@ -0,0 +1,43 @@
+"""
+Checkpointer - where graph state lives between turns.
+
+By default checkpoints are kept in memory, which ties every thread to the
+process that ran it. Set ROOMIE_STATE_DB to a SQLite file and they are stored
+there instead (WAL mode), so any API process on the machine can resume any
+thread — the prerequisite for running uvicorn with several workers.
+"""
+
+import logging
+import os
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def state_db_path() -> Path | None:
+    path = os.getenv("ROOMIE_STATE_DB", "")
+    return Path(path).expanduser() if path else None
+
+
+async def create_checkpointer():
+    """A SQLite-backed saver when ROOMIE_STATE_DB is set, else an in-memory one."""
+    path = state_db_path()
+    if path is None:
+        from langgraph.checkpoint.memory import MemorySaver
+
+        return MemorySaver()
+
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = await aiosqlite.connect(str(path))
+    # WAL lets several processes read while one writes
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    saver = AsyncSqliteSaver(conn)
+    await saver.setup()
+    log.info(f"[CHECKPOINT] Using SQLite checkpoints at {path}")
+    return saver
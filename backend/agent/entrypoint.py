@@ -1,36 +1,33 @@
 """Entrypoint for langgraph dev server — exposes orchestrator + both worker graphs."""
 
-import os
 from dotenv import load_dotenv
 from pathlib import Path
-from langchain_openai import ChatOpenAI
-from backend.agent.graph import create_agent
-from backend.agent.worker import build_worker_a, build_worker_b
-from backend.browser.mcp_client import get_playwright_tools_a, get_playwright_tools_b
 
 load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
 
+from backend.agent.graph import create_agent
+from backend.agent.models import worker_model
+from backend.agent.worker import build_worker
+from backend.browser.pool import get_browser_pool
+
 
 async def make_graph():
     """Async factory — returns the orchestrator graph (main entry point)."""
     return await create_agent()
 
 
+async def _make_worker(slot_name: str):
+    """A search worker on the shared pool's browser, with the same model the orchestrator graph uses."""
+    pool = await get_browser_pool()
+    slot = next(s for s in pool.slots if s.name == slot_name)
+    return build_worker(f"Worker {slot.name}", slot.tools, worker_model(slot))
+
+
 async def make_worker_a():
     """Async factory — Worker A graph for Studio visibility (port 3001)."""
-    browser_tools = await get_playwright_tools_a()
-    worker_model = ChatOpenAI(
-        model="gpt-5",
-        api_key=os.getenv("OPENAI_APIKEY"),
-    ).bind_tools(browser_tools)
-    return build_worker_a(browser_tools, worker_model)
+    return await _make_worker("A")
 
 
 async def make_worker_b():
     """Async factory — Worker B graph for Studio visibility (port 3002)."""
-    browser_tools = await get_playwright_tools_b()
-    worker_model = ChatOpenAI(
-        model="gpt-5",
-        api_key=os.getenv("OPENAI_APIKEY"),
-    ).bind_tools(browser_tools)
-    return build_worker_b(browser_tools, worker_model)
+    return await _make_worker("B")
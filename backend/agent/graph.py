@@ -1,119 +1,132 @@
-"""Orchestrator Agent Graph — dispatches tasks to Worker A and Worker B in parallel."""
+"""Orchestrator Agent Graph — dispatches tasks to workers running in parallel on the browser pool."""
 
 import asyncio
-import json
+import logging
 import os
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode
-from langgraph.types import interrupt
-from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage
-from backend.agent.state import AgentState, WorkerResult, MessagingTask, MessagingResult
+from langgraph.types import Send, interrupt
+from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+from backend.agent.checkpoint import create_checkpointer
+from backend.agent.state import AgentState, WorkerResult, WorkerSend, MessagingTask, MessagingResult
 from backend.agent.prompts import ORCHESTRATOR_PROMPT
 from backend.agent.tools import ORCHESTRATOR_TOOLS
-from backend.agent.worker import build_worker_a, build_worker_b, build_messaging_worker, parse_worker_results, parse_messaging_results
-from backend.browser.mcp_client import get_playwright_tools_a, get_playwright_tools_b
+from backend.agent.worker import build_worker, build_messaging_worker, parse_worker_results, parse_messaging_results
+from backend.browser.pool import Priority, get_browser_pool
+from backend.browser import prefetch, snapshot_cache
+from backend.agent import speculative
+from backend.agent.ranking import listing_key, rank_picks, rank_worker_results
+from backend.search import cache as search_cache
+from backend import startup, tracing
+from backend.agent import models
+
+log = logging.getLogger(__name__)
 
 load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
 
+MESSAGING_TIMEOUT = 120  # seconds per messaging group (one navigation)
+SPECULATIVE_WAIT = 90  # seconds a dispatch waits on a running speculative search
 
-async def create_agent():
-    # Each worker gets its own Playwright MCP server for true parallel browsing
-    browser_tools_a = await get_playwright_tools_a()  # port 3001
-    browser_tools_b = await get_playwright_tools_b()  # port 3002
-
-    orchestrator_model = ChatOpenAI(
-        model="gpt-5",
-        api_key=os.getenv("OPENAI_APIKEY"),
-    ).bind_tools(ORCHESTRATOR_TOOLS)
-
-    worker_model_a = ChatOpenAI(
-        model="gpt-5",
-        api_key=os.getenv("OPENAI_APIKEY"),
-    ).bind_tools(browser_tools_a)
-
-    worker_model_b = ChatOpenAI(
-        model="gpt-5",
-        api_key=os.getenv("OPENAI_APIKEY"),
-    ).bind_tools(browser_tools_b)
-
-    worker_a_subgraph = build_worker_a(browser_tools_a, worker_model_a)
-    worker_b_subgraph = build_worker_b(browser_tools_b, worker_model_b)
-    messaging_worker_a = build_messaging_worker(browser_tools_a, worker_model_a)
-    messaging_worker_b = build_messaging_worker(browser_tools_b, worker_model_b)
-    orchestrator_tool_node = ToolNode(ORCHESTRATOR_TOOLS, handle_tool_errors=True)
 
-    # ---- System prompt with optional FB credentials ----
-    fb_email = os.getenv("FB_EMAIL", "")
-    fb_password = os.getenv("FB_PASSWORD", "")
-    credentials_block = ""
-    if fb_email and fb_password:
-        credentials_block = f"""
+def _group_messaging_tasks(tasks: list[MessagingTask]) -> list[list[int]]:
+    """Group task indices that share a listing URL.
 
-## Facebook Credentials (from env)
-- Email: {fb_email}
-- Password: {fb_password}
+    Each group is sent in one messaging run, so a single navigation to the
+    listing serves them all. Listings are never grouped by seller name: names
+    aren't unique, and each listing has its own Messenger thread anyway.
+    """
+    groups: dict[str, list[int]] = {}
+    for i, task in enumerate(tasks):
+        url = task["product_url"]
+        groups.setdefault(listing_key(url) if url else f"#{i}", []).append(i)
+    return list(groups.values())
+
+
+async def create_agent():
+    # Each pool slot is its own Playwright MCP server for true parallel browsing
+    with startup.phase("browser_pool"):
+        pool = await get_browser_pool()
+
+    # All models share one client; bind_tools only wraps it
+    orchestrator_model = models.orchestrator_model(ORCHESTRATOR_TOOLS)
+
+    # One search worker + one messaging worker per browser, keyed by slot name
+    search_workers = {}
+    messaging_workers = {}
+    for slot in pool.slots:
+        worker_model = models.worker_model(slot)
+        search_workers[slot.name] = build_worker(f"Worker {slot.name}", slot.tools, worker_model)
+        messaging_workers[slot.name] = build_messaging_worker(slot.tools, worker_model)
+
+    messaging_concurrency = max(1, int(os.getenv("MESSAGING_CONCURRENCY", str(pool.size))))
+    messaging_slots = asyncio.Semaphore(messaging_concurrency)
+    orchestrator_tool_node = ToolNode(ORCHESTRATOR_TOOLS, handle_tool_errors=True)
 
-Workers will handle Facebook login if needed using these credentials.
-"""
-    full_prompt = ORCHESTRATOR_PROMPT + credentials_block
+    # Facebook login is handled by the browser layer (backend/browser/session.py),
+    # so credentials never go into any prompt.
+    full_prompt = ORCHESTRATOR_PROMPT
 
     # ---- Nodes ----
 
-    def orchestrator(state: AgentState):
+    async def orchestrator(state: AgentState, config: RunnableConfig):
         messages = state["messages"]
         if not messages or not isinstance(messages[0], SystemMessage):
             messages = [SystemMessage(content=full_prompt)] + messages
-        # Debug: log what messages the orchestrator sees
-        print(f"[ORCHESTRATOR] Invoking with {len(messages)} messages. Last 3 types: {[type(m).__name__ for m in messages[-3:]]}")
-        for m in messages[-3:]:
-            content_preview = str(m.content)[:200] if m.content else "(empty)"
-            print(f"  [{type(m).__name__}] {content_preview}")
-        response = orchestrator_model.invoke(messages)
-        print(f"[ORCHESTRATOR] Response: {str(response.content)[:200]}")
-        return {"messages": [response]}
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"[ORCHESTRATOR] Invoking with {len(messages)} messages. Last 3 types: {[type(m).__name__ for m in messages[-3:]]}")
+            for m in messages[-3:]:
+                content_preview = str(m.content)[:200] if m.content else "(empty)"
+                log.debug(f"  [{type(m).__name__}] {content_preview}")
+        start = time.perf_counter()
+        response = await orchestrator_model.ainvoke(messages)
+        tracing.record_model_call("orchestrator", response, time.perf_counter() - start)
+        log.debug(f"[ORCHESTRATOR] Response: {str(response.content)[:200]}")
+
+        update = {"messages": [response]}
+        text = response.content if isinstance(response.content, str) else str(response.content)
+        if state.get("room_analysis") is None and "[COLOR_PALETTE:" in text:
+            # This turn is the room analysis — note the furniture it recommends
+            furniture_types = speculative.extract_furniture_types(text)
+            update["room_analysis"] = {"furniture_types": furniture_types}
+            if furniture_types and speculative.enabled():
+                speculative.start(config["configurable"]["thread_id"], furniture_types, _speculative_search)
+        return update
 
     def process_dispatch(state: AgentState):
-        """Split tasks between Worker A and Worker B."""
-        tasks = []
-        for msg in reversed(state["messages"]):
-            if isinstance(msg, ToolMessage):
-                try:
-                    result = json.loads(msg.content)
-                    if result.get("status") == "dispatched":
-                        tasks = result.get("tasks", [])
-                except (json.JSONDecodeError, TypeError):
-                    pass
-                break
-
-        # Split by item type: group tasks by item_type, then assign
-        # each item type group to a different worker.
-        # e.g. Worker A searches for "bed" on all marketplaces,
-        #      Worker B searches for "sidetable" on all marketplaces.
-        from collections import OrderedDict
-        groups = OrderedDict()
-        for t in tasks:
-            groups.setdefault(t["item_type"], []).append(t)
-
-        item_types = list(groups.keys())
-        mid = (len(item_types) + 1) // 2
-        tasks_a = [t for it in item_types[:mid] for t in groups[it]]
-        tasks_b = [t for it in item_types[mid:] for t in groups[it]]
-
+        """Move the dispatched tasks into search_tasks; fan_out_workers splits them."""
         return {
-            "search_tasks": tasks,  # keep full list for reference
+            "search_tasks": state.get("dispatch") or [],
+            "dispatch": None,
             "current_task_index": 0,
-            "worker_results": [],
-            # Store splits in the tasks themselves via tagging
-            "_tasks_a": tasks_a,
-            "_tasks_b": tasks_b,
         }
 
+    def fan_out_workers(state: AgentState):
+        """One run_worker task per browser, each given whole item types.
+
+        Tasks are grouped by item_type and the groups split into at most
+        pool.size contiguous runs, e.g. one browser searches for "bed", another
+        for "sidetable". Each run appends its results as soon as it finishes.
+        """
+        groups: dict[str, list] = {}
+        for t in state.get("search_tasks", []):
+            groups.setdefault(t["item_type"], []).append(t)
+        if not groups:
+            return "merge_results"
+
+        item_types = list(groups)
+        runs = min(pool.size, len(item_types))
+        per_run = -(-len(item_types) // runs)  # ceil
+        return [
+            Send("run_worker", WorkerSend(tasks=[t for it in item_types[i:i + per_run] for t in groups[it]]))
+            for i in range(0, len(item_types), per_run)
+        ]
+
     async def _run_single_worker(subgraph, tasks, worker_name):
-        """Run one worker subgraph and parse its results."""
+        """Run one worker subgraph and parse its results (ranked and trimmed in merge_results)."""
         if not tasks:
             return []
 
@@ -128,15 +141,6 @@ Workers will handle Facebook login if needed using these credentials.
             )
         task_list_str = "\n".join(task_details)
 
-        # Include FB credentials if available so workers can log in if needed
-        creds_info = ""
-        if fb_email and fb_password:
-            creds_info = (
-                f"\n\nFacebook Login Credentials (use ONLY if you see a login page):\n"
-                f"- Email: {fb_email}\n"
-                f"- Password: {fb_password}\n"
-            )
-
         try:
             worker_state = await asyncio.wait_for(
                 subgraph.ainvoke(
@@ -145,7 +149,6 @@ Workers will handle Facebook login if needed using these credentials.
                             f"You are {worker_name}. Search for ONLY these specific items:\n"
                             f"{task_list_str}\n\n"
                             f"Navigate DIRECTLY to the search URL for each item. Do NOT go to the marketplace homepage. Go fast."
-                            f"{creds_info}"
                         ))],
                         "tasks": tasks,
                         "step_count": 0,
@@ -166,37 +169,67 @@ Workers will handle Facebook login if needed using these credentials.
                 ))
             return results
 
+        tracing.record_worker_steps(worker_name, worker_state.get("step_count", 0))
         picks = parse_worker_results(worker_state["messages"])
         results = []
         for task in tasks:
-            task_picks = [p for p in picks if p.get("source", "") == task["marketplace"]]
+            task_picks = [p for p in picks if p.source == task["marketplace"]]
             if not task_picks:
                 task_picks = picks  # fallback: assign all picks
             results.append(WorkerResult(
                 task_id=task["id"],
                 item_type=task["item_type"],
-                picks=task_picks[:3],
+                picks=task_picks,
                 reasoning=f"{worker_name} found {len(task_picks)} picks for {task['item_type']} on {task['marketplace']}",
             ))
         return results
 
-    async def run_workers(state: AgentState):
-        """Run Worker A and Worker B in parallel using asyncio.gather."""
-        tasks_a = state.get("_tasks_a", [])
-        tasks_b = state.get("_tasks_b", [])
+    async def _run_worker_on_pool(tasks):
+        """Lease a browser from the pool and run that slot's search worker."""
+        if not tasks:
+            return []
+        async with pool.lease() as slot:
+            return await _run_single_worker(search_workers[slot.name], tasks, f"Worker {slot.name}")
+
+    async def _speculative_search(task):
+        """Background search for one category; returns its raw picks for the cache."""
+        async with pool.lease(priority=Priority.BACKGROUND) as slot:
+            results = await _run_single_worker(search_workers[slot.name], [task], f"Worker {slot.name}")
+        return results[0]["picks"] if results else []
+
+    async def _from_cache(tasks, thread_id):
+        """Split tasks into (results served from the thread's search cache, tasks still to search)."""
+        cached = await asyncio.gather(*(
+            search_cache.get(thread_id, t["item_type"], wait=SPECULATIVE_WAIT) for t in tasks
+        ))
+        results, remaining = [], []
+        for task, picks in zip(tasks, cached):
+            ranked = rank_picks(picks, task) if picks else []
+            if not ranked:
+                remaining.append(task)
+                continue
+            results.append(WorkerResult(
+                task_id=task["id"],
+                item_type=task["item_type"],
+                picks=ranked,
+                reasoning=f"re-ranked {len(ranked)} of {len(picks)} pre-searched picks for {task['item_type']}",
+            ))
+        return results, remaining
 
-        # Launch both workers concurrently — each opens its own browser tab
-        results_a, results_b = await asyncio.gather(
-            _run_single_worker(worker_a_subgraph, tasks_a, "Worker A"),
-            _run_single_worker(worker_b_subgraph, tasks_b, "Worker B"),
-        )
+    async def run_worker(send: WorkerSend, config: RunnableConfig):
+        """Search one split of the tasks on a leased browser.
 
-        all_results = results_a + results_b
-        return {"worker_results": all_results}
+        Tasks whose category was already searched speculatively for this
+        thread are served from the search cache instead.
+        """
+        cached, remaining = await _from_cache(send["tasks"], config["configurable"]["thread_id"])
+        if cached:
+            log.info(f"[RUN_WORKER] {len(cached)} tasks served from the search cache")
+        return {"worker_results": cached + await _run_worker_on_pool(remaining)}
 
     def merge_results(state: AgentState):
-        """Combine all worker results into a summary for the orchestrator."""
-        results = state.get("worker_results", [])
+        """Rank and de-duplicate worker results, then summarise them for the orchestrator."""
+        results = rank_worker_results(state.get("worker_results", []), state.get("search_tasks", []))
         if not results:
             summary = "No worker results were found. The searches may have failed."
         else:
@@ -204,11 +237,12 @@ Workers will handle Facebook login if needed using these credentials.
             for wr in results:
                 lines.append(f"### {wr['item_type']} ({wr['reasoning']})")
                 for i, pick in enumerate(wr.get("picks", []), 1):
+                    price = f"${pick.price:.0f}" if pick.price is not None else "$N/A"
                     lines.append(
-                        f"  {i}. **{pick.get('title', 'Unknown')}** — ${pick.get('price', 'N/A')} on {pick.get('source', '?')}\n"
-                        f"     Condition: {pick.get('condition', '')} | Location: {pick.get('location', '')}\n"
-                        f"     Reason: {pick.get('reason', '')}\n"
-                        f"     URL: {pick.get('url', '')}"
+                        f"  {i}. **{pick.title or 'Unknown'}** — {price} on {pick.source or '?'}\n"
+                        f"     Condition: {pick.condition} | Location: {pick.location}\n"
+                        f"     Reason: {pick.reason}\n"
+                        f"     URL: {pick.url}"
                     )
                 lines.append("")
             summary = "\n".join(lines)
@@ -216,37 +250,35 @@ Workers will handle Facebook login if needed using these credentials.
 
         return {
             "messages": [HumanMessage(content=summary)],
-            "search_tasks": [],
+            "worker_results": None,
+            "search_tasks": None,
             "current_task_index": 0,
         }
 
-    def human_approval(state: AgentState):
-        """Interrupt the graph and wait for user approval."""
-        print(f"[HUMAN_APPROVAL] Entered human_approval node")
-        proposal_data = None
-        for msg in reversed(state["messages"]):
-            if isinstance(msg, ToolMessage):
-                content_preview = str(msg.content)[:200]
-                print(f"[HUMAN_APPROVAL] Found ToolMessage: {content_preview}")
-                try:
-                    result = json.loads(msg.content)
-                    print(f"[HUMAN_APPROVAL] Parsed status={result.get('status')}")
-                    if result.get("status") == "pending_approval":
-                        proposal_data = result
-                except (json.JSONDecodeError, TypeError) as e:
-                    print(f"[HUMAN_APPROVAL] JSON parse error: {e}")
-                    pass
-                break
+    async def human_approval(state: AgentState, config: RunnableConfig):
+        """Interrupt the graph and wait for user approval.
 
+        Before pausing, the proposed listings are prefetched in background tabs
+        so messaging can start from a warm page once the user approves.
+        """
+        log.debug("[HUMAN_APPROVAL] Entered human_approval node")
+        proposal_data = state.get("pending_proposal")
         if not proposal_data:
-            print(f"[HUMAN_APPROVAL] No proposal_data found — returning early WITHOUT interrupt")
-            return {"pending_proposal": None, "approved_items": []}
+            log.debug("[HUMAN_APPROVAL] No pending proposal — returning early WITHOUT interrupt")
+            return {"pending_proposal": None, "dispatch": None, "approved_items": []}
 
-        print(f"[HUMAN_APPROVAL] Calling interrupt() with {len(proposal_data.get('items', []))} items")
+        thread_id = config["configurable"]["thread_id"]
+        if proposal_data.get("type") == "contact_sellers":
+            # Re-running on resume is a no-op — prefetch is keyed by thread
+            prefetch.start_prefetch(thread_id, pool, [
+                item.url for item in proposal_data.get("items", []) if item.draft_message
+            ])
+
+        log.debug(f"[HUMAN_APPROVAL] Calling interrupt() with {len(proposal_data.get('items', []))} items")
         user_decision = interrupt({
             "type": proposal_data.get("type", "shortlist"),
             "items": proposal_data.get("items", []),
-            "item_count": proposal_data.get("item_count", 0),
+            "item_count": len(proposal_data.get("items", [])),
             "message": "Please review the proposed items.",
         })
 
@@ -255,58 +287,52 @@ Workers will handle Facebook login if needed using these credentials.
         all_items = proposal_data.get("items", [])
 
         if action == "approve_all":
-            approved_ids = [item["id"] for item in all_items]
+            approved_ids = [item.id for item in all_items]
             approved_items = all_items
             approval_msg = "User approved all proposed items."
         elif action == "approve_selected":
             approved_ids = user_decision.get("selected_ids", [])
-            approved_items = [item for item in all_items if item["id"] in approved_ids]
-            selected_titles = [item["title"] for item in approved_items]
+            approved_items = [item for item in all_items if item.id in approved_ids]
+            selected_titles = [item.title for item in approved_items]
             approval_msg = f"User approved these items: {', '.join(selected_titles)}"
         else:
             approved_ids = []
             approved_items = []
             approval_msg = "User rejected the proposal."
 
+        prefetch.discard_rejected(thread_id, pool, {item.url for item in approved_items})
+
         # If approved items have draft_message fields, build messaging tasks directly
         # so we can route straight to the messaging worker without another orchestrator round-trip
         messaging_tasks = []
         for item in approved_items:
-            if item.get("draft_message") and item.get("url"):
+            if item.draft_message and item.url:
                 messaging_tasks.append(MessagingTask(
-                    product_url=item["url"],
-                    message=item["draft_message"],
-                    seller_name=item.get("seller", "Seller"),
+                    product_url=item.url,
+                    message=item.draft_message,
+                    seller_name=item.seller or "Seller",
                 ))
 
         result = {
             "messages": [HumanMessage(content=approval_msg)],
             "pending_proposal": None,
+            "dispatch": None,  # a dispatch in the same tool round as the proposal is dropped
             "approved_items": approved_ids,
         }
 
         if messaging_tasks:
             result["_messaging_tasks"] = messaging_tasks
-            result["_messaging_results"] = []
-            print(f"[HUMAN_APPROVAL] Built {len(messaging_tasks)} messaging tasks → routing to messaging worker")
+            log.debug(f"[HUMAN_APPROVAL] Built {len(messaging_tasks)} messaging tasks → routing to messaging worker")
         else:
-            print(f"[HUMAN_APPROVAL] No messaging tasks (action={action}, {len(approved_items)} approved items) → routing to orchestrator")
+            log.debug(f"[HUMAN_APPROVAL] No messaging tasks (action={action}, {len(approved_items)} approved items) → routing to orchestrator")
 
         return result
 
     # ---- Messaging Nodes ----
 
-    async def _send_single_message(subgraph, task, worker_name):
+    async def _send_single_message(subgraph, task, worker_name, preloaded_hint=""):
         """Run one messaging worker subgraph for a single task."""
-        creds_info = ""
-        if fb_email and fb_password:
-            creds_info = (
-                f"\n\nFacebook Login Credentials (use ONLY if you see a login page):\n"
-                f"- Email: {fb_email}\n"
-                f"- Password: {fb_password}\n"
-            )
-
-        print(f"[{worker_name}] Sending message to {task['seller_name']} at {task['product_url'][:80]}")
+        log.info(f"[{worker_name}] Sending message to {task['seller_name']} at {task['product_url'][:80]}")
         try:
             worker_state = await asyncio.wait_for(
                 subgraph.ainvoke(
@@ -316,15 +342,16 @@ Workers will handle Facebook login if needed using these credentials.
                             f"- URL: {task['product_url']}\n"
                             f"- Seller: {task['seller_name']}\n"
                             f"- Message: {task['message']}\n"
-                            f"{creds_info}"
+                            f"{preloaded_hint}"
                         ))],
                         "messaging_task": task,
                         "step_count": 0,
                     },
                     config={"recursion_limit": 50},
                 ),
-                timeout=120,
+                timeout=MESSAGING_TIMEOUT,
             )
+            tracing.record_worker_steps(worker_name, worker_state.get("step_count", 0))
             result = parse_messaging_results(worker_state["messages"])
             mr = MessagingResult(
                 product_url=task["product_url"],
@@ -339,51 +366,83 @@ Workers will handle Facebook login if needed using these credentials.
                 success=False,
                 reasoning="Messaging worker timed out",
             )
-        print(f"[{worker_name}] Result for {task['seller_name']}: {'success' if mr['success'] else 'failed'}")
+        log.info(f"[{worker_name}] Result for {task['seller_name']}: {'success' if mr['success'] else 'failed'}")
         return mr
 
-    async def run_messaging_worker(state: AgentState):
-        """Run messaging workers A and B in parallel to send messages to approved sellers."""
-        tasks = state.get("_messaging_tasks", [])
-        if not tasks:
-            return {"_messaging_results": [MessagingResult(
-                product_url="", seller_name="", success=False,
-                reasoning="No messaging task found",
-            )]}
+    async def _send_group(tasks, semaphore, thread_id):
+        """Send every message in one group through a single leased browser.
+
+        Messages for the same listing are combined into one message so the
+        worker navigates once; every task in the group shares the result.
+        If the listing was prefetched during approval, the worker starts on
+        that warm tab instead of navigating, and the tab is closed afterwards.
+        """
+        first = tasks[0]
+        combined = MessagingTask(
+            product_url=first["product_url"],
+            message="\n\n".join(dict.fromkeys(t["message"] for t in tasks)),
+            seller_name=first["seller_name"],
+        )
+        async with semaphore:
+            warm = await prefetch.claim(thread_id, first["product_url"])
+            async with pool.lease(prefer=warm.slot_name if warm else None, priority=Priority.MESSAGING) as slot:
+                hint = ""
+                if warm and warm.slot_name == slot.name:
+                    try:
+                        ref = await prefetch.open_prefetched(slot, warm)
+                    except Exception as e:
+                        log.warning(f"[MSG_WORKER_{slot.name}] Prefetched tab unusable: {e}")
+                        ref = None
+                    if ref is not None:
+                        hint = (
+                            "\nThe listing is ALREADY OPEN in the current tab (pre-loaded while the user was reviewing). "
+                            "Do NOT navigate to the URL. "
+                            + (f"The message button is ref={ref} — click it directly.\n" if ref else "Take a browser_snapshot first.\n")
+                        )
+                try:
+                    mr = await _send_single_message(messaging_workers[slot.name], combined, f"MSG_WORKER_{slot.name}", hint)
+                finally:
+                    if warm and warm.slot_name == slot.name:
+                        try:
+                            await prefetch.close_prefetched(slot, warm)
+                        except Exception as e:
+                            log.warning(f"[MSG_WORKER_{slot.name}] Could not close prefetched tab: {e}")
+            if warm and warm.slot_name != slot.name:
+                prefetch.release(pool, warm)  # the tab is in another browser
 
-        # Split tasks between Worker A and Worker B (alternating)
-        tasks_a = tasks[0::2]  # even indices
-        tasks_b = tasks[1::2]  # odd indices
+        results = []
+        for t in tasks:
+            reasoning = mr["reasoning"]
+            if len(tasks) > 1:
+                reasoning = f"{reasoning} (sent together with {len(tasks) - 1} other message(s) about this listing)"
+            results.append(MessagingResult(
+                product_url=t["product_url"],
+                seller_name=t["seller_name"],
+                success=mr["success"],
+                reasoning=reasoning,
+            ))
+        return results
 
-        # Build coroutines for each worker — each processes its tasks sequentially
-        async def run_batch(subgraph, batch, worker_name):
-            results = []
-            for task in batch:
-                r = await _send_single_message(subgraph, task, worker_name)
-                results.append(r)
-            return results
+    async def send_messages(send: WorkerSend, config: RunnableConfig):
+        """Send one group of messages; groups run as parallel tasks, at most messaging_concurrency at once."""
+        thread_id = config["configurable"]["thread_id"]
+        with snapshot_cache.bypass():  # messaging acts on live pages, never cached ones
+            results = await _send_group(send["tasks"], messaging_slots, thread_id)
+        return {"_messaging_results": results}
 
-        results_a, results_b = await asyncio.gather(
-            run_batch(messaging_worker_a, tasks_a, "MSG_WORKER_A"),
-            run_batch(messaging_worker_b, tasks_b, "MSG_WORKER_B"),
-        )
+    def merge_messaging_results(state: AgentState, config: RunnableConfig):
+        """Format messaging results (back in approval order) for the orchestrator."""
+        # Close any warm tabs that grouping made redundant
+        prefetch.discard_rejected(config["configurable"]["thread_id"], pool, set())
 
-        # Merge results back in original order
-        all_results = []
-        ia, ib = 0, 0
-        for i in range(len(tasks)):
-            if i % 2 == 0 and ia < len(results_a):
-                all_results.append(results_a[ia])
-                ia += 1
-            elif ib < len(results_b):
-                all_results.append(results_b[ib])
-                ib += 1
-
-        return {"_messaging_results": all_results}
-
-    def merge_messaging_results(state: AgentState):
-        """Format messaging results for the orchestrator."""
-        results = state.get("_messaging_results", [])
+        tasks = state.get("_messaging_tasks", [])
+        order = {}
+        for i, t in enumerate(tasks):
+            order.setdefault((t["product_url"], t["seller_name"]), i)
+        results = sorted(
+            state.get("_messaging_results", []),
+            key=lambda r: order.get((r["product_url"], r["seller_name"]), len(tasks)),
+        )
         if not results:
             summary = "No messaging results."
         else:
@@ -395,19 +454,21 @@ Workers will handle Facebook login if needed using these credentials.
 
         return {
             "messages": [HumanMessage(content=summary)],
-            "_messaging_tasks": [],
+            "_messaging_tasks": None,
+            "_messaging_results": None,
         }
 
     # ---- Routing ----
 
     def route_after_approval(state: AgentState):
-        """Route after human approval — go to messaging worker if tasks exist, otherwise orchestrator."""
+        """Route after human approval — one send_messages task per listing/seller group, or back to the orchestrator."""
         tasks = state.get("_messaging_tasks", [])
-        if tasks:
-            print(f"[ROUTE_AFTER_APPROVAL] Found {len(tasks)} messaging tasks → run_messaging_worker")
-            return "run_messaging_worker"
-        print(f"[ROUTE_AFTER_APPROVAL] No messaging tasks → orchestrator")
-        return "orchestrator"
+        if not tasks:
+            log.debug("[ROUTE_AFTER_APPROVAL] No messaging tasks → orchestrator")
+            return "orchestrator"
+        groups = _group_messaging_tasks(tasks)
+        log.info(f"[MESSAGING] {len(tasks)} tasks in {len(groups)} groups, concurrency={messaging_concurrency}")
+        return [Send("send_messages", WorkerSend(tasks=[tasks[i] for i in group])) for group in groups]
 
     def route_orchestrator(state: AgentState):
         last = state["messages"][-1]
@@ -416,25 +477,14 @@ Workers will handle Facebook login if needed using these credentials.
         return END
 
     def route_after_orchestrator_tools(state: AgentState) -> str:
-        for msg in reversed(state["messages"]):
-            if isinstance(msg, ToolMessage):
-                content_preview = str(msg.content)[:200]
-                print(f"[ROUTE_AFTER_TOOLS] Found ToolMessage: {content_preview}")
-                try:
-                    result = json.loads(msg.content)
-                    status = result.get("status")
-                    print(f"[ROUTE_AFTER_TOOLS] Parsed status={status}")
-                    if status == "pending_approval":
-                        print(f"[ROUTE_AFTER_TOOLS] → human_approval")
-                        return "human_approval"
-                    if status == "dispatched":
-                        print(f"[ROUTE_AFTER_TOOLS] → process_dispatch")
-                        return "process_dispatch"
-                except (json.JSONDecodeError, TypeError) as e:
-                    print(f"[ROUTE_AFTER_TOOLS] JSON parse error: {e}")
-                    pass
-                break
-        print(f"[ROUTE_AFTER_TOOLS] → orchestrator (fallback)")
+        """Route on the channels the orchestrator tools write (a proposal wins over a dispatch)."""
+        if state.get("pending_proposal"):
+            log.debug("[ROUTE_AFTER_TOOLS] → human_approval")
+            return "human_approval"
+        if state.get("dispatch"):
+            log.debug("[ROUTE_AFTER_TOOLS] → process_dispatch")
+            return "process_dispatch"
+        log.debug("[ROUTE_AFTER_TOOLS] → orchestrator")
         return "orchestrator"
 
     # ---- Build graph ----
@@ -443,20 +493,21 @@ Workers will handle Facebook login if needed using these credentials.
     #   START → orchestrator → route
     #     ├→ END
     #     └→ orchestrator_tools → route_after_tools
-    #          ├→ human_approval → run_messaging_worker (sends messages) OR orchestrator (rejected)
-    #          ├→ process_dispatch → run_workers (A+B parallel) → merge_results → orchestrator
+    #          ├→ human_approval → send_messages × groups (Send, concurrent on the pool) → merge_messaging_results
+    #          │                   OR orchestrator (rejected)
+    #          ├→ process_dispatch → run_worker × splits (Send, parallel on the pool) → merge_results → orchestrator
     #          └→ orchestrator (loop)
 
     graph = StateGraph(AgentState)
 
-    graph.add_node("orchestrator", orchestrator)
+    graph.add_node("orchestrator", tracing.traced_node("orchestrator", orchestrator))
     graph.add_node("orchestrator_tools", orchestrator_tool_node)
-    graph.add_node("process_dispatch", process_dispatch)
-    graph.add_node("run_workers", run_workers)
-    graph.add_node("merge_results", merge_results)
-    graph.add_node("human_approval", human_approval)
-    graph.add_node("run_messaging_worker", run_messaging_worker)
-    graph.add_node("merge_messaging_results", merge_messaging_results)
+    graph.add_node("process_dispatch", tracing.traced_node("process_dispatch", process_dispatch))
+    graph.add_node("run_worker", tracing.traced_node("run_worker", run_worker))
+    graph.add_node("merge_results", tracing.traced_node("merge_results", merge_results))
+    graph.add_node("human_approval", tracing.traced_node("human_approval", human_approval))
+    graph.add_node("send_messages", tracing.traced_node("send_messages", send_messages))
+    graph.add_node("merge_messaging_results", tracing.traced_node("merge_messaging_results", merge_messaging_results))
 
     graph.add_edge(START, "orchestrator")
     graph.add_conditional_edges(
@@ -473,16 +524,18 @@ Workers will handle Facebook login if needed using these credentials.
             "orchestrator": "orchestrator",
         },
     )
-    graph.add_edge("process_dispatch", "run_workers")
-    graph.add_edge("run_workers", "merge_results")
+    graph.add_conditional_edges("process_dispatch", fan_out_workers, ["run_worker", "merge_results"])
+    graph.add_edge("run_worker", "merge_results")
     graph.add_edge("merge_results", "orchestrator")
     graph.add_conditional_edges(
         "human_approval",
         route_after_approval,
-        {"run_messaging_worker": "run_messaging_worker", "orchestrator": "orchestrator"},
+        ["send_messages", "orchestrator"],
     )
-    graph.add_edge("run_messaging_worker", "merge_messaging_results")
+    graph.add_edge("send_messages", "merge_messaging_results")
     graph.add_edge("merge_messaging_results", "orchestrator")
 
-    checkpointer = MemorySaver()
-    return graph.compile(checkpointer=checkpointer)
+    with startup.phase("checkpointer"):
+        checkpointer = await create_checkpointer()
+    with startup.phase("graph_compile"):
+        return graph.compile(checkpointer=checkpointer)
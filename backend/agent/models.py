@@ -0,0 +1,50 @@
+"""
+Models - one ChatOpenAI client shared by the orchestrator and every worker.
+
+bind_tools() only wraps the base model, so each node gets its own tool set
+while they all reuse the same underlying OpenAI client, whose connections come from the
+pool in backend/openai_pool.py that Whisper and TTS share as well.
+Worker models are cached per browser slot, so the API graph and the
+langgraph dev entrypoints hand out the same objects. Every bound model spends
+the shared request/token budgets in backend/ratelimit.py before each call.
+ROOMIE_MODEL=stub uses the scripted offline model in backend/bench/stub_model.py.
+"""
+
+import os
+
+from backend import ratelimit, replay
+from backend.openai_pool import get_http_client
+
+MODEL_NAME = os.getenv("ROOMIE_MODEL", "gpt-5")
+
+_base_model = None
+_worker_models: dict[str, object] = {}
+
+
+def get_chat_model():
+    """The shared base chat model (created on first use)."""
+    global _base_model
+    if _base_model is None and MODEL_NAME == "stub":
+        from backend.bench.stub_model import StubChatModel
+
+        _base_model = StubChatModel()
+    if _base_model is None:
+        from langchain_openai import ChatOpenAI
+
+        _base_model = ChatOpenAI(
+            model=MODEL_NAME,
+            api_key=os.getenv("OPENAI_APIKEY"),
+            http_async_client=get_http_client(),
+        )
+    return _base_model
+
+
+def orchestrator_model(tools):
+    return replay.wrap_model(ratelimit.wrap_model(get_chat_model().bind_tools(tools)), "orchestrator")
+
+
+def worker_model(slot):
+    """The tool-bound model for a browser slot's workers."""
+    if slot.name not in _worker_models:
+        _worker_models[slot.name] = replay.wrap_model(ratelimit.wrap_model(get_chat_model().bind_tools(slot.tools)), "worker")
+    return _worker_models[slot.name]
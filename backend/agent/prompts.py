@@ -87,8 +87,7 @@ WORKER_PROMPT = """You are a fast marketplace search specialist. Find furniture
 - If you see a cookie/notification popup, dismiss it and snapshot again.
 - NEVER navigate to facebook.com/marketplace without /search?query= — always go directly to search.
 - If Facebook shows no results or redirects, try simpler search terms (e.g. "bed frame" instead of "queen mid century walnut bed frame").
-- If you see a LOGIN page, use the Facebook credentials provided below to log in ONCE, then continue searching.
-- After login, dismiss any "not now" prompts and navigate to your search URL.
+- The browser is already logged in to Facebook. If you still see a LOGIN page, do NOT try to log in — output [WORKER_RESULTS] with whatever you have.
 
 ## Fast Search Strategy (YOU HAVE MAX 10 STEPS — BE FAST)
 1. `browser_navigate` directly to the search URL with your query baked in
@@ -136,8 +135,7 @@ MESSAGING_WORKER_PROMPT = """You are a Facebook Marketplace messaging specialist
 8. `browser_snapshot` to confirm the message was sent
 
 ## Facebook-Specific Tips
-- If you see a LOGIN page, use the Facebook credentials provided to log in first, then navigate back to the listing URL.
-- After login, dismiss any "not now" prompts.
+- The browser is already logged in to Facebook. If you still see a LOGIN page, do NOT try to log in — report failure with reasoning "login required".
 - The message input is usually a textarea or contenteditable div inside a dialog/modal.
 - If the page asks you to "Continue in Messenger", that's fine — follow the flow.
 - If you see a popup or overlay blocking the page, dismiss it first.
@@ -0,0 +1,183 @@
+"""
+Pick Ranking - normalise, de-duplicate and score worker picks before the
+orchestrator sees them.
+
+Workers often return the same listing for several tasks (and `_run_single_worker`
+hands every pick to every task when it can't tell them apart), so picks are
+pooled across tasks, de-duplicated by listing URL and by fuzzy title
+similarity, scored column-wise against every task's budget and style, and each
+unique pick is kept only under the task it fits best — at most RANK_TOP_K per
+task. A smaller summary means a shorter next orchestrator call.
+"""
+
+import re
+from urllib.parse import urlsplit
+
+from backend.agent.state import SearchTask, WorkerResult
+from backend.search.scraper import find_all_categories, find_matching_category
+from backend.search.types import Listing, parse_price
+
+
+RANK_TOP_K = 3
+DUPLICATE_TITLE_SIMILARITY = 0.8  # Jaccard over character 3-shingles
+
+
+def listing_key(url: str) -> str:
+    """Normalise a listing URL so tracking params don't split the same listing."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.").removeprefix("m.")
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _shingles(title: str, n: int = 3) -> frozenset[str]:
+    text = re.sub(r"[^a-z0-9]+", " ", title.lower()).strip()
+    if len(text) <= n:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def dedupe(picks: list[Listing]) -> tuple[list[Listing], list[int]]:
+    """Drop repeat listings. Returns (unique picks, index into unique for every input pick).
+
+    Two distinct listing URLs are never the same listing (sellers relist
+    identical items); titles are only compared when a URL is missing.
+    """
+    unique: list[Listing] = []
+    unique_shingles: list[frozenset] = []
+    unique_keys: list[str] = []
+    by_url: dict[str, int] = {}
+    mapping: list[int] = []
+    for pick in picks:
+        key = listing_key(pick.url) if pick.url else ""
+        shingles = _shingles(pick.title)
+        match = by_url.get(key) if key else None
+        if match is None:
+            match = next(
+                (
+                    i for i, s in enumerate(unique_shingles)
+                    if not (key and unique_keys[i]) and _jaccard(shingles, s) >= DUPLICATE_TITLE_SIMILARITY
+                ),
+                None,
+            )
+        if match is None:
+            match = len(unique)
+            unique.append(pick)
+            unique_shingles.append(shingles)
+            unique_keys.append(key)
+        else:
+            # Keep the richer copy's fields, but never lose fields the first copy had
+            unique[match] = unique[match].merged(pick)
+            unique_keys[match] = unique_keys[match] or key
+        if key:
+            by_url.setdefault(key, match)
+        mapping.append(match)
+    return unique, mapping
+
+
+def _score_matrix(picks: list[Listing], tasks: list[SearchTask]) -> list[list[float]]:
+    """Score every pick against every task in one columnar pass.
+
+    score = 2·type_match + budget_fit + style_fraction, where budget_fit is
+    1.0 for free, falling to 0.5 at the budget, 0 above it, 0.5 if unpriced.
+    """
+    # Columns computed once per pick
+    prices = [pick.price for pick in picks]
+    texts = [f"{pick.title} {pick.reason}".lower() for pick in picks]
+    categories = [set(find_all_categories(pick.title)) for pick in picks]
+
+    matrix = []
+    for task in tasks:
+        budget = parse_price(task.get("max_budget")) or 0.0
+        keywords = [k.lower() for k in task.get("style_keywords", []) if k]
+        category = find_matching_category(task["item_type"])
+        item_words = task["item_type"].lower()
+
+        type_col = [
+            1.0 if (category in cats if category else item_words in text) else 0.0
+            for cats, text in zip(categories, texts)
+        ]
+        budget_col = [
+            0.5 if price is None
+            else (1.0 - 0.5 * price / budget if price <= budget else 0.0) if budget
+            else 0.75
+            for price in prices
+        ]
+        style_col = [
+            sum(k in text for k in keywords) / len(keywords) if keywords else 0.0
+            for text in texts
+        ]
+        matrix.append([2 * t + b + s for t, b, s in zip(type_col, budget_col, style_col)])
+    return matrix
+
+
+def rank_picks(picks: list[Listing], task: SearchTask, limit: int = RANK_TOP_K) -> list[Listing]:
+    """Rank one task's picks (e.g. re-ranking cached speculative results)."""
+    results = rank_worker_results(
+        [WorkerResult(task_id=task["id"], item_type=task["item_type"], picks=picks, reasoning="")],
+        [task],
+        limit,
+    )
+    return results[0]["picks"]
+
+
+def rank_worker_results(
+    results: list[WorkerResult],
+    tasks: list[SearchTask],
+    limit: int = RANK_TOP_K,
+) -> list[WorkerResult]:
+    """De-duplicate picks across all results and keep the best `limit` per task.
+
+    Each unique pick stays only under the task (among those that returned it)
+    it scores highest for; over-budget picks are dropped when a task has
+    in-budget alternatives.
+    """
+    task_by_id = {t["id"]: t for t in tasks}
+    # Results for tasks we no longer know about still get ranked on their own item type
+    ranked_tasks = [
+        task_by_id.get(wr["task_id"]) or SearchTask(
+            id=wr["task_id"], item_type=wr["item_type"], style_keywords=[],
+            max_budget=0, marketplace="", constraints="",
+        )
+        for wr in results
+    ]
+
+    pooled, origin = [], []
+    for ti, wr in enumerate(results):
+        for pick in wr.get("picks", []):
+            pooled.append(Listing.from_dict(pick))
+            origin.append(ti)
+    unique, mapping = dedupe(pooled)
+    scores = _score_matrix(unique, ranked_tasks)
+
+    # Which tasks returned each unique pick, then keep it under the best of those
+    returned_by: dict[int, set[int]] = {}
+    for ui, ti in zip(mapping, origin):
+        returned_by.setdefault(ui, set()).add(ti)
+    per_task: dict[int, list[int]] = {ti: [] for ti in range(len(results))}
+    for ui, tis in returned_by.items():
+        best = max(sorted(tis), key=lambda ti: scores[ti][ui])
+        per_task[best].append(ui)
+
+    ranked = []
+    for ti, wr in enumerate(results):
+        candidates = sorted(per_task[ti], key=lambda ui: scores[ti][ui], reverse=True)
+        budget = parse_price(ranked_tasks[ti].get("max_budget"))
+        in_budget = [ui for ui in candidates if budget is None or not budget or unique[ui].price is None or unique[ui].price <= budget]
+        keep = (in_budget or candidates)[:limit]
+        found = len(wr.get("picks", []))
+        reasoning = wr["reasoning"]
+        if found != len(keep):
+            reasoning = f"{reasoning}; kept top {len(keep)} of {found} after de-duplication and ranking"
+        ranked.append(WorkerResult(
+            task_id=wr["task_id"],
+            item_type=wr["item_type"],
+            picks=[unique[ui] for ui in keep],
+            reasoning=reasoning,
+        ))
+    return ranked
@@ -0,0 +1,77 @@
+"""
+Speculative Search - start browsing as soon as the room analysis is known.
+
+With SPECULATIVE_SEARCH=1, the furniture types named in the orchestrator's room
+analysis are searched in the background while the user is still answering
+style and budget questions. Results land in the search-result cache
+(backend/search/cache.py) and are re-ranked (backend/agent/ranking.py) against
+the real tasks when `dispatch_searches` finally runs.
+"""
+
+import asyncio
+import logging
+import os
+
+from backend.agent.state import SearchTask
+from backend.search import cache
+from backend.search.scraper import find_all_categories
+
+log = logging.getLogger(__name__)
+
+
+SPECULATIVE_MAX_TYPES = 4  # don't pre-search a whole catalogue off one photo
+SPECULATIVE_CONCURRENCY = 1  # background searches never take more than one browser
+
+
+def enabled() -> bool:
+    return os.getenv("SPECULATIVE_SEARCH", "").lower() in ("1", "true", "yes")
+
+
+def extract_furniture_types(analysis_text: str) -> list[str]:
+    """Furniture categories the room analysis recommends, most prominent first."""
+    return find_all_categories(analysis_text)[:SPECULATIVE_MAX_TYPES]
+
+
+def speculative_task(item_type: str) -> SearchTask:
+    """A broad task for a category before budget/style are known."""
+    return SearchTask(
+        id=f"spec_{item_type.replace(' ', '_')}",
+        item_type=item_type,
+        style_keywords=[],
+        max_budget=10000,
+        marketplace="facebook",
+        constraints="Broad pre-search (budget and style not known yet): return up to 6 picks across a range of prices and styles",
+    )
+
+
+_semaphore: asyncio.Semaphore | None = None
+
+
+def start(thread_id: str, item_types: list[str], run_search) -> list[str]:
+    """Kick off background searches for a thread's categories not already cached.
+
+    `run_search(task)` is the graph's coroutine that runs a search worker on a
+    leased browser and returns the raw picks. Returns the types started.
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(SPECULATIVE_CONCURRENCY)
+
+    async def _guarded(task: SearchTask):
+        async with _semaphore:
+            cache.mark_started(thread_id, task["item_type"])
+            try:
+                return await run_search(task)
+            except Exception as e:
+                log.warning(f"[SPECULATIVE] Search for {task['item_type']} failed: {e}")
+                return []
+
+    started = []
+    for item_type in item_types:
+        if cache.has(thread_id, item_type):
+            continue
+        cache.put_pending(thread_id, item_type, asyncio.create_task(_guarded(speculative_task(item_type))))
+        started.append(item_type)
+    if started:
+        log.info(f"[SPECULATIVE] Started background searches: {', '.join(started)}")
+    return started
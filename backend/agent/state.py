@@ -1,35 +1,23 @@
 from typing import Annotated, TypedDict
 from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
+from backend.search.types import Listing
 
 
-class ProductListing(TypedDict):
-    id: str
-    title: str
-    price: float
-    currency: str
-    image_url: str
-    source: str  # "ebay", "facebook", "gumtree"
-    url: str
-    seller: str
-    condition: str
-    location: str
-
-
-class ProposalItem(TypedDict, total=False):
-    id: str
-    title: str
-    price: float
-    source: str
-    url: str
-    image_url: str
-    seller: str
-    draft_message: str  # optional draft message to seller
+def append_or_clear(left: list | None, right: list | None) -> list:
+    """Reducer for task/result channels: a list update is appended, None clears the channel.
+
+    Parallel writers (one per fanned-out worker) can each add their own
+    results, and a checkpoint write only carries what a node added.
+    """
+    if right is None:
+        return []
+    return (left or []) + right
 
 
 class Proposal(TypedDict, total=False):
     type: str  # "shortlist" or "contact_sellers"
-    items: list[ProposalItem]
+    items: list[Listing]  # each with a draft_message for "contact_sellers"
     summary: str
 
 
@@ -45,7 +33,7 @@ class SearchTask(TypedDict):
 class WorkerResult(TypedDict):
     task_id: str
     item_type: str
-    picks: list[ProposalItem]  # top 3 picks
+    picks: list[Listing]  # top 3 picks
     reasoning: str
 
 
@@ -65,14 +53,18 @@ class MessagingResult(TypedDict):
 class AgentState(TypedDict):
     messages: Annotated[list[BaseMessage], add_messages]
     room_analysis: dict | None
-    shopping_list: list[ProductListing]
-    search_results: list[ProductListing]
-    pending_proposal: Proposal | None
+    shopping_list: list[Listing]
+    search_results: list[Listing]
+    pending_proposal: Proposal | None  # set by propose_shortlist, cleared by human_approval
+    dispatch: list[SearchTask] | None  # set by dispatch_searches, cleared by process_dispatch
     approved_items: list[str]  # list of approved item IDs
-    search_tasks: list[SearchTask]
+    search_tasks: Annotated[list[SearchTask], append_or_clear]
     current_task_index: int
-    worker_results: list[WorkerResult]
-    _tasks_a: list[SearchTask]  # tasks assigned to Worker A
-    _tasks_b: list[SearchTask]  # tasks assigned to Worker B
-    _messaging_tasks: list[MessagingTask]
-    _messaging_results: list[MessagingResult]
+    worker_results: Annotated[list[WorkerResult], append_or_clear]
+    _messaging_tasks: Annotated[list[MessagingTask], append_or_clear]
+    _messaging_results: Annotated[list[MessagingResult], append_or_clear]
+
+
+class WorkerSend(TypedDict):
+    """What a fanned-out run_worker / send_messages task is given instead of the state."""
+    tasks: list
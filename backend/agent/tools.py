@@ -1,9 +1,15 @@
-import json
-from langchain_core.tools import tool
+from typing import Annotated
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import InjectedToolCallId, tool
+from langgraph.types import Command
+
+from backend.agent.state import Proposal
+from backend.search.types import Listing, dumps, loads
 
 
 @tool
-def propose_shortlist(items_json: str) -> str:
+def propose_shortlist(items_json: str, tool_call_id: Annotated[str, InjectedToolCallId]) -> Command | str:
     """Propose a shortlist of items for the user to approve or reject.
     The user will see each item with its draft message. Approved items get their messages sent to sellers automatically.
 
@@ -22,23 +28,27 @@ def propose_shortlist(items_json: str) -> str:
         Confirmation that the proposal was submitted for user review
     """
     try:
-        items = json.loads(items_json)
-        has_messages = any(item.get("draft_message") for item in items)
-        proposal_type = "contact_sellers" if has_messages else "shortlist"
-
-        return json.dumps({
-            "status": "pending_approval",
-            "type": proposal_type,
-            "item_count": len(items),
-            "items": items,
-            "message": f"Proposed {len(items)} items for user approval. Waiting for user to approve/reject.",
-        })
-    except json.JSONDecodeError:
-        return json.dumps({
+        items = [Listing.from_dict(item) for item in loads(items_json)]
+    except (ValueError, TypeError, AttributeError):
+        return dumps({
             "status": "error",
             "message": "Invalid JSON in items_json. Please provide a valid JSON array.",
         })
 
+    proposal_type = "contact_sellers" if any(item.draft_message for item in items) else "shortlist"
+    content = dumps({
+        "status": "pending_approval",
+        "type": proposal_type,
+        "item_count": len(items),
+        "items": items,
+        "message": f"Proposed {len(items)} items for user approval. Waiting for user to approve/reject.",
+    })
+    # The proposal goes straight into its state channel; routing reads it from there
+    return Command(update={
+        "pending_proposal": Proposal(type=proposal_type, items=items),
+        "messages": [ToolMessage(content, tool_call_id=tool_call_id)],
+    })
+
 
 @tool
 def add_to_shopping_list(
@@ -63,7 +73,7 @@ def add_to_shopping_list(
     Returns:
         Confirmation message
     """
-    return json.dumps({
+    return dumps({
         "status": "added",
         "product_id": product_id,
         "title": title,
@@ -90,7 +100,7 @@ def contact_seller(
     Returns:
         Status of the message
     """
-    return json.dumps({
+    return dumps({
         "status": "dispatch_messaging",
         "product_url": product_url,
         "message": message,
@@ -99,7 +109,7 @@ def contact_seller(
 
 
 @tool
-def dispatch_searches(tasks_json: str) -> str:
+def dispatch_searches(tasks_json: str, tool_call_id: Annotated[str, InjectedToolCallId]) -> Command | str:
     """Create search tasks for item worker agents. Each task searches Facebook Marketplace for ONE item type.
     Call this when you have analyzed the room and know what furniture to search for.
 
@@ -116,19 +126,26 @@ def dispatch_searches(tasks_json: str) -> str:
         Confirmation that workers have been dispatched
     """
     try:
-        tasks = json.loads(tasks_json)
-        return json.dumps({
-            "status": "dispatched",
-            "task_count": len(tasks),
-            "tasks": tasks,
-            "message": f"Dispatched {len(tasks)} search tasks to item workers. Results will be merged when all complete.",
-        })
-    except json.JSONDecodeError:
-        return json.dumps({
+        tasks = loads(tasks_json)
+        if not isinstance(tasks, list):
+            raise ValueError("tasks_json must be an array")
+    except ValueError:
+        return dumps({
             "status": "error",
             "message": "Invalid JSON in tasks_json. Please provide a valid JSON array.",
         })
 
+    content = dumps({
+        "status": "dispatched",
+        "task_count": len(tasks),
+        "tasks": tasks,
+        "message": f"Dispatched {len(tasks)} search tasks to item workers. Results will be merged when all complete.",
+    })
+    return Command(update={
+        "dispatch": tasks,
+        "messages": [ToolMessage(content, tool_call_id=tool_call_id)],
+    })
+
 
 # Tools for the orchestrator (no browser tools)
 # Only propose_shortlist and dispatch_searches — approval triggers messaging automatically
@@ -2,6 +2,7 @@
 
 import json
 import re
+import time
 from typing import Annotated, TypedDict
 
 from langgraph.graph import StateGraph, START, END
@@ -11,6 +12,8 @@ from langchain_core.messages import BaseMessage, SystemMessage, AIMessage, Human
 
 from backend.agent.state import SearchTask, MessagingTask
 from backend.agent.prompts import WORKER_PROMPT, MESSAGING_WORKER_PROMPT
+from backend.search.types import Listing
+from backend import tracing
 
 
 MAX_WORKER_STEPS = 10  # max tool-call rounds before forcing wrap-up
@@ -22,8 +25,8 @@ class WorkerState(TypedDict):
     step_count: int  # tracks how many tool rounds have executed
 
 
-def _build_worker(worker_name: str, browser_tools, worker_model):
-    """Build a compiled worker subgraph. Each worker opens its own tab."""
+def build_worker(worker_name: str, browser_tools, worker_model):
+    """Build a compiled search worker subgraph for one browser pool slot. Each worker opens its own tab."""
 
     worker_tool_node = ToolNode(browser_tools, handle_tool_errors=True)
 
@@ -60,7 +63,7 @@ def _build_worker(worker_name: str, browser_tools, worker_model):
 
         return prefix + trimmed_tail
 
-    def worker_agent(state: WorkerState):
+    async def worker_agent(state: WorkerState):
         tasks = state["tasks"]
         step = state.get("step_count", 0)
 
@@ -108,7 +111,9 @@ Go FAST. Navigate directly to search URLs. Scan results. Return picks. Aim for 2
         # Trim old messages to avoid sending huge browser snapshots every turn
         messages = _trim_messages(messages, keep_last_n=6)
 
-        response = worker_model.invoke(messages)
+        start = time.perf_counter()
+        response = await worker_model.ainvoke(messages)
+        tracing.record_model_call("worker_agent", response, time.perf_counter() - start)
         return {"messages": [response], "step_count": step + 1}
 
     def should_continue(state: WorkerState):
@@ -134,17 +139,11 @@ Go FAST. Navigate directly to search URLs. Scan results. Return picks. Aim for 2
     return graph.compile()
 
 
-def build_worker_a(browser_tools, worker_model):
-    """Build Worker A subgraph."""
-    return _build_worker("Worker A", browser_tools, worker_model)
+def _to_listings(picks) -> list[Listing]:
+    return [Listing.from_dict(p) for p in picks if isinstance(p, dict)] if isinstance(picks, list) else []
 
 
-def build_worker_b(browser_tools, worker_model):
-    """Build Worker B subgraph."""
-    return _build_worker("Worker B", browser_tools, worker_model)
-
-
-def parse_worker_results(messages: list[BaseMessage]) -> list[dict]:
+def parse_worker_results(messages: list[BaseMessage]) -> list[Listing]:
     """Extract structured picks from the worker's final message."""
     for msg in reversed(messages):
         if isinstance(msg, AIMessage) and msg.content:
@@ -158,7 +157,7 @@ def parse_worker_results(messages: list[BaseMessage]) -> list[dict]:
             if match:
                 try:
                     data = json.loads(match.group(1))
-                    return data.get("picks", [])
+                    return _to_listings(data.get("picks", []))
                 except json.JSONDecodeError:
                     pass
             # Fallback: try to find any JSON object with "picks" key
@@ -166,7 +165,7 @@ def parse_worker_results(messages: list[BaseMessage]) -> list[dict]:
                 json_match = re.search(r'\{[^{}]*"picks"\s*:\s*\[.*?\]\s*[^{}]*\}', content, re.DOTALL)
                 if json_match:
                     data = json.loads(json_match.group(0))
-                    return data.get("picks", [])
+                    return _to_listings(data.get("picks", []))
             except (json.JSONDecodeError, AttributeError):
                 pass
     return []
@@ -188,7 +187,7 @@ def build_messaging_worker(browser_tools, worker_model):
 
     tool_node = ToolNode(browser_tools, handle_tool_errors=True)
 
-    def messaging_agent(state: MessagingWorkerState):
+    async def messaging_agent(state: MessagingWorkerState):
         step = state.get("step_count", 0)
         task = state["messaging_task"]
 
@@ -215,7 +214,9 @@ Navigate to the listing URL, find the message button, type the message, and send
         if urgency:
             messages = messages + [HumanMessage(content=urgency)]
 
-        response = worker_model.invoke(messages)
+        start = time.perf_counter()
+        response = await worker_model.ainvoke(messages)
+        tracing.record_model_call("messaging_agent", response, time.perf_counter() - start)
         return {"messages": [response], "step_count": step + 1}
 
     def should_continue(state: MessagingWorkerState):
@@ -0,0 +1,132 @@
+"""
+Admission Control - bounds how many graph runs execute at once.
+
+Every /api/chat and /api/chat/resume run takes a ticket first:
+  - at most ADMISSION_MAX_ACTIVE runs execute concurrently, the rest wait in
+    a FIFO queue (bounded by ADMISSION_MAX_QUEUE)
+  - a thread_id never has two runs at once; a second turn for the same thread
+    waits for the first instead of interleaving in its checkpoint and browsers
+  - while queued the caller is told its position (SSE queue events)
+  - if the expected queue wait is over ADMISSION_SLO_SECONDS the request is
+    rejected straight away (429 + Retry-After) instead of timing out later
+
+The wait estimate is the queue position in "waves" of max_active runs times
+a moving average of recent run durations.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+
+from backend.tracing import ADMISSION_REJECTED, ADMISSION_WAIT
+
+log = logging.getLogger(__name__)
+
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", "4"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "16"))
+ADMISSION_SLO_SECONDS = float(os.getenv("ADMISSION_SLO_SECONDS", "90"))  # longest acceptable queue wait
+
+INITIAL_RUN_ESTIMATE = 30.0  # seconds, until real runs have been observed
+RUN_ESTIMATE_ALPHA = 0.2  # weight of the latest run in the moving average
+QUEUE_EVENT_INTERVAL = 2.0  # seconds between queue-position events
+
+
+class Overloaded(Exception):
+    """The run can't be started within the SLO — reject it now."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+@dataclass
+class Ticket:
+    thread_id: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    admitted: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class AdmissionController:
+    def __init__(self, max_active: int, max_queue: int, slo_seconds: float):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.slo_seconds = slo_seconds
+        self._queue: list[Ticket] = []
+        self._running: dict[str, Ticket] = {}  # thread_id -> its active run
+        self._avg_run = INITIAL_RUN_ESTIMATE
+
+    @property
+    def active(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in the queue, 0 once admitted."""
+        if ticket.admitted.is_set():
+            return 0
+        return self._queue.index(ticket) + 1 if ticket in self._queue else 0
+
+    def estimated_wait(self, position: int) -> float:
+        if position <= 0:
+            return 0.0
+        return math.ceil(position / self.max_active) * self._avg_run
+
+    def submit(self, thread_id: str) -> Ticket:
+        """Queue a run for `thread_id`. Raises Overloaded if it can't start within the SLO."""
+        if len(self._queue) >= self.max_queue:
+            ADMISSION_REJECTED.inc({"reason": "queue_full"})
+            raise Overloaded("run queue is full", self.estimated_wait(len(self._queue) + 1))
+
+        ticket = Ticket(thread_id)
+        self._queue.append(ticket)
+        self._dispatch()
+        if not ticket.admitted.is_set():
+            wait = self.estimated_wait(self.position(ticket))
+            if wait > self.slo_seconds:
+                self._queue.remove(ticket)
+                ADMISSION_REJECTED.inc({"reason": "slo"})
+                raise Overloaded(f"expected wait {wait:.0f}s exceeds {self.slo_seconds:.0f}s", wait)
+            log.info(f"[ADMISSION] {thread_id} queued at position {self.position(ticket)} (~{wait:.0f}s)")
+        return ticket
+
+    async def wait(self, ticket: Ticket):
+        """Yield the ticket's queue position periodically until it is admitted."""
+        while not ticket.admitted.is_set():
+            yield self.position(ticket)
+            try:
+                await asyncio.wait_for(ticket.admitted.wait(), QUEUE_EVENT_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, ticket: Ticket):
+        """Finish (or abandon) a run and admit whoever is next."""
+        if self._running.get(ticket.thread_id) is ticket:
+            del self._running[ticket.thread_id]
+            duration = time.monotonic() - ticket.started_at
+            self._avg_run += RUN_ESTIMATE_ALPHA * (duration - self._avg_run)
+        elif ticket in self._queue:
+            self._queue.remove(ticket)  # client went away while queued
+        self._dispatch()
+
+    def _dispatch(self):
+        for ticket in list(self._queue):
+            if len(self._running) >= self.max_active:
+                break
+            if ticket.thread_id in self._running:
+                continue  # same thread still running — keep its place, let others past
+            self._queue.remove(ticket)
+            self._running[ticket.thread_id] = ticket
+            ticket.started_at = time.monotonic()
+            ADMISSION_WAIT.observe({}, ticket.started_at - ticket.enqueued_at)
+            ticket.admitted.set()
+
+
+admission = AdmissionController(ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE, ADMISSION_SLO_SECONDS)
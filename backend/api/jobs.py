@@ -0,0 +1,304 @@
+"""
+Background Jobs - graph runs that live independently of the HTTP request.
+
+A job wraps one chat or resume run. It is admitted through the admission
+controller, executes as a managed asyncio task and records every event it
+produces (queue position, the assistant response, errors). Clients can:
+  - subscribe to the events over SSE, from the start or from a given event id
+  - poll them as JSON
+  - cancel the run
+Disconnecting never stops a job, and finished jobs are kept for JOB_TTL so a
+client that reconnects (or resubmits with the same request_id) gets the
+completed result instead of a second run.
+
+With ROOMIE_STATE_DB set, jobs are also written to that SQLite file so any
+API process can poll, stream or cancel a job another process is running.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from backend import broker
+from backend.agent.checkpoint import SQLITE_BUSY_TIMEOUT_MS, state_db_path
+from backend.api.admission import admission
+from backend.search.types import dumps, loads
+
+log = logging.getLogger(__name__)
+
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))  # seconds a finished job's events are kept
+MAX_FINISHED_JOBS = 500
+REMOTE_POLL_INTERVAL = 1.0  # seconds between store reads for jobs owned by another process
+
+FINISHED = ("done", "error", "cancelled")
+
+ERROR_MESSAGES = {
+    "chat": "I encountered an error: {error}. Please try again.",
+    "resume": "I encountered an error while processing your decision: {error}",
+}
+
+
+@dataclass
+class Job:
+    id: str
+    thread_id: str
+    kind: str  # "chat" | "resume"
+    request_id: str | None = None
+    status: str = "queued"  # queued -> running -> done | error | cancelled
+    events: list[dict] = field(default_factory=list)
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    task: asyncio.Task | None = None
+    remote: bool = False  # running in another API process (read from the store)
+    _updated: asyncio.Event = field(default_factory=asyncio.Event)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def emit(self, data: dict):
+        self.events.append({"id": len(self.events), "data": {**data, "job_id": self.id}})
+        self._notify()
+
+    def _notify(self):
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "thread_id": self.thread_id,
+            "kind": self.kind,
+            "status": self.status,
+            "event_count": len(self.events),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    async def subscribe(self, after: int = -1):
+        """Yield stored events with id > `after`, then live ones until the job finishes."""
+        next_id = after + 1
+        while True:
+            updated = self._updated
+            while next_id < len(self.events):
+                yield self.events[next_id]
+                next_id += 1
+            if self.finished:
+                return
+            await updated.wait()
+
+
+class JobStore:
+    """Job rows in the shared SQLite file. Methods are blocking — call them via asyncio.to_thread."""
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, thread_id TEXT, kind TEXT, request_id TEXT, status TEXT,"
+            " events TEXT, created_at REAL, finished_at REAL, cancel_requested INTEGER DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_request ON jobs (thread_id, request_id)")
+        self._lock = threading.Lock()
+
+    def save(self, job: Job):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, thread_id, kind, request_id, status, events, created_at, finished_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET status=excluded.status, events=excluded.events,"
+                " finished_at=excluded.finished_at",
+                (job.id, job.thread_id, job.kind, job.request_id, job.status,
+                 dumps(job.events), job.created_at, job.finished_at),
+            )
+
+    def load(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, thread_id, kind, request_id, status, events, created_at, finished_at"
+                " FROM jobs WHERE id = ?", (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(id=row[0], thread_id=row[1], kind=row[2], request_id=row[3], status=row[4],
+                   events=loads(row[5]), created_at=row[6], finished_at=row[7], remote=True)
+
+    def find(self, thread_id: str, request_id: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE thread_id = ? AND request_id = ?", (thread_id, request_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def request_cancel(self, job_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+
+    def cancel_requested(self, job_ids: list[str]) -> list[str]:
+        marks = ",".join("?" * len(job_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({marks})", job_ids,
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def prune(self, finished_before: float):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                               (finished_before,))
+
+
+class JobManager:
+    def __init__(self, store: JobStore | None = None):
+        self._store = store
+        self._jobs: dict[str, Job] = {}
+        self._by_request: dict[tuple[str, str], str] = {}  # (thread_id, request_id) -> job id
+        self._cancel_watcher: asyncio.Task | None = None
+
+    async def get(self, job_id: str) -> Job | None:
+        job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = await asyncio.to_thread(self._store.load, job_id)
+        return job
+
+    async def submit(self, thread_id: str, kind: str, run: Callable[[], Awaitable[dict]],
+                     request_id: str | None = None) -> Job:
+        """Start `run` as a background job. Raises Overloaded if admission rejects it.
+
+        Resubmitting with the same (thread_id, request_id) returns the existing job.
+        """
+        await self._prune()
+        if request_id is not None:
+            job_id = self._by_request.get((thread_id, request_id))
+            if job_id is None and self._store is not None:
+                job_id = await asyncio.to_thread(self._store.find, thread_id, request_id)
+            existing = await self.get(job_id) if job_id else None
+            if existing is not None:
+                return existing
+
+        ticket = admission.submit(thread_id)
+        job = Job(id=uuid.uuid4().hex, thread_id=thread_id, kind=kind, request_id=request_id)
+        self._jobs[job.id] = job
+        if request_id is not None:
+            self._by_request[(thread_id, request_id)] = job.id
+        await self._persist(job)
+        job.task = asyncio.create_task(self._execute(job, ticket, run))
+        if self._store is not None and (self._cancel_watcher is None or self._cancel_watcher.done()):
+            self._cancel_watcher = asyncio.create_task(self._watch_cancels())
+        return job
+
+    async def _persist(self, job: Job):
+        if self._store is not None:
+            await asyncio.to_thread(self._store.save, job)
+
+    async def _execute(self, job: Job, ticket, run: Callable[[], Awaitable[dict]]):
+        try:
+            async for position in admission.wait(ticket):
+                job.emit({
+                    "thread_id": job.thread_id,
+                    "queue": {"position": position, "estimated_wait": round(admission.estimated_wait(position))},
+                })
+                await self._persist(job)
+            # Another API process may be running this thread; wait for it
+            async with broker.thread_lock(job.thread_id):
+                job.status = "running"
+                job._notify()
+                await self._persist(job)
+                result = await run()
+            job.emit(result)
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            job.emit({"thread_id": job.thread_id, "status": "cancelled"})
+        except Exception as e:
+            log.exception(f"[JOBS] {job.kind} job {job.id} failed")
+            job.status = "error"
+            job.emit({
+                "role": "assistant",
+                "content": ERROR_MESSAGES[job.kind].format(error=str(e)),
+                "thread_id": job.thread_id,
+            })
+        finally:
+            admission.release(ticket)
+            job.finished_at = time.time()
+            job._notify()
+            await asyncio.shield(self._persist(job))
+
+    async def subscribe(self, job: Job, after: int = -1):
+        """Events of a local job as they happen, or of a remote one by polling the store."""
+        if not job.remote:
+            async for event in job.subscribe(after):
+                yield event
+            return
+        next_id = after + 1
+        while True:
+            for event in job.events[next_id:]:
+                yield event
+            next_id = max(next_id, len(job.events))
+            if job.finished:
+                return
+            await asyncio.sleep(REMOTE_POLL_INTERVAL)
+            job = await asyncio.to_thread(self._store.load, job.id) or job
+
+    async def cancel(self, job_id: str) -> Job | None:
+        job = await self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job.remote:
+            # The owning process picks this up in _watch_cancels
+            await asyncio.to_thread(self._store.request_cancel, job_id)
+        elif job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def _watch_cancels(self):
+        """Cancel local jobs that another process was asked to cancel."""
+        while True:
+            running = [j.id for j in self._jobs.values() if not j.finished]
+            if not running:
+                return
+            for job_id in await asyncio.to_thread(self._store.cancel_requested, running):
+                job = self._jobs.get(job_id)
+                if job is not None and job.task is not None:
+                    job.task.cancel()
+            await asyncio.sleep(REMOTE_POLL_INTERVAL)
+
+    async def shutdown(self):
+        """Cancel everything still running (app shutdown)."""
+        tasks = [j.task for j in self._jobs.values() if j.task is not None and not j.finished]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _prune(self):
+        now = time.time()
+        finished = [j for j in self._jobs.values() if j.finished]
+        expired = {j.id for j in finished if now - j.finished_at > JOB_TTL}
+        overflow = len(finished) - len(expired) - MAX_FINISHED_JOBS
+        if overflow > 0:
+            alive = sorted((j for j in finished if j.id not in expired), key=lambda j: j.finished_at)
+            expired.update(j.id for j in alive[:overflow])
+        for job_id in expired:
+            job = self._jobs.pop(job_id)
+            if job.request_id is not None:
+                self._by_request.pop((job.thread_id, job.request_id), None)
+        if expired and self._store is not None:
+            await asyncio.to_thread(self._store.prune, now - JOB_TTL)
+
+
+def _create_store() -> JobStore | None:
+    path = state_db_path()
+    return JobStore(path) if path is not None else None
+
+
+jobs = JobManager(_create_store())
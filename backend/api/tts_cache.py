@@ -0,0 +1,200 @@
+"""
+TTS Cache - synthesised speech kept on disk, keyed by a hash of what was said.
+
+Greetings, approval prompts and error messages come up again and again, so
+every MP3 that /api/voice/tts produces is stored under
+sha256(model, voice, text) in TTS_CACHE_DIR. The directory is an LRU bounded
+by TTS_CACHE_MAX_BYTES: hits refresh a file's mtime and the least recently
+used files are deleted once the total goes over the limit.
+
+When a chat turn is sent with voice on, the reply is split into the same
+sentence chunks the frontend plays (≤150 chars) and synthesised in the
+background as soon as the turn finishes, so by the time the browser asks for
+a chunk it is usually cached — or at least already on its way:
+
+  tts_cache.presynthesize(reply)      # after the run
+  path = await tts_cache.lookup(text) # in the endpoint: hit, or waits for a pending synthesis
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from backend.tracing import TTS_CACHE
+
+log = logging.getLogger(__name__)
+
+TTS_MODEL = "tts-1"
+TTS_VOICE = "nova"
+TTS_CACHE_DIR = Path(os.getenv("TTS_CACHE_DIR", str(Path.home() / ".roomie" / "tts_cache"))).expanduser()
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "200")) * 1024 * 1024
+TTS_PRESYNTH = os.getenv("TTS_PRESYNTH", "1") != "0"
+
+CHUNK_CHARS = 150  # must match playTTS() in frontend/src/hooks/useChat.ts
+STREAM_CHUNK_BYTES = 1024
+
+
+def speech_key(text: str) -> str:
+    return hashlib.sha256(f"{TTS_MODEL}\0{TTS_VOICE}\0{text}".encode()).hexdigest()
+
+
+def split_chunks(text: str) -> list[str]:
+    """Sentence chunks of at most ~CHUNK_CHARS, exactly as the frontend splits a reply."""
+    if not text.strip():
+        return []
+    sentences = re.findall(r"[^.!?]+[.!?]+", text) or [text]
+    chunks, current = [], ""
+    for s in sentences:
+        if len(current + s) > CHUNK_CHARS and current:
+            chunks.append(current.strip())
+            current = s
+        else:
+            current += s
+    if current.strip():
+        chunks.append(current.strip())
+    return chunks
+
+
+class AudioCache:
+    """Size-bounded LRU of MP3 files. The index is per process; the directory is shared.
+
+    get/put run in asyncio.to_thread workers, so the index is guarded by a lock.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] | None = None  # key -> size, least recently used first
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        return self.root / f"{key}.mp3"
+
+    def _load(self):
+        """Build the index from the directory on first use (lock held)."""
+        if self._index is not None:
+            return
+        self._index, self._total = OrderedDict(), 0
+        try:
+            files = sorted(self.root.glob("*.mp3"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            files = []
+        for p in files:
+            size = p.stat().st_size
+            self._index[p.stem] = size
+            self._total += size
+
+    def get(self, key: str) -> Path | None:
+        """Path of a cached file (marked as recently used), or None."""
+        path = self.path(key)
+        with self._lock:
+            self._load()
+            try:
+                os.utime(path)  # LRU order survives restarts and is shared between processes
+                size = None if key in self._index else path.stat().st_size
+            except OSError:
+                if key in self._index:
+                    self._total -= self._index.pop(key)
+                return None
+            if size is not None:  # written by another process
+                self._index[key] = size
+                self._total += size
+            self._index.move_to_end(key)
+        return path
+
+    def put(self, key: str, data: bytes):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.root / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        tmp.replace(self.path(key))  # atomic: readers never see a partial file
+        with self._lock:
+            self._load()
+            if key in self._index:
+                self._total -= self._index.pop(key)
+            self._index[key] = len(data)
+            self._total += len(data)
+            self._evict()
+
+    def _evict(self):
+        """Delete least recently used files until under max_bytes (lock held)."""
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                self.path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+
+cache = AudioCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+_pending: dict[str, asyncio.Task] = {}  # key -> background synthesis
+
+
+async def synthesize(text: str):
+    """Stream speech for `text` from OpenAI; the complete MP3 is stored in the cache.
+
+    A stream that is abandoned half way (client went away) is not stored.
+    """
+    from backend.openai_pool import get_openai
+
+    audio = bytearray()
+    async with get_openai().audio.speech.with_streaming_response.create(
+        model=TTS_MODEL,
+        voice=TTS_VOICE,
+        input=text,
+    ) as response:
+        async for chunk in response.iter_bytes(STREAM_CHUNK_BYTES):
+            audio.extend(chunk)
+            yield chunk
+    try:
+        await asyncio.to_thread(cache.put, speech_key(text), bytes(audio))
+    except OSError as e:
+        log.warning(f"[TTS] Could not cache audio: {e}")
+
+
+async def lookup(text: str) -> Path | None:
+    """The cached file for `text`, waiting for a pending pre-synthesis if there is one."""
+    key = speech_key(text)
+    path = await asyncio.to_thread(cache.get, key)
+    if path is None and key in _pending:
+        TTS_CACHE.inc({"result": "pending"})
+        try:
+            await asyncio.shield(_pending[key])
+        except Exception:
+            return None
+        path = await asyncio.to_thread(cache.get, key)
+    elif path is not None:
+        TTS_CACHE.inc({"result": "hit"})
+    if path is None:
+        TTS_CACHE.inc({"result": "miss"})
+    return path
+
+
+async def _presynthesize_one(text: str):
+    async for _ in synthesize(text):
+        pass
+
+
+def presynthesize(reply: str):
+    """Start synthesising every chunk of an assistant reply in the background."""
+    if not TTS_PRESYNTH:
+        return
+    for text in split_chunks(reply):
+        key = speech_key(text)
+        if key in _pending or cache.path(key).exists():
+            continue
+        task = asyncio.create_task(_presynthesize_one(text))
+        _pending[key] = task
+
+        def done(t: asyncio.Task, key=key):
+            _pending.pop(key, None)
+            if not t.cancelled() and t.exception() is not None:
+                log.warning(f"[TTS] Pre-synthesis failed: {t.exception()}")
+
+        task.add_done_callback(done)
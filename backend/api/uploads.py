@@ -0,0 +1,161 @@
+"""
+Uploads - room photos sent as a raw or multipart body, stored by id.
+
+Photos used to travel as base64 inside the ChatRequest JSON: a third bigger,
+parsed in one go on the event loop, and resent on every turn. Now the
+browser uploads the file once to /api/uploads/image and puts the returned
+image_id in its chat message:
+
+  - the body is streamed into a SpooledTemporaryFile (memory up to
+    SPOOL_MAX_MEMORY, then disk) and capped at UPLOAD_MAX_BYTES as it is
+    read (a multipart body gets MULTIPART_OVERHEAD on top for its framing)
+  - decoding, EXIF rotation and downscaling to IMAGE_MAX_SIDE run in a
+    worker thread; the result is kept as a JPEG in UPLOAD_DIR. Images past
+    Pillow's decompression-bomb limit are rejected as too large
+  - files older than UPLOAD_TTL_HOURS (and .tmp files left by a crash) are
+    removed as new ones come in
+
+Voice recordings for /api/voice/transcribe are spooled the same way, capped
+at VOICE_MAX_BYTES (Whisper's own 25MB limit by default).
+
+Without Pillow the photo is stored as uploaded.
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", str(Path.home() / ".roomie" / "uploads"))).expanduser()
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_MB", "20")) * 1024 * 1024
+VOICE_MAX_BYTES = int(os.getenv("VOICE_MAX_MB", "25")) * 1024 * 1024
+UPLOAD_TTL_HOURS = float(os.getenv("UPLOAD_TTL_HOURS", "24"))
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1536"))  # vision models downscale past this anyway
+IMAGE_JPEG_QUALITY = 85
+SPOOL_MAX_MEMORY = 1024 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file
+PRUNE_INTERVAL = 3600.0  # seconds
+
+_IMAGE_ID = re.compile(r"[0-9a-f]{32}")
+_last_prune = 0.0
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def too_large(max_bytes: int = UPLOAD_MAX_BYTES) -> UploadTooLarge:
+    return UploadTooLarge(f"upload is larger than {max_bytes // (1024 * 1024)}MB")
+
+
+async def limit(chunks, max_bytes: int = UPLOAD_MAX_BYTES, overhead: int = 0):
+    """Pass byte chunks through, raising UploadTooLarge once more than `max_bytes` + `overhead` have come in."""
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes + overhead:
+            raise too_large(max_bytes)
+        yield chunk
+
+
+async def spool(chunks, max_bytes: int = UPLOAD_MAX_BYTES):
+    """Write an async iterator of byte chunks to a spooled temp file, rewound for reading."""
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    size = 0
+    try:
+        async for chunk in limit(chunks, max_bytes):
+            size += len(chunk)
+            # Past SPOOL_MAX_MEMORY the file is (or is about to roll over) on disk
+            if size > SPOOL_MAX_MEMORY:
+                await asyncio.to_thread(f.write, chunk)
+            else:
+                f.write(chunk)
+    except BaseException:
+        f.close()
+        raise
+    f.seek(0)
+    return f
+
+
+def _image_path(image_id: str) -> Path | None:
+    if not _IMAGE_ID.fullmatch(image_id or ""):
+        return None
+    return UPLOAD_DIR / f"{image_id}.jpg"
+
+
+def _prune():
+    global _last_prune
+    now = time.time()
+    if now - _last_prune < PRUNE_INTERVAL:
+        return
+    _last_prune = now
+    cutoff = now - UPLOAD_TTL_HOURS * 3600
+    for pattern in ("*.jpg", "*.tmp"):
+        for path in UPLOAD_DIR.glob(pattern):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+def _store_image(f) -> str:
+    """Decode, orient, downscale and save an uploaded photo (runs in a worker thread)."""
+    image_id = uuid.uuid4().hex
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = _image_path(image_id)
+    tmp = path.with_suffix(".tmp")
+    try:
+        try:
+            from PIL import Image, ImageOps, UnidentifiedImageError
+        except ImportError:
+            with open(tmp, "wb") as out:
+                shutil.copyfileobj(f, out)
+        else:
+            try:
+                with Image.open(f) as img:
+                    img = ImageOps.exif_transpose(img)
+                    img.thumbnail((IMAGE_MAX_SIDE, IMAGE_MAX_SIDE))
+                    img.convert("RGB").save(tmp, "JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True)
+            except Image.DecompressionBombError as e:
+                raise UploadTooLarge(str(e)) from e
+            except (UnidentifiedImageError, OSError, ValueError, SyntaxError) as e:
+                # Pillow reports truncated/corrupt files through all of these
+                raise InvalidImage(str(e)) from e
+        tmp.replace(path)
+    finally:
+        # A partial JPEG from a failed save; gone already after the replace
+        tmp.unlink(missing_ok=True)
+    _prune()
+    return image_id
+
+
+async def store_image(f) -> str:
+    """Store an uploaded photo and return its image_id."""
+    try:
+        image_id = await asyncio.to_thread(_store_image, f)
+    finally:
+        f.close()
+    log.info(f"[UPLOAD] Stored image {image_id}")
+    return image_id
+
+
+def load_image_base64(image_id: str) -> str | None:
+    """The stored JPEG as base64 for a vision message, or None if unknown/expired."""
+    path = _image_path(image_id)
+    try:
+        return base64.b64encode(path.read_bytes()).decode() if path else None
+    except FileNotFoundError:
+        return None
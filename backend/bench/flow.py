@@ -0,0 +1,186 @@
+"""
+End-to-end latency benchmark — replays a full chat → dispatch → workers →
+approval → messaging flow through the real FastAPI app, offline.
+
+Record a cassette once against gpt-5 and live browsers:
+  python -m backend.bench.flow --record
+Then replay it as often as you like (no network, no MCP servers):
+  python -m backend.bench.flow --iterations 20
+
+The committed tests/fixtures/cassettes/full_flow.json was recorded offline,
+with the stub model against the fake marketplace on the default ports:
+  python -m backend.browser.fake_marketplace --ports 3001 3002 &
+  ROOMIE_MODEL=stub python -m backend.bench.flow --record
+so its "live cost" is the fake browsers' injected latency; re-record against
+gpt-5 and real browsers for the live numbers.
+
+Because replayed model/tool calls return immediately, request wall time in
+replay mode is the framework's own overhead (graph scheduling, checkpointing,
+serialization). The report also shows what the recorded calls cost live.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from pathlib import Path
+
+SCENARIO_DIR = Path(__file__).resolve().parent.parent.parent / "tests" / "fixtures" / "scenarios"
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(values: list[float]) -> str:
+    if not values:
+        return "n/a"
+    return f"mean {statistics.mean(values):8.1f}  p50 {percentile(values, 0.5):8.1f}  p95 {percentile(values, 0.95):8.1f}"
+
+
+class SerdeTimer:
+    """Times the checkpointer's (de)serialization by wrapping its serde in place."""
+
+    def __init__(self, serde):
+        self.seconds = 0.0
+        self.calls = 0
+        for name in ("dumps_typed", "loads_typed"):
+            inner = getattr(serde, name, None)
+            if inner is not None:
+                setattr(serde, name, self._wrap(inner))
+
+    def _wrap(self, fn):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - start
+                self.calls += 1
+        return timed
+
+
+async def _run_step(client, step: dict, thread_id: str) -> tuple[float, float, list[dict]]:
+    """POST one scenario step and read its SSE stream. Returns (wall s, encode s, payloads)."""
+    body = {**step["body"], "thread_id": thread_id}
+    start = time.perf_counter()
+    response = await client.post(step["endpoint"], json=body)
+    wall = time.perf_counter() - start
+    response.raise_for_status()
+
+    payloads = []
+    for line in response.text.splitlines():
+        if line.startswith("data: ") and line != "data: [DONE]":
+            payloads.append(json.loads(line[6:]))
+    # Re-encode to measure the SSE serialization cost of these payloads
+    encode_start = time.perf_counter()
+    for payload in payloads:
+        json.dumps(payload)
+    return wall, time.perf_counter() - encode_start, payloads
+
+
+async def run(scenario: dict, iterations: int) -> dict:
+    import httpx
+    from backend import main, replay, tracing
+
+    agent = await main.get_agent()
+    serde = SerdeTimer(agent.checkpointer.serde)
+    cassette = replay.get_cassette()
+    transport = httpx.ASGITransport(app=main.app)
+
+    step_wall: dict[str, list[float]] = {s["name"]: [] for s in scenario["steps"]}
+    step_live: dict[str, list[float]] = {s["name"]: [] for s in scenario["steps"]}
+    encode_ms: list[float] = []
+    serde_ms: list[float] = []
+    node_ms: dict[str, list[float]] = {}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for _ in range(iterations):
+            thread_id = f"bench-{uuid.uuid4()}"
+            if cassette is not None and replay.mode() == "replay":
+                cassette.rewind()
+            serde.seconds = 0.0
+            interrupted = False
+            encode = 0.0
+            for step in scenario["steps"]:
+                if step["endpoint"].endswith("/resume") and not interrupted:
+                    continue  # the recorded run never paused for approval
+                replayed_before = cassette.replayed_seconds if cassette else 0.0
+                wall, enc, payloads = await _run_step(client, step, thread_id)
+                step_wall[step["name"]].append(wall * 1000)
+                if cassette is not None:
+                    step_live[step["name"]].append((cassette.replayed_seconds - replayed_before) * 1000)
+                encode += enc
+                interrupted = any(p.get("interrupt") for p in payloads)
+            encode_ms.append(encode * 1000)
+            serde_ms.append(serde.seconds * 1000)
+            for event in tracing.get_trace(thread_id) or []:
+                if event["kind"] == "node":
+                    node_ms.setdefault(event["name"], []).append(event["duration_ms"])
+
+    return {
+        "iterations": iterations,
+        "steps": {name: {"wall_ms": walls, "recorded_live_ms": step_live[name]} for name, walls in step_wall.items()},
+        "sse_encode_ms": encode_ms,
+        "checkpoint_serde_ms": serde_ms,
+        "node_ms": node_ms,
+    }
+
+
+def report(results: dict) -> str:
+    lines = [f"Replayed {results['iterations']} iteration(s)", "", "Per step (ms)  — wall time is graph overhead in replay mode"]
+    for name, s in results["steps"].items():
+        lines.append(f"  {name:<24} wall      {summarize(s['wall_ms'])}")
+        if any(s["recorded_live_ms"]):
+            lines.append(f"  {'':<24} live cost {summarize(s['recorded_live_ms'])}")
+    lines += ["", "Serialization per iteration (ms)",
+              f"  {'checkpoint serde':<24} {summarize(results['checkpoint_serde_ms'])}",
+              f"  {'SSE json encode':<24} {summarize(results['sse_encode_ms'])}",
+              "", "Node latency (ms)"]
+    for name, values in sorted(results["node_ms"].items()):
+        lines.append(f"  {name:<24} {summarize(values)}  (n={len(values)})")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", default="full_flow", help="scenario name under tests/fixtures/scenarios")
+    parser.add_argument("--cassette", default=None, help="cassette file (default: <scenario>.json)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--record", action="store_true", help="run live once and save the cassette")
+    parser.add_argument("--json", dest="json_out", default=None, help="also write raw results to this file")
+    args = parser.parse_args()
+
+    cassette = args.cassette or f"{args.scenario}.json"
+    if not args.record:
+        from backend.replay import CASSETTE_DIR
+
+        path = Path(cassette) if os.path.isabs(cassette) else CASSETTE_DIR / cassette
+        if not path.exists():
+            raise SystemExit(f"No cassette at {path}: record one first with --record")
+
+    # Must be set before the app/agent are imported and built
+    os.environ["ROOMIE_REPLAY_MODE"] = "record" if args.record else "replay"
+    os.environ["ROOMIE_CASSETTE"] = cassette
+    if not args.record:
+        os.environ.setdefault("OPENAI_APIKEY", "replay")  # ChatOpenAI needs a key even offline
+
+    scenario = json.loads((SCENARIO_DIR / f"{args.scenario}.json").read_text())
+    results = asyncio.run(run(scenario, 1 if args.record else args.iterations))
+
+    if args.record:
+        from backend import replay
+        replay.get_cassette().save()
+    print(report(results))
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(results, indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Load test - hammers a backend's /api/chat with concurrent users.
+
+By default it runs fully offline: it starts the fake marketplace and a
+backend whose chat model is the scripted stub (ROOMIE_MODEL=stub, see
+backend/bench/stub_model.py), runs the flows, and stops them again. No
+network, FB account or OpenAI key is needed, and the numbers are this
+server's own — not the model vendor's latency and rate limits:
+
+  python -m backend.bench.load --users 8 --flows 40
+
+To load an already running backend instead (e.g. against live browsers or
+gpt-5, which costs real tokens per flow), pass its URL:
+
+  python -m backend.bench.load --url http://localhost:8000
+
+Each flow plays a scenario (tests/fixtures/scenarios) on a fresh thread_id.
+A flow counts as completed only if every step streamed to the end and its
+job finished "done"; flows turned away by admission (429) are reported as
+rejected, and anything else (other status codes, job errors, client
+exceptions) as failed. Reports throughput, per-step time-to-first-event and
+total latency percentiles, status codes, and the server-side browser pool /
+MCP tool / worker timings accumulated in /metrics during the run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from backend.bench.flow import SCENARIO_DIR, percentile
+
+_SERIES = re.compile(r'^(\w+)_(sum|count)(\{[^}]*\})? ([0-9.e+-]+)$')
+LOCAL_PORT = 8100  # the offline stack stays clear of a dev server on 8000 and browsers on 3001+
+LOCAL_BROWSER_PORT = 3101
+LOCAL_READY_TIMEOUT = 120  # seconds for the agent to warm up
+REPORTED_METRICS = {
+    "roomie_browser_lease_wait_seconds": "browser lease wait",
+    "roomie_mcp_tool_latency_seconds": "MCP tool call",
+    "roomie_node_latency_seconds": "graph node",
+}
+
+
+async def _scrape(client) -> dict[tuple[str, str], list[float]]:
+    """(metric, labels) -> [sum, count] for the histograms we report."""
+    try:
+        text = (await client.get("/metrics")).text
+    except Exception:
+        return {}
+    series: dict[tuple[str, str], list[float]] = {}
+    for line in text.splitlines():
+        match = _SERIES.match(line)
+        if match and match.group(1) in REPORTED_METRICS:
+            entry = series.setdefault((match.group(1), match.group(3) or ""), [0.0, 0.0])
+            entry[0 if match.group(2) == "sum" else 1] = float(match.group(4))
+    return series
+
+
+async def _step(client, step: dict, thread_id: str, stats: dict) -> str:
+    """Stream one step. Returns "ok", "interrupted" (paused for approval), "rejected" or "failed"."""
+    body = {**step["body"], "thread_id": thread_id}
+    start = time.perf_counter()
+    first_event = None
+    interrupted = finished = False
+    job_id = None
+    async with client.stream("POST", step["endpoint"], json=body) as response:
+        stats["status"][f"{step['name']} {response.status_code}"] += 1
+        if response.status_code != 200:
+            await response.aread()
+            return "rejected" if response.status_code == 429 else "failed"
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            if line == "data: [DONE]":
+                finished = True
+                continue
+            event = json.loads(line[6:])
+            job_id = event.get("job_id", job_id)
+            if event.get("interrupt"):
+                interrupted = True
+    if not finished or job_id is None:
+        return "failed"
+    # The stream ends the same way for a failed run; the job knows which it was
+    status = (await client.get(f"/api/jobs/{job_id}", params={"after": 1 << 30})).json().get("status")
+    if status != "done":
+        stats["job_status"][f"{step['name']} {status}"] += 1
+        return "failed"
+    stats["ttfe"].setdefault(step["name"], []).append((first_event or 0) * 1000)
+    stats["total"].setdefault(step["name"], []).append((time.perf_counter() - start) * 1000)
+    return "interrupted" if interrupted else "ok"
+
+
+async def _user(client, scenario: dict, queue: asyncio.Queue, stats: dict):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        thread_id = f"load-{uuid.uuid4()}"
+        outcome = "ok"
+        try:
+            for step in scenario["steps"]:
+                if step["endpoint"].endswith("/resume") and outcome != "interrupted":
+                    continue
+                outcome = await _step(client, step, thread_id, stats)
+                if outcome in ("rejected", "failed"):
+                    break
+        except Exception as e:
+            stats["errors"][type(e).__name__] += 1
+            outcome = "failed"
+        stats["completed" if outcome in ("ok", "interrupted") else outcome] += 1
+
+
+async def run(base_url: str, scenario: dict, users: int, flows: int, timeout: float) -> dict:
+    import httpx
+
+    stats = {
+        "ttfe": {}, "total": {}, "status": Counter(), "job_status": Counter(), "errors": Counter(),
+        "completed": 0, "rejected": 0, "failed": 0,
+    }
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(flows):
+        queue.put_nowait(i)
+
+    limits = httpx.Limits(max_connections=users + 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        before = await _scrape(client)
+        start = time.perf_counter()
+        await asyncio.gather(*(_user(client, scenario, queue, stats) for _ in range(users)))
+        stats["elapsed"] = time.perf_counter() - start
+        after = await _scrape(client)
+
+    server = {}
+    for key, (total, count) in after.items():
+        prev_total, prev_count = before.get(key, (0.0, 0.0))
+        if count > prev_count:
+            server[key] = ((total - prev_total) / (count - prev_count) * 1000, int(count - prev_count))
+    stats["server"] = server
+    return stats
+
+
+def report(stats: dict, users: int) -> str:
+    elapsed = stats["elapsed"]
+    lines = [
+        f"{stats['completed']} flows in {elapsed:.1f}s with {users} users "
+        f"— {stats['completed'] / elapsed * 60:.1f} flows/min "
+        f"({stats['rejected']} rejected, {stats['failed']} failed)",
+        "",
+        f"{'step':<16} {'':<6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)",
+    ]
+    for name in stats["total"]:
+        for label, values in (("first", stats["ttfe"][name]), ("total", stats["total"][name])):
+            lines.append(f"{name:<16} {label:<6} " + " ".join(
+                f"{percentile(values, q):9.0f}" for q in (0.5, 0.95, 0.99, 1.0)))
+    lines += ["", "Responses: " + ", ".join(f"{k}: {v}" for k, v in sorted(stats["status"].items()))]
+    if stats["job_status"]:
+        lines.append("Failed jobs: " + ", ".join(f"{k}: {v}" for k, v in sorted(stats["job_status"].items())))
+    if stats["errors"]:
+        lines.append("Client errors: " + ", ".join(f"{k}: {v}" for k, v in stats["errors"].items()))
+    if stats["server"]:
+        lines += ["", "Server side during the run (mean ms, n)"]
+        for (metric, labels), (mean, count) in sorted(stats["server"].items()):
+            lines.append(f"  {REPORTED_METRICS[metric]:<20} {labels:<48} {mean:9.1f}  {count}")
+    return "\n".join(lines)
+
+
+def _wait_ready(url: str, procs: list[subprocess.Popen]):
+    import httpx
+
+    deadline = time.monotonic() + LOCAL_READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if any(p.poll() is not None for p in procs):
+            raise SystemExit("The offline stack exited during start-up; see its output above")
+        try:
+            if httpx.get(f"{url}/health", timeout=2).json().get("agent") == "warm":
+                return
+        except (httpx.HTTPError, ValueError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"The offline backend wasn't ready after {LOCAL_READY_TIMEOUT}s")
+
+
+@contextmanager
+def offline_stack(browsers: int):
+    """Fake marketplace + a backend on the stub model, for the duration of the block."""
+    ports = [str(LOCAL_BROWSER_PORT + i) for i in range(browsers)]
+    env = {
+        **os.environ,
+        "ROOMIE_MODEL": "stub",
+        "PLAYWRIGHT_MCP_URLS": ",".join(f"http://127.0.0.1:{p}/sse" for p in ports),
+        "STARTUP_WARM": "1",
+    }
+    procs = [subprocess.Popen([sys.executable, "-m", "backend.browser.fake_marketplace", "--ports", *ports])]
+    try:
+        time.sleep(1)  # let the fake browsers bind before the backend loads their tools
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(LOCAL_PORT), "--log-level", "warning"],
+            env=env,
+        ))
+        url = f"http://127.0.0.1:{LOCAL_PORT}"
+        _wait_ready(url, procs)
+        yield url
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="backend to load (default: start the offline stack)")
+    parser.add_argument("--browsers", type=int, default=2, help="fake browsers in the offline stack")
+    parser.add_argument("--scenario", default="full_flow")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--flows", type=int, default=20, help="total scenario runs")
+    parser.add_argument("--timeout", type=float, default=600, help="per-request timeout (s)")
+    args = parser.parse_args()
+
+    scenario = json.loads((SCENARIO_DIR / f"{args.scenario}.json").read_text())
+    if args.url is not None:
+        stats = asyncio.run(run(args.url, scenario, args.users, args.flows, args.timeout))
+    else:
+        with offline_stack(args.browsers) as url:
+            stats = asyncio.run(run(url, scenario, args.users, args.flows, args.timeout))
+    print(report(stats, args.users))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Stub Chat Model - a scripted stand-in for gpt-5, so benchmarks run offline.
+
+ROOMIE_MODEL=stub swaps the shared chat model (backend/agent/models.py) for
+StubChatModel. It plays the happy path of the full flow against the fake
+marketplace (backend/browser/fake_marketplace.py) the way gpt-5 does:
+
+  orchestrator   dispatch_searches for the furniture named in the brief, then
+                 propose_shortlist with the top pick per item (with drafts)
+  search worker  navigate + snapshot each task's search page, [WORKER_RESULTS]
+  messaging      open the listing, click Message, type and send, [MESSAGING_RESULTS]
+
+Each call waits STUB_MODEL_LATENCY_MS (default 0) and reports a rough token
+usage, so load test numbers measure this server — graph, pool, browsers,
+checkpointer — rather than the model vendor's latency and rate limits.
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+from urllib.parse import quote_plus, urljoin
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from backend.browser.prefetch import find_message_button_ref
+from backend.ratelimit import estimate_tokens
+from backend.search.scraper import find_all_categories
+
+STUB_MODEL_LATENCY_MS = float(os.getenv("STUB_MODEL_LATENCY_MS", "0"))
+BASE_URL = "https://www.facebook.com"
+SEARCH_URL = BASE_URL + "/marketplace/brisbane/search?query={query}&maxPrice={budget}"
+PICKS_PER_TASK = 3
+DEFAULT_BUDGET = 1000
+
+_STATE = re.compile(r"\[STUB_STATE\](.*?)\[/STUB_STATE\]", re.DOTALL)
+_TASK = re.compile(r"### Task \d+: (.+)\n- \*\*Style\*\*:.*\n- \*\*Max Budget\*\*: \$(\d+)")
+_LISTING = re.compile(r'- link "(.+) in ([^"]+?) A\$([\d.]+)" \[ref=e\d+\][^\n]*\n\s*- /url: (\S+)')
+_RESULT_PICK = re.compile(r"\d+\. \*\*(.+?)\*\* — \$(\S+) on (\S+)\n.*\n.*\n\s+URL: (\S+)")
+_MESSAGING_TASK = re.compile(r"- \*\*Listing URL\*\*: (\S+)\n- \*\*Seller\*\*: .*\n- \*\*Message to send\*\*: (.*)")
+_HINT_REF = re.compile(r"The message button is ref=(e\d+)")
+_TEXTBOX = re.compile(r'- textbox "Please type your message[^"]*"[^\n]*\[ref=(e\d+)\]')
+_BUDGET = re.compile(r"\$\s?(\d[\d,]*)")
+# Notes the graph itself adds to the conversation; only user turns start a search
+_GRAPH_NOTES = ("## ", "No worker results", "No messaging results", "User approved", "User rejected")
+
+
+def _text(message) -> str:
+    content = message.content
+    if isinstance(content, list):
+        return "\n".join(p.get("text", "") if isinstance(p, dict) else str(p) for p in content)
+    return str(content)
+
+
+def _call(name: str, content: str = "", **args) -> AIMessage:
+    return AIMessage(content=content, tool_calls=[{"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}"}])
+
+
+def _since_last_reply(messages) -> list:
+    """Tool results (and notes) after the latest AI message."""
+    tail = []
+    for m in reversed(messages):
+        if isinstance(m, AIMessage):
+            break
+        tail.append(m)
+    return tail[::-1]
+
+
+class StubChatModel:
+    """Duck-types the bits of a chat model the graph uses: bind_tools and ainvoke."""
+
+    def __init__(self, tool_names: frozenset[str] = frozenset()):
+        self.tool_names = tool_names
+
+    def bind_tools(self, tools, **kwargs) -> "StubChatModel":
+        return StubChatModel(frozenset(getattr(t, "name", None) or t.__name__ for t in tools))
+
+    async def ainvoke(self, messages, config=None, **kwargs) -> AIMessage:
+        if STUB_MODEL_LATENCY_MS:
+            await asyncio.sleep(STUB_MODEL_LATENCY_MS / 1000)
+        system = _text(messages[0]) if messages and isinstance(messages[0], SystemMessage) else ""
+        if "dispatch_searches" in self.tool_names:
+            response = self._orchestrator(messages)
+        elif "## Your Messaging Task" in system:
+            response = self._messaging(system, messages)
+        else:
+            response = self._search(system, messages)
+        output_tokens = len(_text(response)) // 4 + 20 * len(response.tool_calls)
+        input_tokens = estimate_tokens(messages)
+        response.usage_metadata = {
+            "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+        }
+        return response
+
+    # ---- Orchestrator ----
+
+    def _orchestrator(self, messages) -> AIMessage:
+        last = messages[-1]
+        text = _text(last)
+        if isinstance(last, HumanMessage) and text.startswith("## Search Results from Workers"):
+            return self._propose(text)
+        if isinstance(last, HumanMessage) and not text.startswith(_GRAPH_NOTES):
+            item_types = find_all_categories(text)
+            if item_types:
+                budget = _BUDGET.search(text)
+                total = int(budget.group(1).replace(",", "")) if budget else DEFAULT_BUDGET
+                tasks = [
+                    {
+                        "id": f"task_{i}",
+                        "item_type": item_type,
+                        "style_keywords": [],
+                        "max_budget": total // len(item_types),
+                        "marketplace": "facebook",
+                        "constraints": "pickup Brisbane",
+                    }
+                    for i, item_type in enumerate(item_types, 1)
+                ]
+                return _call("dispatch_searches", f"Searching for {', '.join(item_types)} now!", tasks_json=json.dumps(tasks))
+        if text.startswith("## Messaging Results"):
+            return AIMessage(content="All done — your messages are on their way to the sellers.")
+        return AIMessage(content="Tell me which pieces you're after and your budget, and I'll start searching.")
+
+    def _propose(self, summary: str) -> AIMessage:
+        items = []
+        for section in summary.split("\n### ")[1:]:
+            match = _RESULT_PICK.search(section)
+            if match is None:
+                continue
+            title, price, source, url = match.groups()
+            items.append({
+                "id": f"pick_{len(items) + 1}",
+                "title": title,
+                "price": float(price) if price.replace(".", "", 1).isdigit() else None,
+                "source": source,
+                "url": url,
+                "draft_message": f"Hi! Is your {title} still available? I can pick it up in Brisbane this week.",
+            })
+        if not items:
+            return AIMessage(content="The workers didn't find anything suitable this time.")
+        return _call("propose_shortlist", f"Here are my top {len(items)} picks.", items_json=json.dumps(items))
+
+    # ---- Search worker ----
+
+    def _search(self, system: str, messages) -> AIMessage:
+        tasks = _TASK.findall(system)
+        previous = next((m for m in reversed(messages) if isinstance(m, AIMessage)), None)
+        found = _STATE.search(_text(previous)) if previous is not None else None
+        state = json.loads(found.group(1)) if found else {"task": 0, "picks": []}
+
+        results = [m for m in _since_last_reply(messages) if isinstance(m, ToolMessage)]
+        if results and results[-1].name == "browser_navigate":
+            return self._with_state(state, "browser_snapshot")
+        if results and results[-1].name == "browser_snapshot":
+            item_type = tasks[state["task"]][0] if state["task"] < len(tasks) else ""
+            for title, location, price, href in _LISTING.findall(_text(results[-1]))[:PICKS_PER_TASK]:
+                state["picks"].append({
+                    "title": title,
+                    "price": float(price),
+                    "source": "facebook",
+                    "url": urljoin(BASE_URL, href.split("?")[0]),
+                    "location": location,
+                    "reason": f"Good value {item_type} within budget",
+                })
+            state["task"] += 1
+
+        if state["task"] < len(tasks):
+            item_type, budget = tasks[state["task"]]
+            url = SEARCH_URL.format(query=quote_plus(item_type), budget=budget)
+            return self._with_state(state, "browser_navigate", url=url)
+        return AIMessage(content=f"[WORKER_RESULTS]\n{json.dumps({'picks': state['picks']})}\n[/WORKER_RESULTS]")
+
+    @staticmethod
+    def _with_state(state: dict, tool: str, **args) -> AIMessage:
+        return _call(tool, f"[STUB_STATE]{json.dumps(state)}[/STUB_STATE]", **args)
+
+    # ---- Messaging worker ----
+
+    def _messaging(self, system: str, messages) -> AIMessage:
+        task = _MESSAGING_TASK.search(system)
+        url, message = task.groups() if task else ("", "")
+        results = [m for m in _since_last_reply(messages) if isinstance(m, ToolMessage)]
+        if not results:
+            hint = "\n".join(_text(m) for m in messages if isinstance(m, HumanMessage))
+            ref = _HINT_REF.search(hint)
+            if ref:
+                return _call("browser_click", element="Message", ref=ref.group(1))
+            if "ALREADY OPEN" in hint:
+                return _call("browser_snapshot")
+            return _call("browser_navigate", url=url)
+
+        page = _text(results[-1])
+        if "You sent" in page:
+            return self._messaging_result(True, "Message sent")
+        textbox = _TEXTBOX.search(page)
+        if textbox:
+            return _call("browser_type", element="Message", ref=textbox.group(1), text=message, submit=True)
+        ref = find_message_button_ref(page)
+        if ref:
+            return _call("browser_click", element="Message", ref=ref)
+        return self._messaging_result(False, "Could not find the Message button")
+
+    @staticmethod
+    def _messaging_result(success: bool, reasoning: str) -> AIMessage:
+        body = json.dumps({"success": success, "reasoning": reasoning})
+        return AIMessage(content=f"[MESSAGING_RESULTS]\n{body}\n[/MESSAGING_RESULTS]")
@@ -0,0 +1,294 @@
+"""
+Lease Broker - cross-process leases over a local unix socket.
+
+With several API processes (uvicorn --workers N) the browsers and the
+per-thread "one run at a time" rule have to be arbitrated outside any one
+process. Set POOL_BROKER_SOCKET and every process leases through a tiny
+broker instead of its in-memory pool:
+
+  client → {"pool": "browsers", "items": ["A", "B"], "prefer": "A", "priority": 1, "preemptible": false}
+  broker → {"granted": "A"}            (sent when an item is free)
+  broker → {"preempt": true}           (an urgent waiter wants a preemptible lease back)
+
+Waiters are served by priority (0 most urgent), FIFO within a priority, and
+a waiter's priority rises one level every LEASE_AGING_SECONDS it waits so
+background work is never starved. When a priority-0 waiter finds nothing
+free, holders of preemptible leases are asked to give theirs back. The same
+LeaseQueue schedules the in-process browser pool when there is no broker.
+
+A lease is held for as long as the client keeps that connection open, so a
+crashed process releases everything it held. The first process to take the
+lock file next to the socket hosts the broker in-process; the others connect
+to it (and take over if the host goes away). A host that goes away takes its
+queues with it, so the connection is the lease on the client side too: when
+it hits EOF the holder's block is cancelled and LeaseLost raised, rather than
+carrying on with an item the new host may grant to someone else. It can also
+run standalone:
+
+  python -m backend.broker
+"""
+
+import asyncio
+import fcntl
+import itertools
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+POOL_BROKER_SOCKET = os.getenv("POOL_BROKER_SOCKET", "")
+CONNECT_RETRIES = 3
+URGENT = 0  # waiters at this priority may preempt preemptible holders
+DEFAULT_PRIORITY = 1
+LEASE_AGING_SECONDS = float(os.getenv("LEASE_AGING_SECONDS", "30"))  # waiting this long = one level more urgent
+
+
+def enabled() -> bool:
+    return bool(POOL_BROKER_SOCKET)
+
+
+_arrivals = itertools.count()
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    prefer: str | None
+    priority: int
+    on_preempt: object = None  # callable, if the lease may be taken back
+    enqueued_at: float = field(default_factory=time.monotonic)
+    arrival: int = field(default_factory=lambda: next(_arrivals))
+
+    def rank(self, now: float) -> tuple[float, int]:
+        return self.priority - (now - self.enqueued_at) / LEASE_AGING_SECONDS, self.arrival
+
+
+class LeaseQueue:
+    """Free items and prioritised waiters of one pool."""
+
+    def __init__(self, items: list[str]):
+        self.items = items
+        self.free: list[str] = list(items)
+        self.waiters: list[_Waiter] = []
+        self.holders: dict[str, _Waiter] = {}
+        self._preempted: set[str] = set()
+
+    def enqueue(self, future: asyncio.Future, prefer: str | None = None,
+                priority: int = DEFAULT_PRIORITY, on_preempt=None):
+        self.waiters.append(_Waiter(future, prefer, priority, on_preempt))
+        self.grant()
+
+    def discard(self, future: asyncio.Future):
+        self.waiters = [w for w in self.waiters if w.future is not future]
+
+    def grant(self):
+        """Hand free items to the most urgent waiters, then preempt for urgent ones left waiting."""
+        self.waiters = [w for w in self.waiters if not w.future.done()]
+        now = time.monotonic()
+        self.waiters.sort(key=lambda w: w.rank(now))
+        while self.free and self.waiters:
+            waiter = self.waiters.pop(0)
+            item = waiter.prefer if waiter.prefer in self.free else self.free[0]
+            self.free.remove(item)
+            self.holders[item] = waiter
+            waiter.future.set_result(item)
+
+        urgent = sum(1 for w in self.waiters if w.priority <= URGENT)
+        for item, holder in self.holders.items():
+            if urgent <= len(self._preempted):
+                break
+            if holder.on_preempt is not None and item not in self._preempted:
+                self._preempted.add(item)
+                log.info(f"[BROKER] Preempting {item} (priority {holder.priority}) for an urgent lease")
+                holder.on_preempt()
+
+    async def acquire(self, prefer: str | None = None, priority: int = DEFAULT_PRIORITY, on_preempt=None) -> str:
+        """Wait for an item in-process (the broker does the same for remote clients)."""
+        future = asyncio.get_running_loop().create_future()
+        self.enqueue(future, prefer, priority, on_preempt)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())  # granted just as we were cancelled
+            else:
+                self.discard(future)
+            raise
+
+    def release(self, item: str):
+        self.holders.pop(item, None)
+        self._preempted.discard(item)
+        if item in self.items and item not in self.free:
+            self.free.append(item)
+        self.grant()
+
+    @property
+    def idle(self) -> bool:
+        return len(self.free) == len(self.items) and not self.waiters
+
+
+class Broker:
+    def __init__(self):
+        self._pools: dict[str, LeaseQueue] = {}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pool_name, item = None, None
+        try:
+            request = json.loads(await reader.readline())
+            pool_name = request["pool"]
+            pool = self._pools.get(pool_name)
+            if pool is None:
+                pool = self._pools[pool_name] = LeaseQueue(request["items"])
+            future = asyncio.get_running_loop().create_future()
+
+            def preempt():
+                writer.write(b'{"preempt": true}\n')
+
+            pool.enqueue(
+                future,
+                request.get("prefer"),
+                request.get("priority", DEFAULT_PRIORITY),
+                preempt if request.get("preemptible") else None,
+            )
+            # Give up the wait if the client disconnects before it's granted
+            disconnect = asyncio.ensure_future(reader.read())
+            await asyncio.wait([future, disconnect], return_when=asyncio.FIRST_COMPLETED)
+            if not future.done():
+                future.cancel()
+                pool.discard(future)
+                return
+            item = future.result()
+            writer.write((json.dumps({"granted": item}) + "\n").encode())
+            await writer.drain()
+            await disconnect  # held until the client closes the connection
+        except (ConnectionError, json.JSONDecodeError, KeyError) as e:
+            log.debug(f"[BROKER] Dropped client: {e}")
+        except asyncio.CancelledError:
+            pass  # broker shutting down
+        finally:
+            pool = self._pools.get(pool_name)
+            if pool is not None:
+                if item is not None:
+                    pool.release(item)
+                if pool.idle and pool_name.startswith("thread:"):
+                    del self._pools[pool_name]  # per-thread locks are created on demand
+            writer.close()
+
+
+_server: asyncio.AbstractServer | None = None
+_lock_fd: int | None = None
+
+
+async def _try_host(path: Path) -> bool:
+    """Host the broker in this process if no other process holds the lock."""
+    global _server, _lock_fd
+    if _server is not None:
+        return True
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(f"{path}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return False
+    _lock_fd = fd  # held for the life of the process
+    path.unlink(missing_ok=True)  # stale socket from a dead host
+    _server = await asyncio.start_unix_server(Broker().handle, path=str(path))
+    log.info(f"[BROKER] Hosting lease broker on {path} (pid {os.getpid()})")
+    return True
+
+
+async def _connect() -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    path = Path(POOL_BROKER_SOCKET).expanduser()
+    for attempt in range(CONNECT_RETRIES):
+        try:
+            return await asyncio.open_unix_connection(str(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not await _try_host(path):
+                await asyncio.sleep(0.1 * (attempt + 1))  # another process is starting it
+    return await asyncio.open_unix_connection(str(path))
+
+
+class LeaseLost(ConnectionError):
+    """The broker went away while the lease was held; the item may already be someone else's."""
+
+
+async def _watch(reader: asyncio.StreamReader, on_preempt, on_lost):
+    """Pass on preempt requests until the broker connection hits EOF, then report the lease lost."""
+    try:
+        while line := await reader.readline():
+            if on_preempt is not None and json.loads(line).get("preempt"):
+                on_preempt()
+                on_preempt = None
+    except (ConnectionError, json.JSONDecodeError):
+        pass
+    on_lost()
+
+
+@asynccontextmanager
+async def lease(pool: str, items: list[str], prefer: str | None = None,
+                priority: int = DEFAULT_PRIORITY, on_preempt=None):
+    """Hold one item of a broker-wide pool for the duration of the block.
+
+    With `on_preempt` the lease is preemptible: it is called if an urgent
+    waiter asks for the item back (the holder should then leave the block).
+    If the broker connection drops while the block runs, the block is
+    cancelled and LeaseLost raised.
+    """
+    reader, writer = await _connect()
+    holder = asyncio.current_task()
+    watcher = None
+    lost = False
+
+    def lose():
+        nonlocal lost
+        lost = True
+        log.warning(f"[BROKER] Lost the lease broker while holding {pool}; abandoning the lease")
+        holder.cancel()
+
+    try:
+        request = {"pool": pool, "items": items, "prefer": prefer, "priority": priority, "preemptible": on_preempt is not None}
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        reply = await reader.readline()
+        if not reply:
+            raise ConnectionError(f"Lease broker closed the connection while waiting for {pool}")
+        watcher = asyncio.create_task(_watch(reader, on_preempt, lose))
+        try:
+            yield json.loads(reply)["granted"]
+        except asyncio.CancelledError:
+            if lost and holder.uncancel() == 0:
+                raise LeaseLost(f"Lease broker went away while {pool} was held") from None
+            raise
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        writer.close()
+
+
+@asynccontextmanager
+async def thread_lock(thread_id: str):
+    """Cross-process "one run per thread" lock; a no-op without a broker."""
+    if not enabled():
+        yield
+        return
+    async with lease(f"thread:{thread_id}", ["run"]):
+        yield
+
+
+async def serve_forever():
+    path = Path(POOL_BROKER_SOCKET or "~/.roomie/pool.sock").expanduser()
+    if not await _try_host(path):
+        raise SystemExit(f"Another process is already hosting the broker on {path}")
+    async with _server:
+        await _server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s %(name)s %(message)s")
+    asyncio.run(serve_forever())
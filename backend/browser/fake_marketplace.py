@@ -0,0 +1,407 @@
+"""
+Fake Marketplace - a local stand-in for the Playwright MCP servers.
+
+Implements the ALLOWED_TOOLS subset (plus browser_run_code for the session
+layer) against synthetic Facebook Marketplace pages: search results are built
+from FURNITURE_DB, page chrome is taken from the repo's fb_*.md captures and
+the listing → "Message" → send flow mirrors the real accessibility tree, so
+the workers' prompts and the prefetch ref detection work unchanged.
+
+Each port is one independent "browser" (own tabs/history), like the real
+setup. Latency and failures can be injected to load test the pool offline:
+
+  python -m backend.browser.fake_marketplace --ports 3001 3002 --latency-ms 300 --failure-rate 0.02
+
+then point the backend at it with the default PLAYWRIGHT_MCP_URLS.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import struct
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from backend.search.scraper import FURNITURE_DB, GENERIC_LISTINGS, find_matching_category
+
+log = logging.getLogger(__name__)
+
+CAPTURE_DIR = Path(__file__).resolve().parent.parent.parent
+CHROME_CAPTURE = "fb_queen_bed_results_1.md"
+BASE_URL = "https://www.facebook.com"
+SELLERS = ["Matthew Mackey", "Priya Natarajan", "Sam Oduya", "Chloe Nguyen", "Tom Brennan", "Aisha Rahman"]
+
+# Waits the LLM asks for (browser_wait_for time=3) are scaled by this
+WAIT_SCALE = float(os.getenv("FAKE_MP_WAIT_SCALE", "0.1"))
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 150  # per tool call
+    navigate_latency_ms: float = 800  # navigations/clicks that load a page
+    jitter: float = 0.5  # ± fraction of the latency
+    failure_rate: float = 0.0  # tool raises a Playwright-style timeout
+    hang_rate: float = 0.0  # tool stalls for hang_seconds before answering
+    hang_seconds: float = 60
+
+    async def apply(self, loads_page: bool):
+        base = self.navigate_latency_ms if loads_page else self.latency_ms
+        delay = base * random.uniform(1 - self.jitter, 1 + self.jitter) / 1000
+        if random.random() < self.hang_rate:
+            delay += self.hang_seconds
+        await asyncio.sleep(max(0.0, delay))
+        if random.random() < self.failure_rate:
+            raise RuntimeError("TimeoutError: page.goto: Timeout 30000ms exceeded (injected)")
+
+
+# ---- Catalog ----
+
+def _item_id(category: str, title: str) -> str:
+    return str(int(hashlib.sha1(f"{category}/{title}".encode()).hexdigest(), 16) % 10**15).zfill(15)
+
+
+def _build_catalog() -> dict[str, dict]:
+    catalog = {}
+    for category, listings in FURNITURE_DB.items():
+        for i, listing in enumerate(listings):
+            item_id = _item_id(category, listing["title"])
+            catalog[item_id] = {**listing, "id": item_id, "category": category, "seller": SELLERS[i % len(SELLERS)]}
+    return catalog
+
+
+CATALOG = _build_catalog()
+
+
+def search(query: str, max_price: float | None = None) -> list[dict]:
+    """Listings for a search query, like search_marketplace() but deterministic and all on FB."""
+    category = find_matching_category(query)
+    if category:
+        results = [item for item in CATALOG.values() if item["category"] == category]
+    else:
+        results = []
+        for i, base in enumerate(GENERIC_LISTINGS):
+            title = f"{query.title()} - {base['condition']}"
+            item_id = _item_id(query, f"{title}#{i}")
+            CATALOG.setdefault(item_id, {**base, "title": title, "id": item_id, "category": query, "seller": SELLERS[i % len(SELLERS)]})
+            results.append(CATALOG[item_id])
+    if max_price:
+        results = [item for item in results if item["price"] <= max_price]
+    return results
+
+
+def _load_chrome() -> list[str]:
+    """Banner and sidebar of a real results page, up to (not including) the listing grid."""
+    path = CAPTURE_DIR / CHROME_CAPTURE
+    if not path.exists():
+        return ['- generic [ref=e5]:', '  - banner:', '    - link "Facebook" [ref=e7] [cursor=pointer]:']
+    lines = []
+    for line in path.read_text().splitlines():
+        if 'main "Collection of Marketplace items"' in line:
+            break
+        lines.append(line)
+    return lines
+
+
+CHROME = _load_chrome()
+
+
+# ---- Pages ----
+
+@dataclass
+class Tab:
+    history: list[str] = field(default_factory=lambda: ["about:blank"])
+    dialog_open: bool = False
+    draft: str = ""
+    sent: str | None = None
+
+    @property
+    def url(self) -> str:
+        return self.history[-1]
+
+    def goto(self, url: str):
+        self.history.append(url)
+        self.dialog_open, self.draft, self.sent = False, "", None
+
+
+class Renderer:
+    """Builds one snapshot; refs are allocated in document order so they're stable across re-renders."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.actions: dict[str, tuple] = {}
+        self._next = 1000
+
+    def ref(self, action: tuple | None = None) -> str:
+        ref = f"e{self._next}"
+        self._next += 1
+        if action is not None:
+            self.actions[ref] = action
+        return ref
+
+    def add(self, indent: int, text: str):
+        self.lines.append("  " * indent + text)
+
+
+def _page_kind(url: str) -> tuple[str, str | None]:
+    path = urlsplit(url).path
+    if "/marketplace/item/" in path:
+        return "item", path.split("/marketplace/item/")[1].strip("/").split("/")[0]
+    if "/search" in path:
+        return "search", None
+    if "/marketplace" in path:
+        return "home", None
+    return "other", None
+
+
+def render(tab: Tab) -> tuple[str, str, dict[str, tuple]]:
+    """Render a tab to (title, snapshot yaml, ref -> action)."""
+    kind, item_id = _page_kind(tab.url)
+    r = Renderer()
+    if kind == "other":
+        r.add(0, f"- generic [ref={r.ref()}]")
+        return "", "\n".join(r.lines), r.actions
+
+    r.lines.extend(CHROME)
+    if kind == "search":
+        params = parse_qs(urlsplit(tab.url).query)
+        query = params.get("query", [""])[0].replace("+", " ")
+        max_price = float(params["maxPrice"][0]) if params.get("maxPrice", [""])[0].isdigit() else None
+        title = f"Marketplace – {query}"
+        r.add(2, f'- main "Collection of Marketplace items" [ref={r.ref()}]:')
+        r.add(3, f"- generic [ref={r.ref()}]:")
+        for item in search(query, max_price):
+            href = f"/marketplace/item/{item['id']}/?ref=search"
+            label = f"{item['title']} in {item['location']}"
+            r.add(4, f'- link "{label} A${item["price"]}" [ref={r.ref(("goto", BASE_URL + href))}] [cursor=pointer]:')
+            r.add(5, f"- /url: {href}")
+            r.add(5, f"- generic [ref={r.ref()}]:")
+            r.add(6, f'- img "{label}" [ref={r.ref()}]')
+            r.add(6, f"- generic [ref={r.ref()}]:")
+            r.add(7, f"- generic [ref={r.ref()}]: A${item['price']}")
+            r.add(7, f"- generic [ref={r.ref()}]: {item['title']}")
+            r.add(7, f"- generic [ref={r.ref()}]: {item['location']}")
+    elif kind == "item" and item_id in CATALOG:
+        item = CATALOG[item_id]
+        title = f"Marketplace – {item['title']}"
+        r.add(2, f"- main [ref={r.ref()}]:")
+        r.add(3, f'- heading "{item["title"]}" [level=1] [ref={r.ref()}]')
+        r.add(3, f"- generic [ref={r.ref()}]: A${item['price']}")
+        r.add(3, f"- generic [ref={r.ref()}]: Listed in {item['location']}")
+        r.add(3, f"- generic [ref={r.ref()}]: Condition {item['condition']}")
+        r.add(3, f"- button [ref={r.ref(('open_dialog',))}] [cursor=pointer]:")
+        r.add(4, f"- generic [ref={r.ref()}]: Message")
+        r.add(3, f"- generic [ref={r.ref()}]: Seller details")
+        r.add(3, f'- link "{item["seller"]}" [ref={r.ref()}] [cursor=pointer]')
+        if tab.dialog_open:
+            r.add(1, f'- dialog "Message {item["seller"]}" [ref={r.ref()}]:')
+            r.add(2, f'- heading "Message {item["seller"]}" [level=2] [ref={r.ref()}]')
+            draft = f": {tab.draft}" if tab.draft else ""
+            r.add(2, f'- textbox "Please type your message to the seller" [active] [ref={r.ref(("draft",))}]{draft}')
+            r.add(2, f'- button "Send message" [ref={r.ref(("send",))}] [cursor=pointer]')
+        if tab.sent is not None:
+            r.add(1, f'- row "You sent {tab.sent} Sent Enter" [ref={r.ref()}]:')
+            r.add(2, '- heading "You sent" [level=5]')
+    else:
+        title = "Marketplace"
+        r.add(2, f'- main "Marketplace" [ref={r.ref()}]:')
+        r.add(3, f"- generic [ref={r.ref()}]: Today's picks")
+    return title, "\n".join(r.lines), r.actions
+
+
+def page_state(tab: Tab, code: str = "") -> str:
+    """Tool output in the Playwright MCP layout."""
+    title, snapshot, _ = render(tab)
+    parts = []
+    if code:
+        parts.append(f"### Ran Playwright code\n```js\n{code}\n```\n")
+    parts.append(f"### Page state\n- Page URL: {tab.url}\n- Page Title: {title}\n- Page Snapshot:\n```yaml\n{snapshot}\n```")
+    return "\n".join(parts)
+
+
+def _placeholder_png(width: int = 320, height: int = 200) -> bytes:
+    row = b"\x00" + b"\xe8\xe4\xdc" * width
+    chunk = lambda kind, data: struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+# ---- MCP server ----
+
+def build_server(port: int, faults: FaultConfig, host: str = "127.0.0.1"):
+    """One fake browser: an MCP server with its own tabs, served over SSE on `port`."""
+    from mcp.server.fastmcp import FastMCP, Image
+
+    mcp = FastMCP(f"fake-marketplace-{port}", host=host, port=port)
+    tabs: list[Tab] = [Tab()]
+    current = 0
+    screenshot = _placeholder_png()
+
+    def tab() -> Tab:
+        return tabs[current]
+
+    def action_for(ref: str) -> tuple:
+        _, snapshot, actions = render(tab())
+        if ref in actions:
+            return actions[ref]
+        if f"[ref={ref}]" not in snapshot:
+            raise ValueError(f"Ref {ref} not found in the current page snapshot. Try capturing new snapshot.")
+        return ("noop",)
+
+    def send():
+        t = tab()
+        t.sent, t.dialog_open = t.draft, False
+
+    @mcp.tool()
+    async def browser_navigate(url: str) -> str:
+        """Navigate to a URL"""
+        await faults.apply(loads_page=True)
+        tab().goto(url)
+        return page_state(tab(), f"await page.goto('{url}');")
+
+    @mcp.tool()
+    async def browser_navigate_back() -> str:
+        """Go back to the previous page"""
+        await faults.apply(loads_page=True)
+        if len(tab().history) > 1:
+            tab().history.pop()
+        return page_state(tab(), "await page.goBack();")
+
+    @mcp.tool()
+    async def browser_snapshot() -> str:
+        """Capture accessibility snapshot of the current page"""
+        await faults.apply(loads_page=False)
+        return page_state(tab())
+
+    @mcp.tool()
+    async def browser_click(element: str, ref: str, doubleClick: bool = False, button: str = "left") -> str:
+        """Perform click on a web page"""
+        action = action_for(ref)
+        await faults.apply(loads_page=action[0] == "goto")
+        if action[0] == "goto":
+            tab().goto(action[1])
+        elif action[0] == "open_dialog":
+            tab().dialog_open = True
+        elif action[0] == "send":
+            send()
+        return page_state(tab(), f"await page.getByRole('button', {{ name: '{element}' }}).click();")
+
+    @mcp.tool()
+    async def browser_type(element: str, ref: str, text: str, submit: bool = False, slowly: bool = False) -> str:
+        """Type text into editable element"""
+        action = action_for(ref)
+        await faults.apply(loads_page=False)
+        if action[0] == "draft":
+            tab().draft = text
+            if submit:
+                send()
+        return page_state(tab(), f"await page.getByRole('textbox').fill('{text}');")
+
+    @mcp.tool()
+    async def browser_fill_form(fields: list[dict]) -> str:
+        """Fill multiple form fields"""
+        await faults.apply(loads_page=False)
+        for f in fields:
+            if action_for(f.get("ref", ""))[0] == "draft":
+                tab().draft = str(f.get("value", ""))
+        return page_state(tab())
+
+    @mcp.tool()
+    async def browser_press_key(key: str) -> str:
+        """Press a key on the keyboard"""
+        await faults.apply(loads_page=False)
+        if key == "Enter" and tab().dialog_open:
+            send()
+        return page_state(tab(), f"await page.keyboard.press('{key}');")
+
+    @mcp.tool()
+    async def browser_wait_for(time: float | None = None, text: str | None = None, textGone: str | None = None) -> str:
+        """Wait for text to appear or disappear or a specified time to pass"""
+        await asyncio.sleep((time or 0) * WAIT_SCALE)
+        return page_state(tab())
+
+    @mcp.tool()
+    async def browser_hover(element: str, ref: str) -> str:
+        """Hover over element on page"""
+        action_for(ref)
+        await faults.apply(loads_page=False)
+        return page_state(tab())
+
+    @mcp.tool()
+    async def browser_select_option(element: str, ref: str, values: list[str]) -> str:
+        """Select an option in a dropdown"""
+        action_for(ref)
+        await faults.apply(loads_page=False)
+        return page_state(tab())
+
+    @mcp.tool()
+    async def browser_take_screenshot(type: str = "png", filename: str | None = None, fullPage: bool = False):
+        """Take a screenshot of the current page"""
+        await faults.apply(loads_page=False)
+        return Image(data=screenshot, format="png")
+
+    @mcp.tool()
+    async def browser_tabs(action: str, index: int | None = None) -> str:
+        """List, create, close, or select a browser tab"""
+        nonlocal current
+        await faults.apply(loads_page=action == "new")
+        if action == "new":
+            tabs.append(Tab())
+            current = len(tabs) - 1
+        elif action == "select" and index is not None and 0 <= index < len(tabs):
+            current = index
+        elif action == "close":
+            target = current if index is None else index
+            if 0 <= target < len(tabs) and len(tabs) > 1:
+                tabs.pop(target)
+                current = min(current, len(tabs) - 1)
+        lines = []
+        for i, t in enumerate(tabs):
+            title = render(t)[0] or "about:blank"
+            lines.append(f"- {i}: {'(current) ' if i == current else ''}[{title}]({t.url})")
+        return "### Open tabs\n" + "\n".join(lines)
+
+    @mcp.tool()
+    async def browser_run_code(code: str) -> str:
+        """Run Playwright code snippet"""
+        await faults.apply(loads_page=False)
+        if "storageState" in code:
+            return '### Result\n{"cookies": [], "origins": []}'
+        return "### Result\nundefined"
+
+    return mcp
+
+
+async def serve(ports: list[int], faults: FaultConfig, host: str):
+    servers = [build_server(port, faults, host) for port in ports]
+    log.info(f"[FAKE_MP] Serving {len(servers)} fake browser(s) on ports {ports} "
+             f"(latency {faults.latency_ms}/{faults.navigate_latency_ms}ms, failures {faults.failure_rate:.0%})")
+    await asyncio.gather(*(s.run_sse_async() for s in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ports", type=int, nargs="+", default=[3001, 3002])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("FAKE_MP_LATENCY_MS", "150")))
+    parser.add_argument("--navigate-latency-ms", type=float, default=float(os.getenv("FAKE_MP_NAVIGATE_LATENCY_MS", "800")))
+    parser.add_argument("--jitter", type=float, default=0.5, help="± fraction of the latency")
+    parser.add_argument("--failure-rate", type=float, default=float(os.getenv("FAKE_MP_FAILURE_RATE", "0")))
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of calls that stall")
+    parser.add_argument("--hang-seconds", type=float, default=60)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    faults = FaultConfig(args.latency_ms, args.navigate_latency_ms, args.jitter,
+                         args.failure_rate, args.hang_rate, args.hang_seconds)
+    asyncio.run(serve(args.ports, faults, args.host))
+
+
+if __name__ == "__main__":
+    main()
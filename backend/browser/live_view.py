@@ -0,0 +1,150 @@
+"""
+Live View - pushes frames of each pooled browser to the UI instead of being polled.
+
+One capture loop per browser, shared by everyone watching it, started by the
+first viewer and stopped when the last one leaves. Frames come from the
+browser's observer (backend/browser/observer.py), never the workers' session:
+
+  - at most LIVE_VIEW_MAX_FPS screenshots a second; while the page doesn't
+    change the interval backs off to LIVE_VIEW_IDLE_INTERVAL
+  - a frame whose screenshot bytes hash the same as the last one is dropped
+    before it is decoded, so an idle page costs one capture and one hash
+  - changed frames are downscaled to LIVE_VIEW_WIDTH and re-encoded
+    (LIVE_VIEW_FORMAT, jpeg or webp) in a worker thread
+  - each viewer holds only the newest frame; a slow client skips frames
+    instead of queueing them
+
+  view = live_view.get("A")
+  async for frame in view.frames():
+      ...  # Frame(seq, mime, data)
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import os
+from dataclasses import dataclass
+
+from backend.browser import observer
+
+log = logging.getLogger(__name__)
+
+LIVE_VIEW_MAX_FPS = float(os.getenv("LIVE_VIEW_MAX_FPS", "2"))
+LIVE_VIEW_IDLE_INTERVAL = 2.0  # seconds between captures once the page stops changing
+LIVE_VIEW_WIDTH = int(os.getenv("LIVE_VIEW_WIDTH", "960"))
+LIVE_VIEW_FORMAT = os.getenv("LIVE_VIEW_FORMAT", "jpeg").lower()  # "jpeg" or "webp"
+LIVE_VIEW_QUALITY = int(os.getenv("LIVE_VIEW_QUALITY", "60"))
+
+
+@dataclass
+class Frame:
+    seq: int
+    mime: str
+    data: bytes
+
+    def to_event(self, slot: str) -> dict:
+        return {"slot": slot, "seq": self.seq, "mime": self.mime, "frame": base64.b64encode(self.data).decode()}
+
+
+def encode_frame(png_or_jpeg: bytes) -> tuple[str, bytes]:
+    """Downscale and re-encode one screenshot (runs in a worker thread)."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return "image/png" if png_or_jpeg.startswith(b"\x89PNG") else "image/jpeg", png_or_jpeg
+
+    fmt = "WEBP" if LIVE_VIEW_FORMAT == "webp" else "JPEG"
+    with Image.open(io.BytesIO(png_or_jpeg)) as img:
+        if img.width > LIVE_VIEW_WIDTH:
+            img = img.resize((LIVE_VIEW_WIDTH, round(img.height * LIVE_VIEW_WIDTH / img.width)))
+        out = io.BytesIO()
+        img.convert("RGB").save(out, fmt, quality=LIVE_VIEW_QUALITY)
+    return f"image/{fmt.lower()}", out.getvalue()
+
+
+class LiveView:
+    """The shared capture loop and viewers of one browser."""
+
+    def __init__(self, slot: str, capture):
+        self.slot = slot
+        self._capture = capture  # async () -> screenshot bytes | None
+        self._viewers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+        self._last_hash: bytes | None = None
+        self.latest: Frame | None = None
+        self._seq = 0
+
+    async def frames(self, keepalive: float | None = None):
+        """Yield frames (the latest one first, if any) until the caller stops iterating.
+
+        With `keepalive`, None is yielded whenever that many seconds pass without a frame.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self._viewers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._viewers.discard(queue)
+            if not self._viewers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def _publish(self, frame: Frame):
+        self.latest = frame
+        for queue in self._viewers:
+            if queue.full():
+                queue.get_nowait()  # drop the frame this viewer hasn't taken yet
+            queue.put_nowait(frame)
+
+    async def _run(self):
+        min_interval = 1.0 / max(LIVE_VIEW_MAX_FPS, 0.1)
+        interval = min_interval
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                raw = await self._capture()
+            except Exception as e:
+                log.debug(f"[LIVE_VIEW] {self.slot} capture failed: {e}")
+                raw = None
+            if raw:
+                digest = hashlib.blake2b(raw, digest_size=16).digest()
+                if digest == self._last_hash:
+                    interval = min(interval * 1.5, LIVE_VIEW_IDLE_INTERVAL)
+                else:
+                    self._last_hash = digest
+                    interval = min_interval
+                    mime, data = await asyncio.to_thread(encode_frame, raw)
+                    self._seq += 1
+                    self._publish(Frame(self._seq, mime, data))
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+_views: dict[str, LiveView] = {}
+
+
+def slot_urls() -> dict[str, str]:
+    """Pool slot name ("A", "B", ...) -> MCP endpoint, in the pool's order."""
+    from backend.browser.mcp_client import get_playwright_urls
+
+    return {chr(ord("A") + i): url for i, url in enumerate(get_playwright_urls())}
+
+
+def get(slot: str) -> LiveView | None:
+    """The live view of a pooled browser by slot name, or None if there's no such slot."""
+    if slot not in _views:
+        url = slot_urls().get(slot)
+        if url is None:
+            return None
+        _views[slot] = LiveView(slot, observer.get(url).latest)
+    return _views[slot]
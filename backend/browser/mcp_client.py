@@ -1,25 +1,56 @@
 """
-Playwright MCP Client - connects to TWO long-lived Playwright MCP HTTP servers
-for true parallel browser automation (one per worker).
+Playwright MCP Client - connects to long-lived Playwright MCP HTTP servers
+for true parallel browser automation (one browser per pool slot).
 
 Start both servers first:
   npx @playwright/mcp@latest --port 3001 --no-sandbox --shared-browser-context --viewport-size 1920x1080
   npx @playwright/mcp@latest --port 3002 --no-sandbox --shared-browser-context --viewport-size 1920x1080
+
+More browsers can be added with PLAYWRIGHT_MCP_URLS (comma separated SSE URLs).
 """
 
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from urllib.parse import urlsplit
+
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_core.tools import BaseTool
 
+from backend import ratelimit, replay, startup
+from backend.browser import snapshot_cache
+from backend.browser.observer import track_calls
+from backend.tracing import instrument_tool
+
+log = logging.getLogger(__name__)
+
+TOOL_SCHEMA_DIR = Path.home() / ".roomie" / "tool_schemas"
+MCP_SCHEMA_CACHE = os.getenv("MCP_SCHEMA_CACHE", "1") != "0"
+_refresh_tasks: set[asyncio.Task] = set()
+
 
 # Singleton client instances — one per worker
 _client_a: MultiServerMCPClient | None = None
 _client_b: MultiServerMCPClient | None = None
 _tools_a: list[BaseTool] | None = None
 _tools_b: list[BaseTool] | None = None
+# Extra pool endpoints beyond A/B, keyed by URL
+_clients_by_url: dict[str, MultiServerMCPClient] = {}
+_tools_by_url: dict[str, list[BaseTool]] = {}
 
 PLAYWRIGHT_MCP_URL_A = "http://localhost:3001/sse"
 PLAYWRIGHT_MCP_URL_B = "http://localhost:3002/sse"
 
+
+def get_playwright_urls() -> list[str]:
+    """All MCP endpoints in the browser pool, in slot order."""
+    raw = os.getenv("PLAYWRIGHT_MCP_URLS", "")
+    urls = [u.strip() for u in raw.split(",") if u.strip()]
+    return urls or [PLAYWRIGHT_MCP_URL_A, PLAYWRIGHT_MCP_URL_B]
+
+
 ALLOWED_TOOLS = {
     "browser_navigate",
     "browser_navigate_back",
@@ -35,61 +66,137 @@ ALLOWED_TOOLS = {
     "browser_hover",
 }
 
-# Keep separate refs to the screenshot tools for the API endpoints
-_screenshot_tool: BaseTool | None = None
-_screenshot_tool_b: BaseTool | None = None
+# Tools the browser layer uses itself but never hands to an LLM
+# (session save/restore in backend/browser/session.py)
+SESSION_TOOLS = {"browser_run_code"}
+_session_tools_by_url: dict[str, dict[str, BaseTool]] = {}
+
+
+def _connection(url: str) -> dict:
+    return {"url": url, "transport": "sse"}
 
 
 def _create_client(url: str) -> MultiServerMCPClient:
-    return MultiServerMCPClient({
-        "playwright": {
-            "url": url,
-            "transport": "sse",
-        }
-    })
+    return MultiServerMCPClient({"playwright": _connection(url)})
+
+
+# ---- Tool schema cache ----
+# get_tools() opens a session and lists tools on every start. The schemas
+# rarely change, so the last listing is kept on disk and tools are rebuilt
+# from it directly (each call still opens its own session, as before); a
+# background refresh rewrites the cache for the next start.
+
+def _schema_cache_path(url: str) -> Path:
+    parts = urlsplit(url)
+    return TOOL_SCHEMA_DIR / f"{parts.hostname}_{parts.port or 80}.json"
+
+
+def _save_tool_schemas(url: str, tools: list[BaseTool]):
+    schemas = [
+        {"name": t.name, "description": t.description, "inputSchema": t.args_schema}
+        for t in tools
+        if isinstance(t.args_schema, dict)
+    ]
+    path = _schema_cache_path(url)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists() or json.loads(path.read_text()) != schemas:
+            path.write_text(json.dumps(schemas))
+            log.info(f"[MCP] Cached {len(schemas)} tool schemas for {url}")
+    except (OSError, ValueError) as e:
+        log.warning(f"[MCP] Could not write tool schema cache for {url}: {e}")
+
+
+def _cached_tools(url: str) -> list[BaseTool] | None:
+    """Tools rebuilt from the on-disk schema cache, or None if there is none."""
+    path = _schema_cache_path(url)
+    if not MCP_SCHEMA_CACHE or not path.exists():
+        return None
+    try:
+        from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+        from mcp.types import Tool
+
+        return [
+            convert_mcp_tool_to_langchain_tool(None, Tool(**schema), connection=_connection(url))
+            for schema in json.loads(path.read_text())
+        ]
+    except Exception as e:
+        log.warning(f"[MCP] Ignoring tool schema cache for {url}: {e}")
+        return None
+
+
+async def _refresh_schema_cache(url: str):
+    try:
+        _save_tool_schemas(url, await _create_client(url).get_tools())
+    except Exception as e:
+        log.warning(f"[MCP] Tool schema refresh failed for {url}: {e}")
 
 
-async def _get_tools_for(url: str) -> tuple[MultiServerMCPClient, list[BaseTool]]:
+async def _get_tools_for(url: str) -> tuple[MultiServerMCPClient | None, list[BaseTool]]:
     """Connect to an MCP server and return (client, filtered_tools)."""
-    client = _create_client(url)
-    all_tools = await client.get_tools()
+    browser = urlsplit(url).netloc
+    with startup.phase(f"mcp_tools:{browser}"):
+        if replay.mode() == "replay":
+            # Offline: schemas and results both come from the cassette
+            client, all_tools = None, replay.replay_tools(url)
+        else:
+            client = _create_client(url)
+            all_tools = None if replay.mode() == "record" else _cached_tools(url)
+            if all_tools is not None:
+                task = asyncio.create_task(_refresh_schema_cache(url))
+                _refresh_tasks.add(task)  # keep a reference until it's done
+                task.add_done_callback(_refresh_tasks.discard)
+            else:
+                all_tools = await client.get_tools()
+                _save_tool_schemas(url, all_tools)
+            replay.record_tool_schemas(url, all_tools)
+            all_tools = [replay.wrap_tool(t) for t in all_tools]
+    # UI screenshots go through backend/browser/observer.py, which stays out of the way of these calls
+    all_tools = [track_calls(instrument_tool(t, browser), browser) for t in all_tools]
+    # Navigations queue on a per-domain budget (outside track_calls: a queued call isn't using the browser)
+    all_tools = [ratelimit.limit_navigations(t) for t in all_tools]
+    # Repeat navigate/snapshot/scroll calls are answered from the cache without reaching the browser
+    all_tools = snapshot_cache.wrap_tools(all_tools, browser)
     tools = [t for t in all_tools if t.name in ALLOWED_TOOLS]
+    _session_tools_by_url[url] = {t.name: t for t in all_tools if t.name in SESSION_TOOLS}
     return client, tools
 
 
+def get_session_tool(url: str, name: str) -> BaseTool | None:
+    """A privileged (non-LLM) tool from an already connected endpoint, if the server has it."""
+    return _session_tools_by_url.get(url, {}).get(name)
+
+
+async def get_playwright_tools_for(url: str) -> list[BaseTool]:
+    """Get browser tools for any pool endpoint (A and B share the singletons above)."""
+    if url == PLAYWRIGHT_MCP_URL_A:
+        return await get_playwright_tools_a()
+    if url == PLAYWRIGHT_MCP_URL_B:
+        return await get_playwright_tools_b()
+    if url not in _tools_by_url:
+        _clients_by_url[url], _tools_by_url[url] = await _get_tools_for(url)
+    return _tools_by_url[url]
+
+
 async def get_playwright_tools_a() -> list[BaseTool]:
     """Get browser tools from MCP server A (port 3001) — for Worker A."""
-    global _client_a, _tools_a, _screenshot_tool
+    global _client_a, _tools_a
 
     if _tools_a is not None:
         return _tools_a
 
     _client_a, _tools_a = await _get_tools_for(PLAYWRIGHT_MCP_URL_A)
-
-    # Use server A for screenshots
-    for t in _tools_a:
-        if t.name == "browser_take_screenshot":
-            _screenshot_tool = t
-            break
-
     return _tools_a
 
 
 async def get_playwright_tools_b() -> list[BaseTool]:
     """Get browser tools from MCP server B (port 3002) — for Worker B."""
-    global _client_b, _tools_b, _screenshot_tool_b
+    global _client_b, _tools_b
 
     if _tools_b is not None:
         return _tools_b
 
     _client_b, _tools_b = await _get_tools_for(PLAYWRIGHT_MCP_URL_B)
-
-    # Use server B for Worker B screenshots
-    for t in _tools_b:
-        if t.name == "browser_take_screenshot":
-            _screenshot_tool_b = t
-            break
-
     return _tools_b
 
 
@@ -98,38 +205,13 @@ async def get_playwright_tools() -> list[BaseTool]:
     return await get_playwright_tools_a()
 
 
-async def _take_screenshot_from(tool: BaseTool | None) -> str | None:
-    """Take a screenshot via an MCP tool. Returns base64 image data or None."""
-    if tool is None:
-        return None
-    try:
-        result = await tool.ainvoke({})
-        if isinstance(result, list):
-            for block in result:
-                if isinstance(block, dict) and block.get("type") == "image":
-                    return block.get("base64")
-        elif isinstance(result, str):
-            return result
-        return None
-    except Exception:
-        return None
-
-
-async def take_screenshot() -> str | None:
-    """Take a screenshot from Worker A's browser."""
-    return await _take_screenshot_from(_screenshot_tool)
-
-
-async def take_screenshot_b() -> str | None:
-    """Take a screenshot from Worker B's browser."""
-    return await _take_screenshot_from(_screenshot_tool_b)
-
-
 async def cleanup():
     """Clean up the MCP client connections."""
-    global _client_a, _client_b, _tools_a, _tools_b, _screenshot_tool
+    global _client_a, _client_b, _tools_a, _tools_b
     _tools_a = None
     _tools_b = None
-    _screenshot_tool = None
     _client_a = None
     _client_b = None
+    _clients_by_url.clear()
+    _tools_by_url.clear()
+    _session_tools_by_url.clear()
@@ -0,0 +1,176 @@
+"""
+Browser Observer - screenshots for the UI on a connection of their own.
+
+Viewers used to take screenshots with the workers' own MCP tools, so a busy
+browser pane queued behind (or interleaved with) a worker's navigate and
+snapshot calls. Each browser now also has one observer:
+
+  - its own long-lived MCP session, opened on first use and separate from
+    the sessions worker tool calls open
+  - it only captures while no worker call is in flight on that browser
+    (tracked by track_calls, which wraps every worker tool); if the browser
+    stays busy for OBSERVER_IDLE_WAIT the last frame is served instead
+  - one capture at a time; a frame younger than OBSERVER_FRAME_TTL is
+    shared by every viewer (live views and the screenshot endpoints)
+
+Workers never wait on the observer: tracking a call is a counter and an
+Event, and nothing on the worker path awaits a screenshot.
+
+  frame = await observer.get(url).latest()   # JPEG bytes or None
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+from backend import replay
+
+log = logging.getLogger(__name__)
+
+OBSERVER_FRAME_TTL = float(os.getenv("OBSERVER_FRAME_TTL", "0.5"))  # seconds a frame is shared
+OBSERVER_IDLE_WAIT = 1.0  # seconds to wait for workers to leave the browser before serving the old frame
+OBSERVER_TIMEOUT = 5.0  # seconds for one screenshot
+
+
+# ---- Worker activity ----
+
+class _Activity:
+    """How many worker tool calls are in flight on one browser."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def enter(self):
+        self.in_flight += 1
+        self.idle.clear()
+
+    def leave(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self.idle.set()
+
+
+_activity: dict[str, _Activity] = {}
+
+
+def _activity_for(browser: str) -> _Activity:
+    if browser not in _activity:
+        _activity[browser] = _Activity()
+    return _activity[browser]
+
+
+def track_calls(tool, browser: str):
+    """Count a worker tool's calls as activity on `browser` (wraps its coroutine in place)."""
+    inner = getattr(tool, "coroutine", None)
+    if inner is None or getattr(inner, "_tracked", False):
+        return tool
+    activity = _activity_for(browser)
+
+    async def tracked(*args, **kwargs):
+        activity.enter()
+        try:
+            return await inner(*args, **kwargs)
+        finally:
+            activity.leave()
+
+    tracked._tracked = True
+    tool.coroutine = tracked
+    return tool
+
+
+# ---- Observer ----
+
+class Observer:
+    def __init__(self, url: str):
+        self.url = url
+        self.browser = urlsplit(url).netloc
+        self._session = None
+        self._ready: asyncio.Future | None = None
+        self._runner: asyncio.Task | None = None
+        self._closed = asyncio.Event()
+        self._capture_lock = asyncio.Lock()
+        self._frame: bytes | None = None
+        self._frame_at = 0.0
+
+    async def _run(self):
+        """Own the MCP session for its whole life (its cancel scopes must stay in one task)."""
+        from mcp import ClientSession
+        from mcp.client.sse import sse_client
+
+        try:
+            async with sse_client(self.url) as (read, write), ClientSession(read, write) as session:
+                await session.initialize()
+                self._session = session
+                self._ready.set_result(session)
+                await self._closed.wait()
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            log.warning(f"[OBSERVER] {self.browser} session closed: {e}")
+        finally:
+            self._session = None
+
+    async def _connect(self):
+        if self._runner is None or self._runner.done():
+            self._ready = asyncio.get_running_loop().create_future()
+            self._runner = asyncio.create_task(self._run())
+        return await asyncio.shield(self._ready)
+
+    async def _capture(self) -> bytes | None:
+        session = await asyncio.wait_for(self._connect(), OBSERVER_TIMEOUT)
+        result = await asyncio.wait_for(
+            session.call_tool("browser_take_screenshot", {"type": "jpeg"}), OBSERVER_TIMEOUT,
+        )
+        for block in result.content:
+            if getattr(block, "type", None) == "image":
+                return base64.b64decode(block.data)
+        return None
+
+    async def latest(self) -> bytes | None:
+        """The browser's current frame: shared if fresh, otherwise captured once the browser is idle."""
+        if replay.mode() == "replay":
+            return None  # no live browsers behind a cassette
+        if time.monotonic() - self._frame_at < OBSERVER_FRAME_TTL:
+            return self._frame
+        async with self._capture_lock:
+            # Another viewer may have captured while we waited
+            if time.monotonic() - self._frame_at < OBSERVER_FRAME_TTL:
+                return self._frame
+            try:
+                await asyncio.wait_for(_activity_for(self.browser).idle.wait(), OBSERVER_IDLE_WAIT)
+            except asyncio.TimeoutError:
+                return self._frame  # a worker is mid-call; don't get in its way
+            try:
+                self._frame = await self._capture()
+            except Exception as e:
+                log.debug(f"[OBSERVER] {self.browser} screenshot failed: {e}")
+                if self._runner is not None and self._runner.done():
+                    self._runner = None  # reconnect next time
+            self._frame_at = time.monotonic()
+            return self._frame
+
+    async def close(self):
+        self._closed.set()
+        if self._runner is not None:
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+
+_observers: dict[str, Observer] = {}
+
+
+def get(url: str) -> Observer:
+    """The observer of the browser behind an MCP endpoint."""
+    if url not in _observers:
+        _observers[url] = Observer(url)
+    return _observers[url]
+
+
+async def close_all():
+    await asyncio.gather(*(o.close() for o in _observers.values()))
+    _observers.clear()
@@ -0,0 +1,136 @@
+"""
+Browser Pool - hands out exclusive leases on the Playwright MCP browsers.
+
+Every piece of work that drives a browser (search workers, messaging workers)
+leases a slot first, so two callers never interleave navigations in the same
+browser. The pool size is the number of MCP endpoints (see get_playwright_urls).
+Each slot's Facebook session is verified before it is handed out
+(backend/browser/session.py). With several API processes the leases go
+through the shared broker (backend/broker.py) instead of this process's
+own queue.
+
+Leases carry a Priority. Seller messaging after an approval is what the user
+is waiting on, so it jumps the queue and may preempt background work
+(speculative searches, listing prefetch), whose leases are cancelled to give
+the browser back. Searches are never preempted. Waiters age, so background
+work still gets a browser under sustained load.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+
+from langchain_core.tools import BaseTool
+
+from backend import broker
+from backend.browser.mcp_client import get_playwright_urls, get_playwright_tools_for
+from backend.tracing import record_lease_wait
+
+log = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    MESSAGING = broker.URGENT  # user is waiting: jumps the queue, may preempt BACKGROUND
+    SEARCH = broker.DEFAULT_PRIORITY
+    BACKGROUND = 2  # speculative searches, prefetch: preemptible
+
+
+def tool_text(result) -> str:
+    """Flatten an MCP tool result (str or list of content blocks) to text."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, list):
+        return "\n".join(
+            b.get("text", "") if isinstance(b, dict) else str(b)
+            for b in result
+            if not isinstance(b, dict) or b.get("type", "text") == "text"
+        )
+    return str(result or "")
+
+
+@dataclass
+class BrowserSlot:
+    name: str  # "A", "B", ... — matches the worker label shown in the UI
+    url: str
+    tools: list[BaseTool]
+
+    async def call(self, tool_name: str, args: dict | None = None) -> str:
+        """Call an MCP tool directly (no LLM) and return its text output."""
+        tool = next((t for t in self.tools if t.name == tool_name), None)
+        if tool is None:
+            raise KeyError(f"Browser {self.name} has no tool {tool_name}")
+        return tool_text(await tool.ainvoke(args or {}))
+
+
+class BrowserPool:
+    def __init__(self, slots: list[BrowserSlot], on_lease=None):
+        self.slots = slots
+        self._on_lease = on_lease  # async hook run on every slot before it's handed out
+        self._queue = broker.LeaseQueue([s.name for s in slots])
+
+    @property
+    def size(self) -> int:
+        return len(self.slots)
+
+    @property
+    def available(self) -> int:
+        return len(self._queue.free)
+
+    @asynccontextmanager
+    async def lease(self, prefer: str | None = None, priority: Priority = Priority.SEARCH):
+        """Wait for a free browser and hold it for the duration of the block.
+
+        `prefer` names a slot to take if it is free (e.g. the browser that
+        already has a listing pre-loaded); any free slot is used otherwise.
+        A BACKGROUND lease can be preempted: the holding task is cancelled.
+        """
+        on_preempt = asyncio.current_task().cancel if priority >= Priority.BACKGROUND else None
+        start = time.perf_counter()
+        if broker.enabled():
+            # Other API processes share these browsers: the broker arbitrates
+            async with broker.lease("browsers", [s.name for s in self.slots], prefer, priority, on_preempt) as name:
+                slot = next(s for s in self.slots if s.name == name)
+                record_lease_wait(slot.name, time.perf_counter() - start, priority.name.lower())
+                if self._on_lease is not None:
+                    await self._on_lease(slot)
+                yield slot
+            return
+
+        name = await self._queue.acquire(prefer, priority, on_preempt)
+        slot = next(s for s in self.slots if s.name == name)
+        record_lease_wait(slot.name, time.perf_counter() - start, priority.name.lower())
+        try:
+            if self._on_lease is not None:
+                await self._on_lease(slot)
+            yield slot
+        finally:
+            self._queue.release(name)
+
+
+_pool: BrowserPool | None = None
+_pool_lock = asyncio.Lock()
+
+
+async def get_browser_pool() -> BrowserPool:
+    """Connect to every MCP endpoint (in parallel) and return the shared pool."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            from backend.browser.session import ensure_logged_in
+
+            urls = get_playwright_urls()
+            all_tools = await asyncio.gather(*(get_playwright_tools_for(u) for u in urls))
+            _pool = BrowserPool(
+                [
+                    BrowserSlot(name=chr(ord("A") + i), url=url, tools=tools)
+                    for i, (url, tools) in enumerate(zip(urls, all_tools))
+                ],
+                on_lease=ensure_logged_in,
+            )
+            log.info(f"[BROWSER_POOL] {_pool.size} browsers: {', '.join(s.name + '=' + s.url for s in _pool.slots)}")
+    return _pool
@@ -0,0 +1,248 @@
+"""
+Listing Prefetch - warms proposed listings while the graph waits for approval.
+
+While `human_approval` is paused on `interrupt(...)` the browsers are idle, so
+each proposed listing is opened in a background tab and its "Message" button
+ref is resolved from the first snapshot. When the user approves, the messaging
+worker is handed the already-loaded tab instead of cold-navigating, and closes
+it once the message is sent; tabs for rejected items are closed on resume.
+A thread whose approval is never answered has its prefetches discarded after
+PREFETCH_TTL, the next time any thread starts prefetching.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+
+from backend.browser import snapshot_cache
+from backend.browser.pool import BrowserPool, BrowserSlot, Priority
+
+log = logging.getLogger(__name__)
+
+
+PREFETCH_TIMEOUT = 45  # seconds per listing — it's speculative, don't hog a browser
+PREFETCH_TTL = 1800  # seconds an unanswered approval keeps its warm tabs
+
+_MESSAGE_LABEL = re.compile(r'^(Message|Send Message|Message Seller)$', re.IGNORECASE)
+_REF = re.compile(r"\[ref=(e\d+)\]")
+_CURRENT_TAB = re.compile(r"^- (\d+):.*\(current\)", re.MULTILINE)
+
+
+@dataclass
+class PrefetchedListing:
+    url: str
+    slot_name: str
+    message_ref: str | None  # ref of the "Message" button in the prefetch snapshot
+
+
+# thread_id -> {listing url -> task resolving to PrefetchedListing | None}
+_prefetches: dict[str, dict[str, asyncio.Task]] = {}
+_started_at: dict[str, float] = {}  # thread_id -> when its prefetches started
+
+
+def find_message_button_ref(snapshot: str) -> str | None:
+    """Find the ref of the listing's "Message" button in an accessibility snapshot.
+
+    FB renders it either as `button "Message" [ref=..]` or as an unlabelled
+    `button [ref=..]` wrapping a `generic [ref=..]: Message` child.
+    """
+    buttons: list[tuple[int, str]] = []  # (indent, ref) of enclosing buttons
+    for line in snapshot.splitlines():
+        stripped = line.lstrip()
+        indent = len(line) - len(stripped)
+        while buttons and buttons[-1][0] >= indent:
+            buttons.pop()
+
+        ref = _REF.search(stripped)
+        label = re.match(r'- (?:button|link) "([^"]*)"', stripped)
+        if label and ref and _MESSAGE_LABEL.match(label.group(1)):
+            return ref.group(1)
+        if stripped.startswith("- button") and ref:
+            buttons.append((indent, ref.group(1)))
+            continue
+        text = stripped.rsplit(": ", 1)
+        if buttons and len(text) == 2 and _MESSAGE_LABEL.match(text[1].strip()):
+            return buttons[-1][1]
+    return None
+
+
+async def _current_tab(slot: BrowserSlot) -> int | None:
+    match = _CURRENT_TAB.search(await slot.call("browser_tabs", {"action": "list"}))
+    return int(match.group(1)) if match else None
+
+
+async def _tab_index_for(slot: BrowserSlot, url: str) -> int | None:
+    """Index of the open tab showing `url`, if any."""
+    listing = await slot.call("browser_tabs", {"action": "list"})
+    for match in re.finditer(r"^- (\d+):.*\]\((.*?)\)", listing, re.MULTILINE):
+        if match.group(2).split("?")[0].rstrip("/") == url.split("?")[0].rstrip("/"):
+            return int(match.group(1))
+    return None
+
+
+async def _uninterrupted(coro):
+    """Await `coro` to completion even if we are cancelled meanwhile; the cancellation is re-raised after."""
+    task = asyncio.ensure_future(coro)
+    cancelled = False
+    while not task.done():
+        try:
+            await asyncio.shield(task)
+        except asyncio.CancelledError:
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError
+    return task.result()
+
+
+async def _restore_tabs(slot: BrowserSlot, previous: int | None, opened: int | None):
+    """Close the tab a failed prefetch opened, then hand the browser back on the tab it was on."""
+    try:
+        if opened is not None:
+            await slot.call("browser_tabs", {"action": "close", "index": opened})
+    finally:
+        if previous is not None:
+            await slot.call("browser_tabs", {"action": "select", "index": previous})
+
+
+async def _prefetch_one(pool: BrowserPool, url: str) -> PrefetchedListing | None:
+    """Open `url` in a new background tab and resolve its message button.
+
+    If it fails, times out or is preempted, the new tab is closed again so
+    the shared browser doesn't collect orphan tabs.
+    """
+    async with pool.lease(priority=Priority.BACKGROUND) as slot:
+        previous = await _current_tab(slot)
+        opened = None
+        try:
+            await slot.call("browser_tabs", {"action": "new"})
+            opened = await _current_tab(slot)
+            snapshot = await asyncio.wait_for(
+                slot.call("browser_navigate", {"url": url}),
+                timeout=PREFETCH_TIMEOUT,
+            )
+            if "Snapshot" not in snapshot and "[ref=" not in snapshot:
+                snapshot = await slot.call("browser_snapshot")
+            ref = find_message_button_ref(snapshot)
+        except BaseException:
+            await _uninterrupted(_restore_tabs(slot, previous, opened))
+            raise
+        # Hand the browser back on the tab it was on, so the next lease is unaffected
+        await _restore_tabs(slot, previous, None)
+        log.info(f"[PREFETCH] {slot.name} warmed {url[:80]} (message_ref={ref})")
+        return PrefetchedListing(url=url, slot_name=slot.name, message_ref=ref)
+
+
+async def _guarded_prefetch(pool: BrowserPool, url: str) -> PrefetchedListing | None:
+    try:
+        with snapshot_cache.bypass():  # the point is to load the real page
+            return await _prefetch_one(pool, url)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        log.warning(f"[PREFETCH] Failed for {url[:80]}: {e}")
+        return None
+
+
+def _forget(thread_id: str):
+    _prefetches.pop(thread_id, None)
+    _started_at.pop(thread_id, None)
+
+
+def _expire(pool: BrowserPool):
+    """Discard prefetches of threads whose approval has waited longer than PREFETCH_TTL."""
+    now = time.monotonic()
+    for thread_id in [t for t, at in _started_at.items() if now - at > PREFETCH_TTL]:
+        log.info(f"[PREFETCH] Approval for thread {thread_id} expired; discarding its prefetches")
+        discard_rejected(thread_id, pool, set())
+
+
+def start_prefetch(thread_id: str, pool: BrowserPool, urls: list[str]):
+    """Start warming `urls` for a thread. No-op if already started (node re-runs on resume)."""
+    _expire(pool)
+    if thread_id in _prefetches:
+        return
+    _started_at[thread_id] = time.monotonic()
+    _prefetches[thread_id] = {
+        url: asyncio.create_task(_guarded_prefetch(pool, url))
+        for url in dict.fromkeys(u for u in urls if u)
+    }
+    log.info(f"[PREFETCH] Started {len(_prefetches[thread_id])} listing prefetches for thread {thread_id}")
+
+
+async def _close_tab(pool: BrowserPool, prefetched: PrefetchedListing):
+    try:
+        with snapshot_cache.bypass():
+            async with pool.lease(prefer=prefetched.slot_name, priority=Priority.BACKGROUND) as slot:
+                if slot.name != prefetched.slot_name:
+                    return  # tab lives in another browser; it'll be reused or closed there
+                index = await _tab_index_for(slot, prefetched.url)
+                if index is not None:
+                    await slot.call("browser_tabs", {"action": "close", "index": index})
+    except Exception as e:
+        log.warning(f"[PREFETCH] Could not close tab for {prefetched.url[:80]}: {e}")
+
+
+def _finished(task: asyncio.Task) -> PrefetchedListing | None:
+    """A done prefetch's result; None if it failed or was cancelled (e.g. preempted by messaging)."""
+    if task.cancelled() or task.exception() is not None:
+        return None
+    return task.result()
+
+
+def discard_rejected(thread_id: str, pool: BrowserPool, keep_urls: set[str]):
+    """On resume: cancel or close prefetches for items the user did not approve."""
+    tasks = _prefetches.get(thread_id, {})
+    for url in [u for u in tasks if u not in keep_urls]:
+        task = tasks.pop(url)
+        if not task.done():
+            task.cancel()
+        elif (prefetched := _finished(task)) is not None:
+            release(pool, prefetched)
+    if not tasks:
+        _forget(thread_id)
+
+
+def release(pool: BrowserPool, prefetched: PrefetchedListing):
+    """Close a prefetched tab in the background, once its browser is free."""
+    asyncio.create_task(_close_tab(pool, prefetched))
+
+
+async def claim(thread_id: str, url: str) -> PrefetchedListing | None:
+    """Take the prefetched tab for an approved listing (waits if still loading).
+
+    The caller owns the tab from here: close it with `close_prefetched` or `release`.
+    """
+    task = _prefetches.get(thread_id, {}).pop(url, None)
+    if not _prefetches.get(thread_id):
+        _forget(thread_id)
+    if task is None:
+        return None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise  # we were cancelled, not the prefetch
+        return None
+
+
+async def open_prefetched(slot: BrowserSlot, prefetched: PrefetchedListing) -> str | None:
+    """Switch `slot` to the prefetched tab.
+
+    Returns the message button ref ("" if it couldn't be resolved), or None if
+    the tab is gone and the worker should navigate normally.
+    """
+    index = await _tab_index_for(slot, prefetched.url)
+    if index is None:
+        return None
+    snapshot = await slot.call("browser_tabs", {"action": "select", "index": index})
+    # Refs are re-issued on select; prefer the fresh one if the response carries a snapshot
+    return find_message_button_ref(snapshot) or prefetched.message_ref or ""
+
+
+async def close_prefetched(slot: BrowserSlot, prefetched: PrefetchedListing):
+    """Close the prefetched tab in `slot` (the leaseholder's browser) once messaging is done with it."""
+    index = await _tab_index_for(slot, prefetched.url)
+    if index is not None:
+        await slot.call("browser_tabs", {"action": "close", "index": index})
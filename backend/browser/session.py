@@ -0,0 +1,199 @@
+"""
+Browser Sessions - the browser layer owns Facebook authentication.
+
+Before a leased browser is handed to a worker, `ensure_logged_in` checks the
+session without involving the LLM:
+  1. restore the persisted storage state for this MCP endpoint (once per process)
+  2. load Marketplace and look for a login wall in the snapshot
+  3. if walled, fill the login form deterministically and persist the new state
+
+A failed login is not retried on the next lease: each endpoint backs off for
+LOGIN_BACKOFF_SECONDS, doubling per consecutive failure up to
+LOGIN_BACKOFF_MAX_SECONDS, so bad credentials or a checkpoint page can't
+turn every lease into another credentialed attempt (and a locked account).
+
+Storage state lives in SESSION_DIR (default ~/.roomie/sessions), one file per
+endpoint. Save/restore needs the server's `browser_run_code` tool; without it
+the deterministic login still runs, it just can't survive a restart.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from backend import replay
+from backend.browser import snapshot_cache
+from backend.browser.mcp_client import get_session_tool
+from backend.browser.pool import BrowserSlot, tool_text
+
+log = logging.getLogger(__name__)
+
+
+SESSION_DIR = Path(os.getenv("SESSION_DIR", Path.home() / ".roomie" / "sessions"))
+SESSION_CHECK_TTL = 600  # seconds a verified session is trusted before re-checking
+LOGIN_BACKOFF_SECONDS = 60
+LOGIN_BACKOFF_MAX_SECONDS = 3600
+CHECK_URL = "https://www.facebook.com/marketplace/"
+LOGIN_URL = "https://www.facebook.com/login"
+
+_LOGIN_MARKERS = (
+    re.compile(r'textbox "(Email|Email address|Email or phone number|Email address or phone number)"', re.IGNORECASE),
+    re.compile(r"Page URL: https://(www\.|m\.)?facebook\.com/(login|checkpoint)", re.IGNORECASE),
+    re.compile(r"You must log in to continue", re.IGNORECASE),
+)
+
+# slot url -> monotonic time the session was last verified
+_verified_at: dict[str, float] = {}
+_restored: set[str] = set()
+# slot url -> (consecutive failed logins, monotonic time of the last one)
+_login_failures: dict[str, tuple[int, float]] = {}
+
+
+def _credentials() -> tuple[str, str]:
+    # Read lazily — .env is loaded after this module is imported
+    return os.getenv("FB_EMAIL", ""), os.getenv("FB_PASSWORD", "")
+
+
+def has_credentials() -> bool:
+    return all(_credentials())
+
+
+def is_login_wall(snapshot: str) -> bool:
+    """True if a page snapshot is a Facebook login page/dialog."""
+    if any(m.search(snapshot) for m in _LOGIN_MARKERS[1:]):
+        return True
+    return bool(_LOGIN_MARKERS[0].search(snapshot)) and 'textbox "Password"' in snapshot
+
+
+def _ref_of(snapshot: str, pattern: str) -> str | None:
+    match = re.search(pattern + r'[^\n]*?\[ref=(e\d+)\]', snapshot, re.IGNORECASE)
+    return match.group(1) if match else None
+
+
+def _state_path(slot: BrowserSlot) -> Path:
+    parts = urlsplit(slot.url)
+    return SESSION_DIR / f"{parts.hostname}_{parts.port or 80}.json"
+
+
+async def _run_code(slot: BrowserSlot, code: str) -> str | None:
+    tool = get_session_tool(slot.url, "browser_run_code")
+    if tool is None:
+        return None
+    return tool_text(await tool.ainvoke({"code": code}))
+
+
+async def save_storage_state(slot: BrowserSlot):
+    """Persist the browser context's cookies/localStorage for this endpoint."""
+    out = await _run_code(slot, "async (page) => await page.context().storageState()")
+    if out is None:
+        return
+    # The result section holds the returned object as JSON
+    match = re.search(r"\{.*\}", out, re.DOTALL)
+    if not match:
+        return
+    state = json.loads(match.group(0))
+    path = _state_path(slot)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Cookies never exist on disk with wider permissions: write a 0600 temp file and swap it in
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)  # a leftover from a crash may have any mode; O_EXCL creates it afresh
+    with os.fdopen(os.open(tmp, os.O_CREAT | os.O_WRONLY | os.O_EXCL, 0o600), "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+    log.info(f"[SESSION] {slot.name} saved storage state ({len(state.get('cookies', []))} cookies)")
+
+
+async def restore_storage_state(slot: BrowserSlot) -> bool:
+    """Load persisted cookies into the browser context. Returns True if anything was restored."""
+    path = _state_path(slot)
+    if not path.exists():
+        return False
+    cookies = json.loads(path.read_text()).get("cookies", [])
+    if not cookies:
+        return False
+    out = await _run_code(slot, f"async (page) => {{ await page.context().addCookies({json.dumps(cookies)}); }}")
+    if out is None:
+        return False
+    log.info(f"[SESSION] {slot.name} restored {len(cookies)} cookies from {path.name}")
+    return True
+
+
+async def login(slot: BrowserSlot) -> bool:
+    """Fill the Facebook login form without the LLM. Returns True on success."""
+    snapshot = await slot.call("browser_navigate", {"url": LOGIN_URL})
+    email_ref = _ref_of(snapshot, r'textbox "Email[^"]*"')
+    password_ref = _ref_of(snapshot, r'textbox "Password"')
+    if not (email_ref and password_ref):
+        snapshot = await slot.call("browser_snapshot")
+        email_ref = _ref_of(snapshot, r'textbox "Email[^"]*"')
+        password_ref = _ref_of(snapshot, r'textbox "Password"')
+    if not (email_ref and password_ref):
+        log.warning(f"[SESSION] {slot.name} login form not found")
+        return False
+
+    email, password = _credentials()
+    await slot.call("browser_type", {"element": "Email or phone number", "ref": email_ref, "text": email})
+    await slot.call("browser_type", {"element": "Password", "ref": password_ref, "text": password, "submit": True})
+    await slot.call("browser_wait_for", {"time": 3})
+
+    snapshot = await slot.call("browser_navigate", {"url": CHECK_URL})
+    ok = not is_login_wall(snapshot)
+    log.info(f"[SESSION] {slot.name} deterministic login {'succeeded' if ok else 'FAILED'}")
+    return ok
+
+
+def login_backoff_remaining(url: str) -> float:
+    """Seconds before another login may be attempted on this endpoint (0: go ahead)."""
+    failures, last = _login_failures.get(url, (0, 0.0))
+    if not failures:
+        return 0.0
+    backoff = min(LOGIN_BACKOFF_SECONDS * 2 ** (failures - 1), LOGIN_BACKOFF_MAX_SECONDS)
+    return max(0.0, last + backoff - time.monotonic())
+
+
+def _login_failed(slot: BrowserSlot, reason: str):
+    failures = _login_failures.get(slot.url, (0, 0.0))[0] + 1
+    _login_failures[slot.url] = (failures, time.monotonic())
+    log.error(
+        f"[SESSION] {slot.name} Facebook login failed ({reason}; {failures} in a row). "
+        f"Handing out the browser logged out; no new attempt for {login_backoff_remaining(slot.url):.0f}s"
+    )
+
+
+async def ensure_logged_in(slot: BrowserSlot):
+    """Make sure `slot` has a live Facebook session before a worker gets it."""
+    if not has_credentials() or replay.mode() == "replay":
+        return  # nothing to log in to behind a cassette
+    checked = _verified_at.get(slot.url)
+    if checked is not None and time.monotonic() - checked < SESSION_CHECK_TTL:
+        return
+    if login_backoff_remaining(slot.url) > 0:
+        log.warning(f"[SESSION] {slot.name} is logged out; login retry in {login_backoff_remaining(slot.url):.0f}s")
+        return
+
+    try:
+        # A cached page would hide a login wall; credentials and cookies never go in a cassette
+        with snapshot_cache.bypass(), replay.private():
+            if slot.url not in _restored:
+                _restored.add(slot.url)
+                await restore_storage_state(slot)
+
+            snapshot = await slot.call("browser_navigate", {"url": CHECK_URL})
+            if is_login_wall(snapshot):
+                try:
+                    ok = await login(slot)
+                except Exception as e:
+                    _login_failed(slot, f"error: {e}")
+                    return
+                if not ok:
+                    _login_failed(slot, "still on the login wall")
+                    return
+                _login_failures.pop(slot.url, None)
+                await save_storage_state(slot)
+        _verified_at[slot.url] = time.monotonic()
+    except Exception as e:
+        log.warning(f"[SESSION] {slot.name} session check failed: {e}")
@@ -0,0 +1,207 @@
+"""
+Snapshot Cache - recent browser_navigate / browser_snapshot results, served
+without touching a browser.
+
+Search workers keep opening the same `marketplace/brisbane/search?query=...`
+pages another thread opened seconds earlier, then snapshot and scroll them
+the same way (navigate -> snapshot -> PageDown -> snapshot). Those results
+are cached, shared across browsers, for BROWSER_CACHE_TTL seconds (at most
+BROWSER_CACHE_MAX_ENTRIES, least recently used evicted first):
+
+  ("navigate", url)             the navigate result
+  (url, scroll, "snapshot")     a snapshot after `scroll` PageDowns
+  (url, scroll, "PageDown")     the PageDown result
+
+URLs are normalised (host case, www./m., trailing slash, query order,
+tracking params). A cache hit leaves the browser where it was: each browser
+remembers the page its worker *thinks* it is on, and only when the worker
+does something a cached result can't answer (a click, a miss, ...) is that
+page actually loaded - navigate, then the same PageDowns - before the call.
+
+Element refs (`[ref=e41]`) in a cached result belong to whichever browser
+took it. So an action that targets a ref after a cached result is not
+forwarded: the real page is snapshotted instead and that snapshot returned,
+with a note, so the model re-targets against refs that exist.
+
+Messaging, session checks and listing prefetch act on real pages and must
+never see cached ones; they run under `bypass()`. The cache is off while
+recording or replaying cassettes (BROWSER_CACHE=0 turns it off entirely).
+"""
+
+import contextvars
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from backend import replay
+from backend.tracing import BROWSER_CACHE
+
+log = logging.getLogger(__name__)
+
+BROWSER_CACHE_ENABLED = os.getenv("BROWSER_CACHE", "1") != "0"
+BROWSER_CACHE_TTL = float(os.getenv("BROWSER_CACHE_TTL", "60"))  # seconds — search results move
+BROWSER_CACHE_MAX_ENTRIES = int(os.getenv("BROWSER_CACHE_MAX_ENTRIES", "256"))
+SCROLL_KEYS = {"PageDown"}
+_TRACKING_PARAMS = {"ref", "referral_code", "referral_story_type", "tracking", "fbclid", "__tn__", "mibextid"}
+_REF_ARGS = {"ref", "startRef", "endRef", "fields"}
+STALE_REFS_NOTE = (
+    "The page was re-rendered and element refs have changed. "
+    "Your action was NOT performed - use the refs in this snapshot."
+)
+
+_bypass = contextvars.ContextVar("browser_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass():
+    """Browser calls in this block always go to the browser and are never cached."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.").removeprefix("m.")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    )
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/") or "/", urlencode(query), ""))
+
+
+class SnapshotCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple[float, object]]" = OrderedDict()
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self._entries.pop(key, None)
+            BROWSER_CACHE.inc({"result": "miss"})
+            return None
+        self._entries.move_to_end(key)
+        BROWSER_CACHE.inc({"result": "hit"})
+        return entry[1]
+
+    def put(self, key: tuple, result):
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+cache = SnapshotCache(BROWSER_CACHE_TTL, BROWSER_CACHE_MAX_ENTRIES)
+
+
+def _with_note(result, note: str):
+    """Prefix a tool result (str, content blocks or (content, artifact)) with a text note."""
+    if isinstance(result, tuple) and result:
+        return (_with_note(result[0], note), *result[1:])
+    if isinstance(result, list):
+        return [{"type": "text", "text": note}, *result]
+    return f"{note}\n\n{result}"
+
+
+class _Page:
+    """The page a browser's current leaseholder believes it is on."""
+
+    def __init__(self):
+        self.forget()
+
+    def forget(self):
+        self.url = None  # normalised; None: unknown (after a click, a tab switch, ...)
+        self.raw_url = ""  # as the worker asked for it, to load it by
+        self.scroll = 0
+        self.loaded = True  # False: served from the cache, the browser is elsewhere
+        self.cached_refs = False  # the worker's latest refs came from a cached result
+
+    def go(self, raw_url: str, loaded: bool):
+        self.url, self.raw_url, self.scroll, self.loaded = normalize_url(raw_url), raw_url, 0, loaded
+        self.cached_refs = not loaded
+
+
+def wrap_tools(tools: list, browser: str) -> list:
+    """Put one browser's MCP tools behind the cache (wraps their coroutines in place)."""
+    if not BROWSER_CACHE_ENABLED or replay.mode():
+        return tools
+    raw = {t.name: t.coroutine for t in tools if getattr(t, "coroutine", None) is not None}
+    if "browser_navigate" not in raw:
+        return tools
+    page = _Page()
+
+    async def load():
+        """Actually open the page the worker was served from the cache."""
+        if page.loaded:
+            return
+        raw_url, scroll = page.raw_url, page.scroll
+        page.forget()  # if loading fails part way, the browser's page is unknown
+        await raw["browser_navigate"](url=raw_url)
+        for _ in range(scroll):
+            await raw["browser_press_key"](key="PageDown")
+        page.go(raw_url, loaded=True)
+        page.scroll = scroll
+        page.cached_refs = True  # the worker still holds the cached result's refs
+        log.debug(f"[BROWSER_CACHE] {browser} loaded {raw_url[:80]} (scroll {scroll})")
+
+    def wrap(tool):
+        inner = raw[tool.name]
+
+        async def cached(*args, **kwargs):
+            if _bypass.get():
+                page.forget()
+                return await inner(*args, **kwargs)
+
+            if tool.name == "browser_navigate":
+                url = kwargs.get("url", "")
+                key = ("navigate", normalize_url(url))
+                result = cache.get(key)
+                if result is not None:
+                    page.go(url, loaded=False)
+                    return result
+                page.forget()
+                result = await inner(*args, **kwargs)
+                page.go(url, loaded=True)
+                cache.put(key, result)
+                return result
+
+            op = "snapshot" if tool.name == "browser_snapshot" else (
+                kwargs.get("key") if tool.name == "browser_press_key" and kwargs.get("key") in SCROLL_KEYS else None
+            )
+            if op is not None and page.url is not None:
+                key = (page.url, page.scroll, op)
+                result = cache.get(key)
+                if result is None:
+                    await load()
+                    result = await inner(*args, **kwargs)
+                    cache.put(key, result)
+                    page.cached_refs = False
+                else:
+                    page.cached_refs = True
+                if op in SCROLL_KEYS:
+                    page.scroll += 1
+                return result
+
+            # Anything else acts on the real page, and may change it
+            await load()
+            if page.cached_refs and _REF_ARGS & kwargs.keys() and "browser_snapshot" in raw:
+                page.cached_refs = False
+                log.debug(f"[BROWSER_CACHE] {browser} {tool.name} targets cached refs; re-snapshotting")
+                return _with_note(await raw["browser_snapshot"](), STALE_REFS_NOTE)
+            try:
+                return await inner(*args, **kwargs)
+            finally:
+                if tool.name not in ("browser_snapshot", "browser_take_screenshot", "browser_wait_for"):
+                    page.forget()
+
+        tool.coroutine = cached
+        return tool
+
+    return [wrap(t) if t.name in raw else t for t in tools]
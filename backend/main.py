@@ -1,22 +1,31 @@
 import asyncio
 import io
 import json
+import logging
 import os
+import re
 import uuid
 import base64
 from pathlib import Path
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, model_validator
 from dotenv import load_dotenv
-from openai import AsyncOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
-from langgraph.types import Command
 
-# Load .env from project root
+# Load .env from project root (before backend modules read their settings)
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
+from backend import startup, tracing
+from backend.api.admission import Overloaded, admission
+from backend.api.jobs import jobs
+from backend.api import tts_cache, uploads
+from backend.search import types as listing_codec
+
+# Verbose [TAG] debug logs are off unless LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s %(name)s %(message)s")
+log = logging.getLogger(__name__)
+
 app = FastAPI(title="Roomie API")
 
 app.add_middleware(
@@ -27,9 +36,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Lazy load agent to avoid import issues at startup
+# The agent (and the langchain/langgraph/openai imports behind it) is built
+# by the warm-up task at startup, or on first use if warm-up is disabled/failed
 _agent = None
 _agent_lock = asyncio.Lock()
+STARTUP_WARM = os.getenv("STARTUP_WARM", "1") != "0"
+_warmup: asyncio.Task | None = None
 
 
 async def get_agent():
@@ -38,53 +50,130 @@ async def get_agent():
         return _agent
     async with _agent_lock:
         if _agent is None:  # double-check after acquiring lock
-            from backend.agent.graph import create_agent
+            startup.begin()
+            with startup.phase("imports"):
+                from backend.agent.graph import create_agent
             _agent = await create_agent()
-            print(f"[GET_AGENT] Created agent id={id(_agent)}")
+            startup.finish()
+            log.info(f"[GET_AGENT] Created agent id={id(_agent)}")
     return _agent
 
 
+async def _warm_up():
+    try:
+        await get_agent()
+    except Exception as e:
+        log.warning(f"[STARTUP] Warm-up failed, the first request will retry: {e}")
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Build the agent in the background so the first user doesn't pay for it.
+
+    The server accepts requests (e.g. /health) straight away; chat requests
+    that arrive mid warm-up simply wait on the same build.
+    """
+    global _warmup
+    if STARTUP_WARM:
+        _warmup = asyncio.create_task(_warm_up())
+
+
 class ChatMessage(BaseModel):
     role: str
     content: str
-    image: str | None = None  # base64 encoded image
+    image: str | None = None  # base64 encoded image (older clients; prefer image_id)
+    image_id: str | None = None  # from POST /api/uploads/image
 
 
 class ChatRequest(BaseModel):
-    messages: list[ChatMessage]
+    # Either just the new turn (`message`) — the thread's history lives in the
+    # checkpointer — or, from older clients, the whole conversation (`messages`)
+    message: ChatMessage | None = None
+    messages: list[ChatMessage] = []
     thread_id: str | None = None
+    request_id: str | None = None  # idempotency key: resubmitting returns the same job
+    voice: bool = False  # voice mode: synthesise the reply's speech as soon as it is ready
+
+    @model_validator(mode="after")
+    def _has_turn(self):
+        if self.message is None and not self.messages:
+            raise ValueError("send the new turn as `message` (or the full history as `messages`)")
+        return self
+
+    def new_messages(self) -> list[ChatMessage]:
+        return [self.message] if self.message is not None else self.messages
 
 
 class ResumeRequest(BaseModel):
     thread_id: str
     action: str  # "approve_all", "approve_selected", "reject"
     selected_ids: list[str] | None = None
+    request_id: str | None = None
+    voice: bool = False
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "agent": startup.report()["status"],
+        "runs": {"active": admission.active, "queued": admission.queued},
+    }
+
+
+@app.get("/api/startup")
+async def startup_timings():
+    """Warm-up timing breakdown: imports, MCP tool loading per browser, checkpointer, compile."""
+    return startup.report()
+
+
+def _last_message_id(values: dict | None) -> str | None:
+    """The thread's high-water mark: the last message already in its checkpoint."""
+    messages = (values or {}).get("messages") or []
+    return messages[-1].id if messages else None
 
 
-def _extract_response(result):
-    """Extract content, tool_calls, and products from an agent result."""
+async def _high_water_of(agent, config: dict) -> str | None:
+    """Read the mark from the checkpoint before a run, so any worker process sees the same one."""
+    return _last_message_id((await agent.aget_state(config)).values)
+
+
+def _run_start(messages: list, after_id: str | None) -> int:
+    """Index of the first message produced after `after_id` (searched from the end)."""
+    if after_id is None:
+        return 0
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].id == after_id:
+            return i + 1
+    return 0  # mark no longer in the thread: fall back to a full scan
+
+
+def _extract_response(result, start: int = 0):
+    """Extract content, tool_calls, and products from an agent result.
+
+    Only messages from `start` on (the current run) contribute content, tool
+    calls and products, so long threads don't resend their whole history every
+    turn. A run with no new AI text (e.g. one that paused straight into an
+    approval interrupt) gets "" — the interrupt payload is sent alongside.
+    """
+    from langchain_core.messages import AIMessage
+
+    run_messages = result["messages"][start:]
+
     # Walk backwards to find the last AIMessage with real content
     # (skip ToolMessages which contain raw JSON that shouldn't be displayed)
     content = ""
-    for msg in reversed(result["messages"]):
+    for msg in reversed(run_messages):
         if isinstance(msg, AIMessage) and msg.content:
             text = msg.content if isinstance(msg.content, str) else str(msg.content)
             # Skip AI messages that are just tool call placeholders (empty or whitespace)
             if text.strip():
                 content = text
                 break
-    # Fallback to last message if no AI content found
-    if not content:
-        content = result["messages"][-1].content
 
     tool_results = []
     products = []
-    for msg in result["messages"]:
+    for msg in run_messages:
         if hasattr(msg, "tool_calls") and msg.tool_calls:
             for tc in msg.tool_calls:
                 tool_results.append({
@@ -102,24 +191,43 @@ def _extract_response(result):
     return content, tool_results, products
 
 
-@app.post("/api/chat")
-async def chat(request: ChatRequest):
-    agent = await get_agent()
+def _busy_response(thread_id: str, e: Overloaded) -> JSONResponse:
+    log.warning(f"[ADMISSION] Rejected {thread_id}: {e.reason}")
+    return JSONResponse(
+        {"error": "busy", "detail": e.reason, "retry_after": e.retry_after, "thread_id": thread_id},
+        status_code=429,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event['id']}\ndata: {listing_codec.dumps(event['data'])}\n\n"
 
-    thread_id = request.thread_id or str(uuid.uuid4())
-    print(f"[CHAT] thread_id={thread_id}, incoming_thread_id={request.thread_id}, message_count={len(request.messages)}")
 
-    # Convert messages to LangChain format
+async def _stream_job(job, after: int = -1):
+    """SSE body for a job: its events (replayed, then live) and a final [DONE]."""
+    async for event in jobs.subscribe(job, after):
+        yield _sse(event)
+    yield "data: [DONE]\n\n"
+
+
+def _to_lc_messages(messages: list[ChatMessage]) -> list:
+    """Convert messages to LangChain format."""
+    from langchain_core.messages import HumanMessage, AIMessage
+
     lc_messages = []
-    for msg in request.messages:
+    for msg in messages:
         if msg.role == "user":
-            if msg.image:
+            image = uploads.load_image_base64(msg.image_id) if msg.image_id else msg.image
+            if msg.image_id and image is None:
+                log.warning(f"[CHAT] Unknown or expired image_id {msg.image_id}")
+            if image:
                 content = [
                     {"type": "text", "text": msg.content or "Please analyze this room."},
                     {
                         "type": "image_url",
                         "image_url": {
-                            "url": f"data:image/jpeg;base64,{msg.image}",
+                            "url": f"data:image/jpeg;base64,{image}",
                         },
                     },
                 ]
@@ -128,88 +236,74 @@ async def chat(request: ChatRequest):
                 lc_messages.append(HumanMessage(content=msg.content))
         elif msg.role == "assistant":
             lc_messages.append(AIMessage(content=msg.content))
+    return lc_messages
+
 
+def _interrupt_of(state):
+    """The pending interrupt value of a paused graph, if any."""
+    if state.next and state.tasks:
+        for task in state.tasks:
+            if hasattr(task, "interrupts") and task.interrupts:
+                return task.interrupts[0].value
+    return None
+
+
+def _chat_run(agent, thread_id: str, request: ChatRequest):
+    """The graph run for one chat turn, as a coroutine function for the job pool."""
     config = {
         "configurable": {"thread_id": thread_id},
         "recursion_limit": 100,
     }
 
-    async def event_stream():
-        try:
-            result = await agent.ainvoke(
-                {
-                    "messages": lc_messages,
-                    "room_analysis": None,
-                    "shopping_list": [],
-                    "search_results": [],
-                    "pending_proposal": None,
-                    "approved_items": [],
-                    "search_tasks": [],
-                    "current_task_index": 0,
-                    "worker_results": [],
-                    "_tasks_a": [],
-                    "_tasks_b": [],
-                    "_messaging_tasks": [],
-                    "_messaging_results": [],
-                },
-                config=config,
-            )
-
-            content, tool_results, products = _extract_response(result)
-            print(f"[CHAT] ainvoke returned. Message count in result: {len(result.get('messages', []))}")
-            print(f"[CHAT] agent id={id(agent)}, checkpointer id={id(agent.checkpointer) if hasattr(agent, 'checkpointer') else 'N/A'}")
-
-            # Check if the graph hit an interrupt
-            state = await agent.aget_state(config)
-            print(f"[CHAT] Post-ainvoke state.next={state.next}, tasks={[t.name if hasattr(t, 'name') else str(t) for t in (state.tasks or [])]}")
-            if hasattr(agent, 'checkpointer') and hasattr(agent.checkpointer, 'storage'):
-                print(f"[CHAT] Checkpointer storage keys: {list(agent.checkpointer.storage.keys())[:5]}")
-            if state.next:  # graph is paused at a node
-                # Find the interrupt data from the state's tasks
-                interrupt_data = None
-                if state.tasks:
-                    for task in state.tasks:
-                        if hasattr(task, "interrupts") and task.interrupts:
-                            interrupt_data = task.interrupts[0].value
-                            break
-
-                response_data = {
-                    "role": "assistant",
-                    "content": content,
-                    "tool_calls": tool_results,
-                    "products": products,
-                    "thread_id": thread_id,
-                    "interrupt": interrupt_data,
-                }
-            else:
-                response_data = {
-                    "role": "assistant",
-                    "content": content,
-                    "tool_calls": tool_results,
-                    "products": products,
-                    "thread_id": thread_id,
-                }
-
-            yield f"data: {json.dumps(response_data)}\n\n"
-            yield "data: [DONE]\n\n"
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            error_data = {
-                "role": "assistant",
-                "content": f"I encountered an error: {str(e)}. Please try again.",
-                "thread_id": thread_id,
-            }
-            yield f"data: {json.dumps(error_data)}\n\n"
-            yield "data: [DONE]\n\n"
-
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
-
-
-@app.post("/api/chat/resume")
-async def chat_resume(request: ResumeRequest):
-    """Resume the graph after a human approval interrupt."""
-    agent = await get_agent()
+    async def run() -> dict:
+        # Uploaded photos are read from disk here, off the event loop
+        lc_messages = await asyncio.to_thread(_to_lc_messages, request.new_messages())
+        mark = await _high_water_of(agent, config) if request.thread_id else None
+        result = await agent.ainvoke(
+            {
+                "messages": lc_messages,
+                "shopping_list": [],
+                "search_results": [],
+                "pending_proposal": None,
+                "dispatch": None,
+                "approved_items": [],
+                # None clears the append-only task/result channels
+                "search_tasks": None,
+                "current_task_index": 0,
+                "worker_results": None,
+                "_messaging_tasks": None,
+                "_messaging_results": None,
+            },
+            config=config,
+        )
+
+        content, tool_results, products = _extract_response(result, _run_start(result["messages"], mark))
+
+        # Check if the graph hit an interrupt
+        state = await agent.aget_state(config)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"[CHAT] ainvoke returned. Message count in result: {len(result.get('messages', []))}")
+            log.debug(f"[CHAT] Post-ainvoke state.next={state.next}, tasks={[t.name if hasattr(t, 'name') else str(t) for t in (state.tasks or [])]}")
+
+        response_data = {
+            "role": "assistant",
+            "content": content,
+            "tool_calls": tool_results,
+            "products": products,
+            "thread_id": thread_id,
+        }
+        if state.next:  # graph is paused at a node
+            response_data["interrupt"] = _interrupt_of(state)
+        if request.voice:
+            tts_cache.presynthesize(content)
+        return response_data
+
+    return run
+
+
+def _resume_run(agent, request: ResumeRequest):
+    """The graph run resuming a human approval interrupt, as a coroutine function for the job pool."""
+    from langgraph.types import Command
 
     config = {
         "configurable": {"thread_id": request.thread_id},
@@ -224,83 +318,257 @@ async def chat_resume(request: ResumeRequest):
     else:
         resume_value = {"action": "reject"}
 
-    async def event_stream():
-        try:
-            # Debug: check state before resume
-            print(f"[RESUME] agent id={id(agent)}, checkpointer id={id(agent.checkpointer) if hasattr(agent, 'checkpointer') else 'N/A'}")
-            if hasattr(agent, 'checkpointer') and hasattr(agent.checkpointer, 'storage'):
-                print(f"[RESUME] Checkpointer storage keys: {list(agent.checkpointer.storage.keys())[:5]}")
-            pre_state = await agent.aget_state(config)
-            print(f"[RESUME] thread_id={request.thread_id}, action={request.action}")
-            print(f"[RESUME] Pre-resume state.next={pre_state.next}")
-            print(f"[RESUME] Pre-resume tasks={[t.name if hasattr(t, 'name') else str(t) for t in (pre_state.tasks or [])]}")
-            if pre_state.values.get("messages"):
-                print(f"[RESUME] Pre-resume message count={len(pre_state.values['messages'])}")
+    async def run() -> dict:
+        pre_state = await agent.aget_state(config)
+        mark = _last_message_id(pre_state.values)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(f"[RESUME] thread_id={request.thread_id}, action={request.action}")
+            log.debug(f"[RESUME] Pre-resume state.next={pre_state.next}")
+            log.debug(f"[RESUME] Pre-resume tasks={[t.name if hasattr(t, 'name') else str(t) for t in (pre_state.tasks or [])]}")
+            log.debug(f"[RESUME] Pre-resume message count={len(pre_state.values.get('messages', []))}")
+
+        result = await agent.ainvoke(
+            Command(resume=resume_value),
+            config=config,
+        )
+
+        content, tool_results, products = _extract_response(result, _run_start(result["messages"], mark))
+
+        # Check for another interrupt (e.g. contact_sellers after shortlist approval)
+        interrupt_data = _interrupt_of(await agent.aget_state(config))
+
+        response_data = {
+            "role": "assistant",
+            "content": content,
+            "tool_calls": tool_results,
+            "products": products,
+            "thread_id": request.thread_id,
+        }
+        if interrupt_data:
+            response_data["interrupt"] = interrupt_data
+        if request.voice:
+            tts_cache.presynthesize(content)
+        return response_data
+
+    return run
+
+
+@app.post("/api/chat")
+async def chat(request: ChatRequest):
+    agent = await get_agent()
+
+    thread_id = request.thread_id or str(uuid.uuid4())
+    log.debug(f"[CHAT] thread_id={thread_id}, incoming_thread_id={request.thread_id}, message_count={len(request.new_messages())}")
+    try:
+        job = await jobs.submit(thread_id, "chat", _chat_run(agent, thread_id, request), request.request_id)
+    except Overloaded as e:
+        return _busy_response(thread_id, e)
+
+    # The run is a background job: a dropped connection doesn't stop it
+    return StreamingResponse(_stream_job(job), media_type="text/event-stream")
+
+
+@app.get("/api/threads/{thread_id}/messages")
+async def thread_messages(thread_id: str):
+    """The conversation as the server holds it — what a client shows after a reload."""
+    agent = await get_agent()
+    state = await agent.aget_state({"configurable": {"thread_id": thread_id}})
+    history = []
+    for msg in state.values.get("messages", []) if state.values else []:
+        role = {"human": "user", "ai": "assistant"}.get(msg.type)
+        if role is None:
+            continue
+        parts = msg.content if isinstance(msg.content, list) else [{"type": "text", "text": msg.content}]
+        text = "".join(p.get("text", "") for p in parts if isinstance(p, dict) and p.get("type") == "text")
+        has_image = any(isinstance(p, dict) and p.get("type") == "image_url" for p in parts)
+        if text or has_image:
+            history.append({"id": msg.id, "role": role, "content": text, "has_image": has_image})
+    if not history:
+        return JSONResponse({"thread_id": thread_id, "messages": [], "status": "not_found"}, status_code=404)
+    return {"thread_id": thread_id, "messages": history, "status": "ok"}
+
+
+@app.post("/api/chat/resume")
+async def chat_resume(request: ResumeRequest):
+    """Resume the graph after a human approval interrupt."""
+    agent = await get_agent()
+    try:
+        job = await jobs.submit(request.thread_id, "resume", _resume_run(agent, request), request.request_id)
+    except Overloaded as e:
+        return _busy_response(request.thread_id, e)
+
+    return StreamingResponse(_stream_job(job), media_type="text/event-stream")
+
+
+# ---- Background jobs: submit now, collect the result later ----
+
+@app.post("/api/jobs/chat", status_code=202)
+async def submit_chat_job(request: ChatRequest):
+    """Start a chat turn without holding the connection open. Returns the job id."""
+    agent = await get_agent()
+    thread_id = request.thread_id or str(uuid.uuid4())
+    try:
+        job = await jobs.submit(thread_id, "chat", _chat_run(agent, thread_id, request), request.request_id)
+    except Overloaded as e:
+        return _busy_response(thread_id, e)
+    return job.summary()
+
+
+@app.post("/api/jobs/resume", status_code=202)
+async def submit_resume_job(request: ResumeRequest):
+    """Resume after approval as a background job. Returns the job id."""
+    agent = await get_agent()
+    try:
+        job = await jobs.submit(request.thread_id, "resume", _resume_run(agent, request), request.request_id)
+    except Overloaded as e:
+        return _busy_response(request.thread_id, e)
+    return job.summary()
+
+
+def _job_not_found(job_id: str) -> JSONResponse:
+    return JSONResponse({"job_id": job_id, "status": "not_found"}, status_code=404)
+
+
+@app.get("/api/jobs/{job_id}")
+async def poll_job(job_id: str, after: int = -1):
+    """Job status plus its events with id > `after`."""
+    job = await jobs.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    body = {**job.summary(), "events": job.events[after + 1:]}
+    return Response(listing_codec.dumps(body), media_type="application/json")
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, after: int = -1, last_event_id: str | None = Header(default=None)):
+    """Subscribe to a job's events over SSE. Reconnects resume after Last-Event-ID."""
+    job = await jobs.get(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    if last_event_id is not None and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+    return StreamingResponse(_stream_job(job, after), media_type="text/event-stream")
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await jobs.cancel(job_id)
+    if job is None:
+        return _job_not_found(job_id)
+    return job.summary()
+
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    await jobs.shutdown()
+
+
+@app.on_event("shutdown")
+async def close_browser_observers():
+    from backend.browser import observer
+
+    await observer.close_all()
+
+
+@app.on_event("shutdown")
+async def close_openai_pool():
+    from backend import openai_pool
+
+    await openai_pool.aclose()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus-style metrics: node/model/MCP tool latency, tokens, worker steps."""
+    return PlainTextResponse(tracing.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/traces/{thread_id}")
+async def thread_trace(thread_id: str):
+    """Recent node, model, tool and worker events recorded for one thread."""
+    trace = tracing.get_trace(thread_id)
+    if trace is None:
+        return JSONResponse({"thread_id": thread_id, "events": [], "status": "not_found"}, status_code=404)
+    return JSONResponse({"thread_id": thread_id, "events": trace, "status": "ok"})
+
+
+LIVE_VIEW_KEEPALIVE = 15.0  # seconds between SSE comments on a page that isn't changing
+
+
+@app.get("/api/browser/slots")
+async def browser_slots():
+    """Names of the pooled browsers, one live view each."""
+    from backend.browser import live_view
+    return JSONResponse({"slots": list(live_view.slot_urls())})
+
+
+@app.get("/api/browser/live/{slot}")
+async def browser_live(slot: str):
+    """Server-push live view of one pooled browser: an SSE event per changed frame."""
+    from backend.browser import live_view
+    view = live_view.get(slot)
+    if view is None:
+        return JSONResponse({"error": "unknown browser", "slot": slot}, status_code=404)
+
+    async def stream():
+        async for frame in view.frames(keepalive=LIVE_VIEW_KEEPALIVE):
+            if frame is None:
+                yield ": keepalive\n\n"
             else:
-                print(f"[RESUME] Pre-resume messages=EMPTY")
-
-            result = await agent.ainvoke(
-                Command(resume=resume_value),
-                config=config,
-            )
-
-            content, tool_results, products = _extract_response(result)
-
-            # Check for another interrupt (e.g. contact_sellers after shortlist approval)
-            state = await agent.aget_state(config)
-            interrupt_data = None
-            if state.next and state.tasks:
-                for task in state.tasks:
-                    if hasattr(task, "interrupts") and task.interrupts:
-                        interrupt_data = task.interrupts[0].value
-                        break
-
-            response_data = {
-                "role": "assistant",
-                "content": content,
-                "tool_calls": tool_results,
-                "products": products,
-                "thread_id": request.thread_id,
-            }
-            if interrupt_data:
-                response_data["interrupt"] = interrupt_data
-
-            yield f"data: {json.dumps(response_data)}\n\n"
-            yield "data: [DONE]\n\n"
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            error_data = {
-                "role": "assistant",
-                "content": f"I encountered an error while processing your decision: {str(e)}",
-                "thread_id": request.thread_id,
-            }
-            yield f"data: {json.dumps(error_data)}\n\n"
-            yield "data: [DONE]\n\n"
-
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+                yield _sse({"id": frame.seq, "data": frame.to_event(slot)})
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def _observer_screenshot(slot: str) -> JSONResponse:
+    """The slot's latest observer frame (shared with every other viewer) as base64 JSON."""
+    from backend.browser import live_view, observer
+    url = live_view.slot_urls().get(slot)
+    frame = await observer.get(url).latest() if url else None
+    if frame is None:
+        return JSONResponse({"screenshot": None, "status": "no_browser"})
+    return JSONResponse({"screenshot": base64.b64encode(frame).decode(), "mime": "image/jpeg", "status": "ok"})
 
 
 @app.get("/api/browser/screenshot")
 async def browser_screenshot():
     """Return the current browser screenshot from Worker A."""
-    await get_agent()  # ensure MCP tools are loaded
-    from backend.browser.mcp_client import take_screenshot
-    result = await take_screenshot()
-    if result is None:
-        return JSONResponse({"screenshot": None, "status": "no_browser"})
-    return JSONResponse({"screenshot": result, "status": "ok"})
+    return await _observer_screenshot("A")
 
 
 @app.get("/api/browser/screenshot-b")
 async def browser_screenshot_b():
     """Return the current browser screenshot from Worker B."""
-    await get_agent()  # ensure MCP tools are loaded
-    from backend.browser.mcp_client import take_screenshot_b
-    result = await take_screenshot_b()
-    if result is None:
-        return JSONResponse({"screenshot": None, "status": "no_browser"})
-    return JSONResponse({"screenshot": result, "status": "ok"})
+    return await _observer_screenshot("B")
+
+
+@app.post("/api/uploads/image")
+async def upload_image(request: Request):
+    """Upload a room photo (raw image body or multipart `file`); returns the image_id to chat with."""
+    from starlette.formparsers import MultiPartException, MultiPartParser
+
+    try:
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            # Parsed into a spooled temp file as it arrives, capped while it is read
+            body = uploads.limit(request.stream(), overhead=uploads.MULTIPART_OVERHEAD)
+            form = await MultiPartParser(request.headers, body, max_files=1).parse()
+            upload = form.get("file")
+            if not hasattr(upload, "file"):
+                await form.close()
+                return JSONResponse({"error": "missing_file"}, status_code=400)
+            if upload.size is not None and upload.size > uploads.UPLOAD_MAX_BYTES:
+                await form.close()
+                raise uploads.too_large()
+            f = upload.file
+        else:
+            f = await uploads.spool(request.stream())
+        image_id = await uploads.store_image(f)
+    except uploads.UploadTooLarge as e:
+        return JSONResponse({"error": "too_large", "detail": str(e)}, status_code=413)
+    except (uploads.InvalidImage, MultiPartException) as e:
+        return JSONResponse({"error": "invalid_image", "detail": str(e)}, status_code=400)
+    return {"image_id": image_id}
 
 
 class TTSRequest(BaseModel):
@@ -308,38 +576,81 @@ class TTSRequest(BaseModel):
 
 
 @app.post("/api/voice/transcribe")
-async def voice_transcribe(file: UploadFile = File(...)):
-    """Transcribe audio to text using OpenAI Whisper."""
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_APIKEY"))
-    audio_bytes = await file.read()
-    transcript = await client.audio.transcriptions.create(
-        model="whisper-1",
-        file=("audio.webm", audio_bytes, file.content_type or "audio/webm"),
-    )
+async def voice_transcribe(request: Request):
+    """Transcribe a raw audio body to text using OpenAI Whisper."""
+    from backend.openai_pool import get_openai
+
+    try:
+        f = await uploads.spool(request.stream(), max_bytes=uploads.VOICE_MAX_BYTES)
+    except uploads.UploadTooLarge as e:
+        return JSONResponse({"error": "too_large", "detail": str(e)}, status_code=413)
+    content_type = request.headers.get("content-type") or "audio/webm"
+    try:
+        # Hand the spooled file over so it is streamed to Whisper in chunks
+        # instead of read into memory first
+        transcript = await get_openai().audio.transcriptions.create(
+            model="whisper-1",
+            file=("audio.webm", f, content_type),
+        )
+    finally:
+        f.close()
     return {"text": transcript.text}
 
 
+async def _audio_response(path: Path, key: str, range_header: str | None):
+    """A cached MP3, honouring a single `Range: bytes=start-end` request."""
+    size = path.stat().st_size
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{key}"',
+        "Cache-Control": "public, max-age=86400",
+        "Content-Disposition": "inline; filename=speech.mp3",
+    }
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (range_header or "").strip())
+    if not match or not any(match.groups()):
+        return FileResponse(path, media_type="audio/mpeg", headers=headers)
+
+    first, last = match.groups()
+    if first:
+        start, end = int(first), min(int(last) if last else size - 1, size - 1)
+    else:  # suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start > end:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    def read_range() -> bytes:
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(await asyncio.to_thread(read_range), status_code=206, media_type="audio/mpeg", headers=headers)
+
+
 @app.post("/api/voice/tts")
-async def voice_tts(req: TTSRequest):
-    """Convert text to speech using OpenAI TTS with streaming."""
-    client = AsyncOpenAI(api_key=os.getenv("OPENAI_APIKEY"))
-
-    async def stream_audio():
-        async with client.audio.speech.with_streaming_response.create(
-            model="tts-1",
-            voice="nova",
-            input=req.text,
-        ) as response:
-            async for chunk in response.iter_bytes(1024):
-                yield chunk
+async def voice_tts(req: TTSRequest, range: str | None = Header(default=None)):
+    """Convert text to speech: served from the audio cache when possible, else streamed from OpenAI TTS."""
+    key = tts_cache.speech_key(req.text)
+    path = await tts_cache.lookup(req.text)
+    if path is not None:
+        return await _audio_response(path, key, range)
 
     return StreamingResponse(
-        stream_audio(),
+        tts_cache.synthesize(req.text),
         media_type="audio/mpeg",
-        headers={"Content-Disposition": "inline; filename=speech.mp3"},
+        headers={"Content-Disposition": "inline; filename=speech.mp3", "ETag": f'"{key}"'},
     )
 
 
+@app.get("/api/voice/tts/{key}")
+async def voice_tts_cached(key: str, range: str | None = Header(default=None)):
+    """A cached speech file by its key (the ETag of a TTS response), with Range support."""
+    path = await asyncio.to_thread(tts_cache.cache.get, key) if re.fullmatch(r"[0-9a-f]{64}", key) else None
+    if path is None:
+        return JSONResponse({"error": "not_cached"}, status_code=404)
+    return await _audio_response(path, key, range)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
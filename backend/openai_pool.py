@@ -0,0 +1,176 @@
+"""
+OpenAI Pool - one shared HTTP connection pool for every OpenAI call.
+
+The chat models (via ChatOpenAI's http_async_client), Whisper and TTS all go
+through the same httpx.AsyncClient, so TLS connections are kept alive and
+reused instead of being set up per request or per client. The pool is
+configured from the environment:
+
+  OPENAI_MAX_CONNECTIONS   open connections (default 20)
+  OPENAI_MAX_KEEPALIVE     idle connections kept warm (default 10)
+  OPENAI_KEEPALIVE_EXPIRY  seconds an idle connection is kept (default 60)
+  OPENAI_MAX_CONCURRENCY   in-flight requests; extra requests wait (default 16)
+  OPENAI_HTTP2             multiplex over HTTP/2 when h2 is installed (default on)
+
+Request latency, permit waits, errors, in-flight requests and open/idle
+connections are exported on /metrics.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+from backend.tracing import OPENAI_ERRORS, OPENAI_LATENCY, OPENAI_POOL, OPENAI_WAIT
+
+log = logging.getLogger(__name__)
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1") != "0"
+OPENAI_TIMEOUT = httpx.Timeout(600.0, connect=10.0)  # gpt-5 turns can be long
+
+
+def _endpoint(request: httpx.Request) -> str:
+    """Metric label: the API path without the version prefix, e.g. chat/completions."""
+    path = urlsplit(str(request.url)).path
+    return path.split("/v1/", 1)[-1] or path
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that gives the concurrency permit back once it is closed."""
+
+    def __init__(self, inner: httpx.AsyncByteStream, release):
+        self._inner = inner
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._inner.aclose()
+        finally:
+            self._release()
+
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """Bounds in-flight requests and records metrics around a shared connection pool.
+
+    A permit is held until the response body is closed, so streamed TTS audio
+    counts as in flight for as long as it is being read.
+    """
+
+    def __init__(self, inner: httpx.AsyncHTTPTransport, max_concurrency: int):
+        self._inner = inner
+        self._max_concurrency = max_concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self.in_flight = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        labels = {"endpoint": _endpoint(request)}
+
+        start = time.perf_counter()
+        await self._semaphore.acquire()
+        OPENAI_WAIT.observe(labels, time.perf_counter() - start)
+        self.in_flight += 1
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                self.in_flight -= 1
+                self._semaphore.release()
+
+        start = time.perf_counter()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except Exception:
+            OPENAI_ERRORS.inc({**labels, "status": "transport"})
+            release()
+            raise
+        OPENAI_LATENCY.observe(labels, time.perf_counter() - start)
+        if response.status_code >= 400:
+            OPENAI_ERRORS.inc({**labels, "status": str(response.status_code)})
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    def connection_counts(self) -> dict[str, int]:
+        pool = getattr(self._inner, "_pool", None)
+        connections = getattr(pool, "connections", [])
+        idle = sum(1 for c in connections if c.is_idle())
+        return {"open": len(connections), "idle": idle}
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+_client: httpx.AsyncClient | None = None
+_transport: PooledTransport | None = None
+_openai = None
+
+
+def _http2_available() -> bool:
+    if not OPENAI_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        log.info("[OPENAI_POOL] h2 not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """The shared async HTTP client every OpenAI call goes through."""
+    global _client, _transport
+    if _client is None:
+        limits = httpx.Limits(
+            max_connections=OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY,
+        )
+        inner = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_available())
+        _transport = PooledTransport(inner, OPENAI_MAX_CONCURRENCY)
+        _client = httpx.AsyncClient(transport=_transport, timeout=OPENAI_TIMEOUT)
+    return _client
+
+
+def get_openai():
+    """Shared AsyncOpenAI client (Whisper, TTS) on the pooled HTTP client."""
+    global _openai
+    if _openai is None:
+        from openai import AsyncOpenAI
+
+        _openai = AsyncOpenAI(api_key=os.getenv("OPENAI_APIKEY"), http_client=get_http_client())
+    return _openai
+
+
+def _pool_gauge() -> dict[tuple, float]:
+    if _transport is None:
+        return {}
+    counts = _transport.connection_counts()
+    return {
+        (("state", "in_flight"),): _transport.in_flight,
+        (("state", "open"),): counts["open"],
+        (("state", "idle"),): counts["idle"],
+    }
+
+
+OPENAI_POOL.read = _pool_gauge
+
+
+async def aclose():
+    global _client, _transport, _openai
+    if _client is not None:
+        await _client.aclose()
+    _client, _transport, _openai = None, None, None
@@ -0,0 +1,162 @@
+"""
+Rate Limits - process-wide token buckets for model calls and marketplace navigations.
+
+Concurrency is already bounded (OPENAI_MAX_CONCURRENCY in-flight OpenAI
+requests, one worker per pooled browser), but not rate: a burst of threads
+could still fire more gpt-5 calls, or more Marketplace searches, per minute
+than the provider or the site tolerates, and the retries then push workers
+into their timeouts. These budgets are spent before a call goes out:
+
+  MODEL_RPM           chat model requests per minute (default 500)
+  MODEL_TPM           chat model tokens per minute (default 500000)
+  NAV_PER_MINUTE      browser_navigate calls per minute, per domain (default 30)
+
+Each bucket holds up to RATE_LIMIT_BURST_SECONDS of its rate, so short bursts
+go straight through and sustained load is paced. A caller that finds a
+bucket empty is queued (FIFO per bucket), never failed. Model tokens are
+reserved from an estimate of the prompt plus MODEL_OUTPUT_ESTIMATE and
+settled against the response's real usage. Time spent queued is exported as
+roomie_rate_limit_wait_seconds. RATE_LIMIT=0 turns the limits off.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from urllib.parse import urlsplit
+
+from backend import replay
+from backend.tracing import record_rate_limit_wait
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT", "1") != "0"
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+MODEL_RPM = float(os.getenv("MODEL_RPM", "500"))
+MODEL_TPM = float(os.getenv("MODEL_TPM", "500000"))
+MODEL_OUTPUT_ESTIMATE = 1024  # tokens reserved for the reply until its real usage is known
+NAV_PER_MINUTE = float(os.getenv("NAV_PER_MINUTE", "30"))
+IMAGE_TOKEN_ESTIMATE = 1000
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """`per_minute` tokens a minute, holding at most `capacity`; waiters are served in order."""
+
+    def __init__(self, name: str, per_minute: float, capacity: float):
+        self.name = name
+        self.rate = per_minute / 60.0
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1, **labels) -> float:
+        """Take `amount` tokens, waiting for them if needed. Returns the seconds waited.
+
+        A request larger than the bucket waits for a full bucket and leaves
+        it in debt, so it can't block forever.
+        """
+        start = time.perf_counter()
+        async with self._lock:  # the queue: whoever holds the lock is next
+            while True:
+                self._refill()
+                if self.tokens >= min(amount, self.capacity):
+                    self.tokens -= amount
+                    break
+                await asyncio.sleep((min(amount, self.capacity) - self.tokens) / self.rate)
+        waited = time.perf_counter() - start
+        record_rate_limit_wait(self.name, waited, **labels)
+        return waited
+
+    def settle(self, delta: float):
+        """Correct an earlier reservation by `delta` tokens (positive: more were used)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+def _bucket(name: str, per_minute: float) -> TokenBucket:
+    return TokenBucket(name, per_minute, per_minute * RATE_LIMIT_BURST_SECONDS / 60.0)
+
+
+model_requests = _bucket("model_requests", MODEL_RPM)
+model_tokens = _bucket("model_tokens", MODEL_TPM)
+_navigations: dict[str, TokenBucket] = {}
+
+
+def navigation_bucket(domain: str) -> TokenBucket:
+    if domain not in _navigations:
+        _navigations[domain] = _bucket("navigate", NAV_PER_MINUTE)
+    return _navigations[domain]
+
+
+# ---- Model calls ----
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size: characters / CHARS_PER_TOKEN, plus a flat cost per image."""
+    total = 0
+    for m in messages:
+        content = getattr(m, "content", m)
+        parts = content if isinstance(content, list) else [content]
+        for part in parts:
+            if isinstance(part, dict) and part.get("type") in ("image_url", "image"):
+                total += IMAGE_TOKEN_ESTIMATE
+            else:
+                total += len(str(part)) // CHARS_PER_TOKEN
+        total += sum(len(str(tc.get("args", ""))) for tc in getattr(m, "tool_calls", None) or []) // CHARS_PER_TOKEN
+    return total
+
+
+class RateLimitedModel:
+    """Wraps a (tool-bound) chat model so ainvoke spends the model budgets first."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        reserved = estimate_tokens(messages) + MODEL_OUTPUT_ESTIMATE
+        await model_requests.acquire(1)
+        await model_tokens.acquire(reserved)
+        try:
+            response = await self._inner.ainvoke(messages, config, **kwargs)
+        except BaseException:
+            model_tokens.settle(-reserved)  # the provider may not have counted it; hand it back
+            raise
+        usage = getattr(response, "usage_metadata", None) or {}
+        used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+        if used:
+            model_tokens.settle(used - reserved)
+        return response
+
+
+def wrap_model(model):
+    """Put a chat model behind the model budgets (a no-op when limits are off or replaying)."""
+    if not RATE_LIMIT_ENABLED or replay.mode() == "replay":
+        return model
+    return RateLimitedModel(model)
+
+
+# ---- Navigations ----
+
+def limit_navigations(tool):
+    """Spend the per-domain navigation budget before each browser_navigate (wraps its coroutine in place)."""
+    inner = getattr(tool, "coroutine", None)
+    if not RATE_LIMIT_ENABLED or replay.mode() == "replay" or tool.name != "browser_navigate" or inner is None:
+        return tool
+
+    async def limited(*args, **kwargs):
+        domain = urlsplit(kwargs.get("url", "")).netloc.lower().removeprefix("www.").removeprefix("m.")
+        if domain:
+            await navigation_bucket(domain).acquire(1, domain=domain)
+        return await inner(*args, **kwargs)
+
+    tool.coroutine = limited
+    return tool
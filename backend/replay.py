@@ -0,0 +1,267 @@
+"""
+Record/Replay - cassettes for chat model responses and MCP tool results.
+
+Set ROOMIE_REPLAY_MODE and ROOMIE_CASSETTE to use it:
+  record  — calls go to gpt-5 / the live browsers and every response is saved
+  replay  — nothing leaves the process; responses come from the cassette and
+            MCP tool schemas come from it too, so no MCP server is needed
+
+Cassettes live under tests/fixtures/cassettes/. Interactions are matched by a
+hash of the request (model messages / tool arguments) with worker labels
+normalised away; if no exact match is left, the next unused interaction on the
+same channel is used, so parallel workers that swap browsers still replay.
+
+Calls made under `private()` (Facebook login, storage-state cookies) and the
+session-only tools are never recorded: cassettes are committed to the repo.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+CASSETTE_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "cassettes"
+
+_WORKER_LABEL = re.compile(r"\b(Worker|MSG_WORKER_)\s?[A-Z]\b")
+UNRECORDED_TOOLS = {"browser_run_code"}  # carries storage-state cookies
+
+_private = contextvars.ContextVar("replay_private", default=False)
+
+
+def mode() -> str:
+    return os.getenv("ROOMIE_REPLAY_MODE", "").lower()
+
+
+@contextmanager
+def private():
+    """Tool calls in this block go to the browser but are never written to the cassette."""
+    token = _private.set(True)
+    try:
+        yield
+    finally:
+        _private.reset(token)
+
+
+class CassetteMiss(KeyError):
+    """Replay asked for an interaction the cassette doesn't have."""
+
+
+class Cassette:
+    def __init__(self, path: Path):
+        self.path = path
+        self.tools: dict[str, list[dict]] = {}  # MCP url -> tool schemas
+        self.interactions: list[dict] = []
+        self._used: set[int] = set()
+        self.replayed_seconds = 0.0  # recorded latency of everything served so far
+        if path.exists():
+            data = json.loads(path.read_text())
+            self.tools = data.get("tools", {})
+            self.interactions = data.get("interactions", [])
+
+    def rewind(self):
+        self._used.clear()
+        self.replayed_seconds = 0.0
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(
+            {"version": 1, "tools": self.tools, "interactions": self.interactions},
+            indent=1,
+        ))
+        log.info(f"[REPLAY] Saved {len(self.interactions)} interactions to {self.path}")
+
+    def record(self, channel: str, key: str, response, elapsed: float):
+        self.interactions.append({"channel": channel, "key": key, "elapsed": round(elapsed, 4), "response": response})
+
+    def take(self, channel: str, key: str) -> dict:
+        fallback = None
+        for i, entry in enumerate(self.interactions):
+            if i in self._used or entry["channel"] != channel:
+                continue
+            if entry["key"] == key:
+                fallback = i
+                break
+            if fallback is None:
+                fallback = i
+        if fallback is None:
+            raise CassetteMiss(f"No recorded {channel} interaction left in {self.path.name}")
+        self._used.add(fallback)
+        entry = self.interactions[fallback]
+        self.replayed_seconds += entry.get("elapsed", 0.0)
+        return entry
+
+
+_cassette: Cassette | None = None
+
+
+def get_cassette() -> Cassette | None:
+    """The active cassette, or None when record/replay is off."""
+    global _cassette
+    if mode() not in ("record", "replay"):
+        return None
+    if _cassette is None:
+        name = os.getenv("ROOMIE_CASSETTE", "default.json")
+        path = Path(name) if os.path.isabs(name) else CASSETTE_DIR / name
+        _cassette = Cassette(path)
+        if mode() == "record":
+            _cassette.interactions = []
+    return _cassette
+
+
+def _key(payload) -> str:
+    text = _WORKER_LABEL.sub(r"\1?", json.dumps(payload, sort_keys=True, default=str))
+    return hashlib.sha256(text.encode()).hexdigest()[:24]
+
+
+def _to_json(value):
+    """Tool results may be str, content-block lists or (content, artifact) tuples."""
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(v) for v in value]}
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    if hasattr(value, "model_dump"):
+        return _to_json(value.model_dump())
+    return value
+
+
+def _from_json(value):
+    if isinstance(value, dict):
+        if "__tuple__" in value:
+            return tuple(_from_json(v) for v in value["__tuple__"])
+        return {k: _from_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    return value
+
+
+# ---- Chat models ----
+
+def _message_key(messages) -> str:
+    return _key([
+        {
+            "type": getattr(m, "type", ""),
+            "content": m.content,
+            "tool_calls": [(tc["name"], tc["args"]) for tc in getattr(m, "tool_calls", None) or []],
+        }
+        for m in messages
+    ])
+
+
+class CassetteModel:
+    """Wraps a (tool-bound) chat model so ainvoke/invoke go through the cassette."""
+
+    def __init__(self, inner, channel: str, cassette: Cassette):
+        self._inner = inner
+        self._channel = channel
+        self._cassette = cassette
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        from langchain_core.load import dumpd, load
+
+        key = _message_key(messages)
+        if mode() == "replay":
+            return load(self._cassette.take(self._channel, key)["response"])
+        start = time.perf_counter()
+        response = await self._inner.ainvoke(messages, config, **kwargs)
+        self._cassette.record(self._channel, key, dumpd(response), time.perf_counter() - start)
+        return response
+
+    def invoke(self, messages, config=None, **kwargs):
+        from langchain_core.load import dumpd, load
+
+        key = _message_key(messages)
+        if mode() == "replay":
+            return load(self._cassette.take(self._channel, key)["response"])
+        start = time.perf_counter()
+        response = self._inner.invoke(messages, config, **kwargs)
+        self._cassette.record(self._channel, key, dumpd(response), time.perf_counter() - start)
+        return response
+
+
+def wrap_model(model, channel: str):
+    """Route a model through the cassette when record/replay is on; otherwise a no-op."""
+    cassette = get_cassette()
+    if cassette is None:
+        return model
+    return CassetteModel(model, f"model:{channel}", cassette)
+
+
+# ---- MCP tools ----
+
+def _schema_of(tool) -> dict:
+    schema = tool.args_schema
+    if hasattr(schema, "model_json_schema"):
+        schema = schema.model_json_schema()
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "args_schema": schema or {"type": "object", "properties": {}},
+        "response_format": getattr(tool, "response_format", "content"),
+    }
+
+
+def record_tool_schemas(url: str, tools):
+    cassette = get_cassette()
+    if cassette is not None and mode() == "record":
+        cassette.tools[url] = [_schema_of(t) for t in tools]
+
+
+def wrap_tool(tool):
+    """Record or replay one MCP tool's results (wraps its coroutine in place)."""
+    cassette = get_cassette()
+    inner = getattr(tool, "coroutine", None)
+    if cassette is None or inner is None or (mode() == "record" and tool.name in UNRECORDED_TOOLS):
+        return tool
+    channel = f"tool:{tool.name}"
+
+    async def recorded(*args, **kwargs):
+        if mode() == "record" and _private.get():
+            return await inner(*args, **kwargs)
+        key = _key([tool.name, args, kwargs])
+        if mode() == "replay":
+            await asyncio.sleep(0)  # keep the await point real tool calls have
+            return _from_json(cassette.take(channel, key)["response"])
+        start = time.perf_counter()
+        result = await inner(*args, **kwargs)
+        cassette.record(channel, key, _to_json(result), time.perf_counter() - start)
+        return result
+
+    tool.coroutine = recorded
+    return tool
+
+
+def replay_tools(url: str) -> list:
+    """Tools rebuilt from the cassette's recorded schemas (replay mode: no MCP connection)."""
+    from langchain_core.tools import StructuredTool
+
+    cassette = get_cassette()
+    schemas = cassette.tools.get(url) if cassette else None
+    if schemas is None:
+        raise CassetteMiss(f"Cassette has no tool schemas for {url}")
+
+    async def _unreachable(**kwargs):
+        raise RuntimeError("replay tool called without the cassette wrapper")
+
+    return [
+        wrap_tool(StructuredTool(
+            name=s["name"],
+            description=s["description"],
+            args_schema=s["args_schema"],
+            coroutine=_unreachable,
+            response_format=s.get("response_format", "content"),
+        ))
+        for s in schemas
+    ]
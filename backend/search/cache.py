@@ -0,0 +1,106 @@
+"""
+Search Result Cache - recent worker picks per thread and furniture category.
+
+Speculative searches (started from the room analysis, before the user has
+given a budget or style) fill this cache; `run_worker` then re-ranks cached
+picks against the real task instead of searching again. Entries are scoped
+to the thread whose room they were searched for, so one user's picks are
+never served to another.
+
+An entry is pending until its search finishes. A dispatch only waits for a
+search that is actually running; one still queued behind other speculative
+searches is cancelled and the dispatch searches for itself.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from backend.search.scraper import find_matching_category
+from backend.search.types import Listing
+
+
+SEARCH_CACHE_TTL = 900  # seconds — listings move fast on Marketplace
+
+
+@dataclass
+class _Entry:
+    created: float
+    task: asyncio.Task  # resolves to a list of Listing picks
+    started: bool = False  # False while queued behind other speculative searches
+
+
+# (thread_id, category) -> entry
+_entries: dict[tuple[str, str], _Entry] = {}
+
+
+def cache_key(scope: str, item_type: str) -> tuple[str, str]:
+    """Map an item type ("couch", "Sofas") onto its catalog category when there is one."""
+    return scope, find_matching_category(item_type) or item_type.strip().lower()
+
+
+def _live(key: tuple[str, str]) -> _Entry | None:
+    entry = _entries.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry.created > SEARCH_CACHE_TTL:
+        _entries.pop(key, None)
+        return None
+    return entry
+
+
+def _expire():
+    """Drop every entry older than SEARCH_CACHE_TTL, not just the ones read again."""
+    now = time.monotonic()
+    for key in [k for k, e in _entries.items() if now - e.created > SEARCH_CACHE_TTL]:
+        del _entries[key]
+
+
+def has(scope: str, item_type: str) -> bool:
+    return _live(cache_key(scope, item_type)) is not None
+
+
+def put_pending(scope: str, item_type: str, task: asyncio.Task):
+    """Register a queued search for a thread's category."""
+    _expire()
+    _entries[cache_key(scope, item_type)] = _Entry(time.monotonic(), task)
+
+
+def mark_started(scope: str, item_type: str):
+    """The search for a thread's category has a browser and is running."""
+    entry = _entries.get(cache_key(scope, item_type))
+    if entry is not None:
+        entry.started = True
+
+
+async def get(scope: str, item_type: str, wait: float) -> list[Listing] | None:
+    """Cached Listing picks for a thread's `item_type`, waiting up to `wait` seconds for a running search.
+
+    Returns None on a miss, a timed-out wait, or a search that came back
+    empty. A search that hasn't started yet is cancelled (None).
+    """
+    key = cache_key(scope, item_type)
+    entry = _live(key)
+    if entry is None or entry.task.cancelled():
+        return None
+    task = entry.task
+    if not entry.started and not task.done():
+        task.cancel()  # still queued: searching now beats waiting behind other categories
+        _entries.pop(key, None)
+        return None
+    try:
+        picks = await asyncio.wait_for(asyncio.shield(task), timeout=wait)
+    except asyncio.TimeoutError:
+        return None
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise  # we were cancelled, not the search
+        _entries.pop(key, None)  # preempted by messaging (see BrowserPool.lease)
+        return None
+    except Exception:
+        _entries.pop(key, None)
+        return None
+    if not picks:
+        _entries.pop(key, None)
+        return None
+    return picks
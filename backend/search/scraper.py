@@ -2,7 +2,8 @@ import asyncio
 import json
 import uuid
 import random
-from backend.search.types import ProductListing
+import re
+from backend.search.types import Listing
 
 
 # Realistic furniture database for demo purposes
@@ -89,6 +90,23 @@ GENERIC_LISTINGS = [
 ]
 
 
+CATEGORY_ALIASES = {
+    "sofa": ["couch", "lounge", "settee"],
+    "coffee table": ["side table", "accent table"],
+    "dining table": ["kitchen table", "table and chairs"],
+    "bookshelf": ["shelving", "shelf", "bookcase", "shelves"],
+    "bed": ["bed frame", "bedframe", "mattress"],
+    "desk": ["work desk", "study desk", "office desk", "computer desk"],
+    "chair": ["seat", "armchair", "stool", "dining chair"],
+    "rug": ["carpet", "mat", "floor covering"],
+    "lamp": ["light", "lighting", "floor lamp", "table lamp"],
+}
+
+# Aliases too generic to trust in free text like a room analysis
+# ("natural light", "seating area", "matte finish")
+_AMBIGUOUS_ALIASES = {"light", "lighting", "mat", "seat", "lounge"}
+
+
 def find_matching_category(query: str) -> str | None:
     """Find the best matching furniture category for a query."""
     query_lower = query.lower()
@@ -96,25 +114,27 @@ def find_matching_category(query: str) -> str | None:
         if category in query_lower:
             return category
     # Check partial matches
-    category_aliases = {
-        "sofa": ["couch", "lounge", "settee"],
-        "coffee table": ["side table", "accent table"],
-        "dining table": ["kitchen table", "table and chairs"],
-        "bookshelf": ["shelving", "shelf", "bookcase", "shelves"],
-        "bed": ["bed frame", "bedframe", "mattress"],
-        "desk": ["work desk", "study desk", "office desk", "computer desk"],
-        "chair": ["seat", "armchair", "stool", "dining chair"],
-        "rug": ["carpet", "mat", "floor covering"],
-        "lamp": ["light", "lighting", "floor lamp", "table lamp"],
-    }
-    for category, aliases in category_aliases.items():
+    for category, aliases in CATEGORY_ALIASES.items():
         for alias in aliases:
             if alias in query_lower:
                 return category
     return None
 
 
-async def search_marketplace(query: str, marketplace: str = "all", max_price: float | None = None) -> list[ProductListing]:
+def find_all_categories(text: str) -> list[str]:
+    """Find every furniture category mentioned in free text, in order of first mention."""
+    text_lower = text.lower()
+    positions = {}
+    for category in FURNITURE_DB:
+        terms = [category] + [a for a in CATEGORY_ALIASES.get(category, []) if a not in _AMBIGUOUS_ALIASES]
+        for term in terms:
+            match = re.search(rf"\b{re.escape(term)}(e?s)?\b", text_lower)
+            if match and (category not in positions or match.start() < positions[category]):
+                positions[category] = match.start()
+    return sorted(positions, key=positions.get)
+
+
+async def search_marketplace(query: str, marketplace: str = "all", max_price: float | None = None) -> list[Listing]:
     """Search for furniture across marketplaces.
 
     Uses a curated database of realistic Australian marketplace listings.
@@ -145,7 +165,7 @@ async def search_marketplace(query: str, marketplace: str = "all", max_price: fl
     # Shuffle for variety
     random.shuffle(listings)
 
-    # Convert to ProductListing objects
+    # Convert to Listing objects
     products = []
     for listing in listings:
         source = listing["source"]
@@ -154,7 +174,7 @@ async def search_marketplace(query: str, marketplace: str = "all", max_price: fl
             "facebook": "https://www.facebook.com/marketplace",
             "gumtree": "https://www.gumtree.com.au",
         }
-        products.append(ProductListing(
+        products.append(Listing(
             id=str(uuid.uuid4()),
             title=listing["title"],
             price=float(listing["price"]),
@@ -170,6 +190,6 @@ async def search_marketplace(query: str, marketplace: str = "all", max_price: fl
     return products
 
 
-async def search_all_marketplaces(query: str, max_price: float | None = None) -> list[ProductListing]:
+async def search_all_marketplaces(query: str, max_price: float | None = None) -> list[Listing]:
     """Search all marketplaces."""
     return await search_marketplace(query, "all", max_price)
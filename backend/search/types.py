@@ -1,15 +1,106 @@
-from pydantic import BaseModel
+"""
+Listing - the one shape a marketplace listing has everywhere.
 
+Search results, worker picks, shortlist proposal items and the shopping list
+are all `Listing`s: a slotted dataclass, so the thousands of them a busy
+server holds cost a fraction of a dict each. The checkpointer stores them
+natively (LangGraph's msgpack serde handles dataclasses), and at the JSON
+boundaries — tool payloads, SSE events, stored job events — they go through
+`dumps()`, which writes the compact dict form (empty optional fields left
+out) using orjson when it is installed.
 
-class ProductListing(BaseModel):
-    id: str
-    title: str
-    price: float
+  pick = Listing.from_dict(raw)   # tolerant: "$1,200" prices, unknown keys dropped
+  dumps({"items": [pick]})
+"""
+
+import json
+import re
+from dataclasses import dataclass, fields
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+_PRICE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_price(value) -> float | None:
+    """"$1,200", "AU$50", 150, "Free" -> float; None if there's no price."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    if value.strip().lower() == "free":
+        return 0.0
+    match = _PRICE.search(value)
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+@dataclass(slots=True)
+class Listing:
+    id: str = ""
+    title: str = ""
+    price: float | None = None
+    source: str = ""  # "ebay", "facebook", "gumtree"
+    url: str = ""
     currency: str = "AUD"
     image_url: str = ""
-    source: str  # "ebay", "facebook", "gumtree"
-    url: str = ""
     seller: str = ""
     condition: str = ""
     location: str = ""
     description: str = ""
+    reason: str = ""  # why a worker picked it
+    draft_message: str = ""  # message to send the seller, on proposal items
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Listing":
+        if isinstance(data, Listing):
+            return data
+        kwargs = {name: data[name] for name in _FIELDS if data.get(name) is not None}
+        kwargs["price"] = parse_price(data.get("price"))
+        for name in _TEXT_FIELDS:
+            if name in kwargs and not isinstance(kwargs[name], str):
+                kwargs[name] = str(kwargs[name])
+        return cls(**kwargs)
+
+    def to_dict(self) -> dict:
+        """Compact form: the identifying fields always, the rest only when set."""
+        out = {"id": self.id, "title": self.title, "price": self.price, "source": self.source, "url": self.url}
+        for name in _OPTIONAL_FIELDS:
+            value = getattr(self, name)
+            if value and value != _DEFAULTS[name]:
+                out[name] = value
+        return out
+
+    def merged(self, other: "Listing") -> "Listing":
+        """This listing with its blank fields filled in from `other` (a duplicate of it)."""
+        return Listing(*(
+            mine if mine not in ("", None) else getattr(other, name)
+            for name, mine in ((n, getattr(self, n)) for n in _FIELDS)
+        ))
+
+
+_FIELDS = tuple(f.name for f in fields(Listing))
+_DEFAULTS = {f.name: f.default for f in fields(Listing)}
+_TEXT_FIELDS = tuple(n for n in _FIELDS if n != "price")
+_OPTIONAL_FIELDS = tuple(n for n in _FIELDS if n not in ("id", "title", "price", "source", "url"))
+
+
+def _default(obj):
+    if isinstance(obj, Listing):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj) -> str:
+    """JSON for payloads that may contain Listings (tool results, SSE, job events)."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATACLASS).decode()
+    return json.dumps(obj, default=_default, separators=(",", ":"))
+
+
+def loads(text: str | bytes):
+    return orjson.loads(text) if orjson is not None else json.loads(text)
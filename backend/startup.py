@@ -0,0 +1,53 @@
+"""
+Startup - times the warm-up phase so cold starts can be seen and compared.
+
+Phases may run in parallel (e.g. one MCP connect per browser), so each is
+reported with its own duration plus the total wall time of the warm-up:
+
+  with startup.phase("mcp_connect:localhost:3001"):
+      ...
+  startup.report()  # {"total_ms": ..., "phases": {...}}
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger(__name__)
+
+_phases: dict[str, float] = {}  # name -> duration (ms)
+_started_at: float | None = None
+_finished_at: float | None = None
+
+
+def begin():
+    global _started_at, _finished_at
+    _started_at, _finished_at = time.perf_counter(), None
+    _phases.clear()
+
+
+def finish():
+    global _finished_at
+    _finished_at = time.perf_counter()
+    log.info("[STARTUP] Warm in {:.0f}ms — {}".format(
+        report()["total_ms"], ", ".join(f"{k} {v:.0f}ms" for k, v in _phases.items())))
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def report() -> dict:
+    if _started_at is None:
+        return {"status": "cold", "phases": {}}
+    end = _finished_at or time.perf_counter()
+    return {
+        "status": "warm" if _finished_at else "warming",
+        "total_ms": round((end - _started_at) * 1000, 1),
+        "phases": dict(_phases),
+    }
@@ -0,0 +1,223 @@
+"""
+Tracing - per-node, per-model-call and per-MCP-tool instrumentation.
+
+Everything is recorded in-process and cheaply (a few dict updates per event):
+  - Prometheus-style counters/histograms, rendered by `render_prometheus()` for /metrics
+  - a bounded JSON trace per thread_id, returned by `get_trace()` for /api/traces/{id}
+
+The current thread_id travels in a contextvar set by `traced_node`, so model and
+tool calls made deep inside worker subgraphs land in the right thread's trace.
+"""
+
+import contextvars
+import inspect
+import time
+from collections import OrderedDict, deque
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+STEP_BUCKETS = (1, 2, 4, 6, 8, 10, 15, 20)
+MAX_TRACE_EVENTS = 2000  # per thread
+MAX_TRACED_THREADS = 200
+
+current_thread_id: contextvars.ContextVar[str | None] = contextvars.ContextVar("current_thread_id", default=None)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: dict, amount: float = 1):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in self.values.items():
+            lines.append(f"{self.name}{_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.buckets = name, help_text, buckets
+        self.values: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels: dict, value: float):
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in self.values.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-2]:g}")
+            lines.append(f"{self.name}_count{_labels(key)} {series[-1]}")
+        return lines
+
+
+class Gauge:
+    """Current values read at scrape time from `read()` -> {labels tuple: value}."""
+
+    def __init__(self, name: str, help_text: str, read=None):
+        self.name, self.help = name, help_text
+        self.read = read or (lambda: {})
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in self.read().items():
+            lines.append(f"{self.name}{_labels(key)} {value:g}")
+        return lines
+
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in key) + "}"
+
+
+NODE_LATENCY = Histogram("roomie_node_latency_seconds", "Graph node latency")
+MODEL_LATENCY = Histogram("roomie_model_latency_seconds", "Chat model call latency")
+MODEL_TOKENS = Counter("roomie_model_tokens_total", "Chat model tokens by direction")
+TOOL_LATENCY = Histogram("roomie_mcp_tool_latency_seconds", "MCP tool call latency")
+TOOL_PAYLOAD = Counter("roomie_mcp_tool_payload_bytes_total", "MCP tool result payload size")
+TOOL_ERRORS = Counter("roomie_mcp_tool_errors_total", "MCP tool calls that raised")
+WORKER_STEPS = Histogram("roomie_worker_steps", "Tool rounds per worker run", STEP_BUCKETS)
+POOL_WAIT = Histogram("roomie_browser_lease_wait_seconds", "Time spent waiting for a free browser")
+ADMISSION_WAIT = Histogram("roomie_admission_wait_seconds", "Time a chat run spent queued before starting")
+ADMISSION_REJECTED = Counter("roomie_admission_rejected_total", "Chat runs rejected with 429")
+OPENAI_LATENCY = Histogram("roomie_openai_request_seconds", "OpenAI HTTP request latency (to response headers)")
+OPENAI_WAIT = Histogram("roomie_openai_permit_wait_seconds", "Time waiting for an OpenAI concurrency permit")
+OPENAI_ERRORS = Counter("roomie_openai_errors_total", "OpenAI HTTP requests that failed or returned an error status")
+OPENAI_POOL = Gauge("roomie_openai_pool", "OpenAI HTTP pool: in-flight requests and open connections")
+TTS_CACHE = Counter("roomie_tts_cache_total", "TTS requests by cache result (hit, pending, miss)")
+RATE_LIMIT_WAIT = Histogram("roomie_rate_limit_wait_seconds", "Time callers queued for a model or navigation rate budget")
+BROWSER_CACHE = Counter("roomie_browser_cache_total", "Cacheable navigate/snapshot/scroll calls by result (hit, miss)")
+
+METRICS = [NODE_LATENCY, MODEL_LATENCY, MODEL_TOKENS, TOOL_LATENCY, TOOL_PAYLOAD, TOOL_ERRORS, WORKER_STEPS,
+           POOL_WAIT, ADMISSION_WAIT, ADMISSION_REJECTED, OPENAI_LATENCY, OPENAI_WAIT, OPENAI_ERRORS, OPENAI_POOL,
+           TTS_CACHE, BROWSER_CACHE, RATE_LIMIT_WAIT]
+
+# thread_id -> recent events, least recently traced thread evicted first
+_traces: "OrderedDict[str, deque]" = OrderedDict()
+
+
+def _event(kind: str, name: str, **fields):
+    thread_id = current_thread_id.get()
+    if thread_id is None:
+        return
+    trace = _traces.get(thread_id)
+    if trace is None:
+        trace = _traces[thread_id] = deque(maxlen=MAX_TRACE_EVENTS)
+        while len(_traces) > MAX_TRACED_THREADS:
+            _traces.popitem(last=False)
+    else:
+        _traces.move_to_end(thread_id)
+    trace.append({"ts": time.time(), "kind": kind, "name": name, **fields})
+
+
+def traced_node(name: str, fn):
+    """Wrap a graph node so its latency is recorded and its thread_id is in context."""
+    wants_config = "config" in inspect.signature(fn).parameters
+    is_async = inspect.iscoroutinefunction(fn)
+
+    # Signature must keep a `config` parameter so LangGraph passes it in
+    async def node(state, config):
+        token = current_thread_id.set((config or {}).get("configurable", {}).get("thread_id"))
+        start = time.perf_counter()
+        try:
+            result = fn(state, config) if wants_config else fn(state)
+            if is_async:
+                result = await result
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            NODE_LATENCY.observe({"node": name}, elapsed)
+            _event("node", name, duration_ms=round(elapsed * 1000, 1))
+            current_thread_id.reset(token)
+
+    node.__name__ = name
+    return node
+
+
+def record_model_call(node: str, response, elapsed: float):
+    """Record latency and token usage of one chat model call."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    MODEL_LATENCY.observe({"node": node}, elapsed)
+    MODEL_TOKENS.inc({"node": node, "direction": "input"}, input_tokens)
+    MODEL_TOKENS.inc({"node": node, "direction": "output"}, output_tokens)
+    _event("model", node, duration_ms=round(elapsed * 1000, 1),
+           input_tokens=input_tokens, output_tokens=output_tokens)
+
+
+def record_worker_steps(worker: str, steps: int):
+    WORKER_STEPS.observe({"worker": worker}, steps)
+    _event("worker", worker, steps=steps)
+
+
+def record_lease_wait(slot: str, elapsed: float, priority: str = "search"):
+    POOL_WAIT.observe({"browser": slot, "priority": priority}, elapsed)
+    _event("lease", slot, wait_ms=round(elapsed * 1000, 1), priority=priority)
+
+
+def record_rate_limit_wait(budget: str, elapsed: float, **labels):
+    RATE_LIMIT_WAIT.observe({"budget": budget, **labels}, elapsed)
+    if elapsed >= 0.001:  # only calls that actually queued show up in traces
+        _event("rate_limit", budget, wait_ms=round(elapsed * 1000, 1), **labels)
+
+
+def _payload_size(result) -> int:
+    if isinstance(result, (str, bytes)):
+        return len(result)
+    if isinstance(result, (list, tuple)):
+        return sum(_payload_size(r) for r in result)
+    if isinstance(result, dict):
+        return sum(_payload_size(v) for v in result.values())
+    return len(str(result))
+
+
+def instrument_tool(tool, browser: str):
+    """Time every call of an MCP tool (a StructuredTool with a coroutine) in place."""
+    inner = getattr(tool, "coroutine", None)
+    if inner is None or getattr(inner, "_traced", False):
+        return tool
+
+    async def traced(*args, **kwargs):
+        labels = {"tool": tool.name, "browser": browser}
+        start = time.perf_counter()
+        try:
+            result = await inner(*args, **kwargs)
+        except Exception:
+            TOOL_ERRORS.inc(labels)
+            raise
+        elapsed = time.perf_counter() - start
+        size = _payload_size(result)
+        TOOL_LATENCY.observe(labels, elapsed)
+        TOOL_PAYLOAD.inc(labels, size)
+        _event("tool", tool.name, browser=browser, duration_ms=round(elapsed * 1000, 1), bytes=size)
+        return result
+
+    traced._traced = True
+    tool.coroutine = traced
+    return tool
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def get_trace(thread_id: str) -> list[dict] | None:
+    trace = _traces.get(thread_id)
+    return list(trace) if trace is not None else None
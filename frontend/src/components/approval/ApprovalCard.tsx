@@ -3,7 +3,7 @@ import { useState } from 'react';
 export interface ProposalItem {
   id: string;
   title: string;
-  price: number;
+  price: number | null;
   source: string;
   url: string;
   image_url?: string;
@@ -73,7 +73,7 @@ export function ApprovalCard({ type, items, onApproveAll, onApproveSelected, onR
             <div className="flex-1 min-w-0">
               <p className="text-sm font-medium text-gray-900 truncate">{item.title}</p>
               <p className="text-xs text-gray-500">
-                ${item.price} &middot; {item.source}
+                {item.price != null ? `$${item.price.toFixed(2)}` : 'Price on request'} &middot; {item.source}
                 {item.seller && ` &middot; ${item.seller}`}
               </p>
               {isContact && item.draft_message && (
@@ -1,38 +1,35 @@
-import { useState, useEffect, useRef } from 'react';
+import { useState, useEffect } from 'react';
 
 interface WorkerPanelProps {
   label: string;
-  endpoint: string;
+  slot: string;
 }
 
-function WorkerPanel({ label, endpoint }: WorkerPanelProps) {
-  const [screenshot, setScreenshot] = useState<string | null>(null);
+interface LiveFrame {
+  mime: string;
+  frame: string;
+}
+
+function WorkerPanel({ label, slot }: WorkerPanelProps) {
+  const [frame, setFrame] = useState<LiveFrame | null>(null);
   const [status, setStatus] = useState<'loading' | 'ok' | 'no_browser'>('loading');
-  const intervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
 
   useEffect(() => {
-    const fetchScreenshot = async () => {
+    // The server pushes a frame only when the page changes
+    const source = new EventSource(`/api/browser/live/${slot}`);
+    source.onmessage = (e) => {
       try {
-        const res = await fetch(endpoint);
-        const data = await res.json();
-        if (data.status === 'ok' && data.screenshot) {
-          setScreenshot(data.screenshot);
-          setStatus('ok');
-        } else {
-          setStatus('no_browser');
-        }
+        const data = JSON.parse(e.data);
+        setFrame({ mime: data.mime, frame: data.frame });
+        setStatus('ok');
       } catch {
-        setStatus('no_browser');
+        // ignore malformed frames
       }
     };
+    source.onerror = () => setStatus('no_browser');  // EventSource reconnects on its own
 
-    fetchScreenshot();
-    intervalRef.current = setInterval(fetchScreenshot, 2000);
-
-    return () => {
-      if (intervalRef.current) clearInterval(intervalRef.current);
-    };
-  }, [endpoint]);
+    return () => source.close();
+  }, [slot]);
 
   return (
     <div className="flex flex-col flex-1 min-w-0 rounded-xl overflow-hidden border border-gray-700 bg-gray-900">
@@ -44,9 +41,9 @@ function WorkerPanel({ label, endpoint }: WorkerPanelProps) {
 
       {/* Screenshot */}
       <div className="aspect-video bg-black flex items-center justify-center overflow-hidden">
-        {screenshot ? (
+        {frame ? (
           <img
-            src={`data:image/png;base64,${screenshot}`}
+            src={`data:${frame.mime};base64,${frame.frame}`}
             alt={`${label} screenshot`}
             className="w-full h-full object-contain"
           />
@@ -65,12 +62,25 @@ interface BrowserViewProps {
 }
 
 export function BrowserView({ visible = true }: BrowserViewProps) {
+  const [slots, setSlots] = useState<string[]>(['A', 'B']);
+
+  useEffect(() => {
+    if (!visible) return;
+    fetch('/api/browser/slots')
+      .then((res) => res.json())
+      .then((data) => {
+        if (Array.isArray(data.slots) && data.slots.length) setSlots(data.slots);
+      })
+      .catch(() => {});
+  }, [visible]);
+
   if (!visible) return null;
 
   return (
     <div className="flex gap-3 w-full mt-2">
-      <WorkerPanel label="Worker A" endpoint="/api/browser/screenshot" />
-      <WorkerPanel label="Worker B" endpoint="/api/browser/screenshot-b" />
+      {slots.map((slot) => (
+        <WorkerPanel key={slot} label={`Worker ${slot}`} slot={slot} />
+      ))}
     </div>
   );
 }
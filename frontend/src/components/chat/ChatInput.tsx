@@ -1,23 +1,28 @@
 import { useState, useRef, type KeyboardEvent } from 'react';
 import { VoiceButton } from './VoiceButton';
+import type { UploadedImage } from '../../types';
 
 interface Props {
-  onSend: (content: string, image?: string) => void;
+  onSend: (content: string, image?: UploadedImage) => void;
   isLoading: boolean;
 }
 
 export function ChatInput({ onSend, isLoading }: Props) {
   const [input, setInput] = useState('');
   const [imagePreview, setImagePreview] = useState<string | null>(null);
-  const [imageBase64, setImageBase64] = useState<string | null>(null);
+  const [imageId, setImageId] = useState<string | null>(null);
+  const [uploading, setUploading] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
   const handleSubmit = () => {
-    if ((!input.trim() && !imageBase64) || isLoading) return;
-    onSend(input.trim() || 'Please analyze this room.', imageBase64 || undefined);
+    if ((!input.trim() && !imageId) || isLoading || uploading) return;
+    onSend(
+      input.trim() || 'Please analyze this room.',
+      imageId && imagePreview ? { id: imageId, preview: imagePreview } : undefined,
+    );
     setInput('');
     setImagePreview(null);
-    setImageBase64(null);
+    setImageId(null);
   };
 
   const handleKeyDown = (e: KeyboardEvent) => {
@@ -27,28 +32,35 @@ export function ChatInput({ onSend, isLoading }: Props) {
     }
   };
 
-  const handleImageSelect = (e: React.ChangeEvent<HTMLInputElement>) => {
+  const handleImageSelect = async (e: React.ChangeEvent<HTMLInputElement>) => {
     const file = e.target.files?.[0];
     if (!file) return;
 
-    // Preview
-    const previewReader = new FileReader();
-    previewReader.onload = () => setImagePreview(previewReader.result as string);
-    previewReader.readAsDataURL(file);
+    setImagePreview(URL.createObjectURL(file));
+    setImageId(null);
+    setUploading(true);
 
-    // Base64 for API
-    const base64Reader = new FileReader();
-    base64Reader.onload = () => {
-      const result = base64Reader.result as string;
-      // Remove data URL prefix
-      setImageBase64(result.split(',')[1]);
-    };
-    base64Reader.readAsDataURL(file);
+    // Upload the raw file once; chat messages only carry its id
+    try {
+      const res = await fetch('/api/uploads/image', {
+        method: 'POST',
+        headers: { 'Content-Type': file.type || 'application/octet-stream' },
+        body: file,
+      });
+      if (!res.ok) throw new Error(`Upload error: ${res.status}`);
+      const data = await res.json();
+      setImageId(data.image_id);
+    } catch (err) {
+      console.error('Image upload failed:', err);
+      setImagePreview(null);
+    } finally {
+      setUploading(false);
+    }
   };
 
   const removeImage = () => {
     setImagePreview(null);
-    setImageBase64(null);
+    setImageId(null);
     if (fileInputRef.current) fileInputRef.current.value = '';
   };
 
@@ -103,7 +115,7 @@ export function ChatInput({ onSend, isLoading }: Props) {
           value={input}
           onChange={(e) => setInput(e.target.value)}
           onKeyDown={handleKeyDown}
-          placeholder={imageBase64 ? "Add a message about your room..." : "Describe your space or upload a photo..."}
+          placeholder={imagePreview ? "Add a message about your room..." : "Describe your space or upload a photo..."}
           rows={1}
           className="flex-1 resize-none rounded-xl border border-white/30 bg-white/40 backdrop-blur-xl px-4 py-2.5 text-sm text-gray-800 focus:outline-none focus:ring-2 focus:ring-white/50 focus:border-transparent placeholder:text-gray-500 shadow-lg"
           style={{ minHeight: '44px', maxHeight: '120px' }}
@@ -112,7 +124,7 @@ export function ChatInput({ onSend, isLoading }: Props) {
         {/* Send button */}
         <button
           onClick={handleSubmit}
-          disabled={isLoading || (!input.trim() && !imageBase64)}
+          disabled={isLoading || uploading || (!input.trim() && !imageId)}
           className="p-2.5 bg-white/40 backdrop-blur-xl text-gray-700 border border-white/30 rounded-xl hover:bg-white/60 disabled:opacity-40 disabled:cursor-not-allowed transition-colors shadow-lg"
         >
           {isLoading ? (
@@ -2,12 +2,12 @@ import { useRef, useEffect } from 'react';
 import { ChatMessage } from './ChatMessage';
 import { ChatInput } from './ChatInput';
 import { BrowserView } from '../browser/BrowserView';
-import type { ChatMessage as ChatMessageType, ProductListing } from '../../types';
+import type { ChatMessage as ChatMessageType, ProductListing, UploadedImage } from '../../types';
 
 interface Props {
   messages: ChatMessageType[];
   isLoading: boolean;
-  onSend: (content: string, image?: string) => void;
+  onSend: (content: string, image?: UploadedImage) => void;
   onAddToList?: (product: ProductListing) => void;
   onApproveAll?: (messageId: string) => void;
   onApproveSelected?: (messageId: string, ids: string[]) => void;
@@ -26,11 +26,10 @@ export function VoiceButton({ onTranscription, disabled }: Props) {
         setState('processing');
 
         try {
-          const formData = new FormData();
-          formData.append('file', blob, 'recording.webm');
           const res = await fetch('/api/voice/transcribe', {
             method: 'POST',
-            body: formData,
+            headers: { 'Content-Type': blob.type || 'audio/webm' },
+            body: blob,
           });
           const data = await res.json();
           if (data.text) onTranscription(data.text);
@@ -43,7 +43,7 @@ export function ProductCard({ product, onAddToList }: Props) {
 
         {/* Price */}
         <p className="text-lg font-bold text-gray-900 mb-1">
-          ${product.price.toFixed(2)}
+          {product.price != null ? `$${product.price.toFixed(2)}` : 'Price on request'}
           <span className="text-xs font-normal text-gray-400 ml-1">{product.currency}</span>
         </p>
 
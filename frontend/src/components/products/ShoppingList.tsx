@@ -6,7 +6,7 @@ interface Props {
 }
 
 export function ShoppingList({ items, onRemove }: Props) {
-  const total = items.reduce((sum, item) => sum + item.price, 0);
+  const total = items.reduce((sum, item) => sum + (item.price ?? 0), 0);
 
   if (items.length === 0) {
     return (
@@ -34,7 +34,9 @@ export function ShoppingList({ items, onRemove }: Props) {
             )}
             <div className="flex-1 min-w-0">
               <p className="text-xs font-medium text-gray-800 truncate">{item.title}</p>
-              <p className="text-sm font-bold text-gray-900">${item.price.toFixed(2)}</p>
+              <p className="text-sm font-bold text-gray-900">
+                {item.price != null ? `$${item.price.toFixed(2)}` : 'Price on request'}
+              </p>
             </div>
             <button
               onClick={() => onRemove(item.id)}
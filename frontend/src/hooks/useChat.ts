@@ -1,9 +1,16 @@
 import { useState, useCallback, useRef } from 'react';
-import type { ChatMessage, ProductListing } from '../types';
+import type { ChatMessage, ProductListing, UploadedImage } from '../types';
 
 const API_URL = '/api/chat';
 const RESUME_URL = '/api/chat/resume';
 
+// Server rejected the run because it can't start it soon enough (HTTP 429)
+class BusyError extends Error {
+  constructor(retryAfter: string | null) {
+    super(`Roomie is at capacity right now — please try again in ${retryAfter || 'a few'} seconds.`);
+  }
+}
+
 export function useChat() {
   const [messages, setMessages] = useState<ChatMessage[]>([]);
   const [isLoading, setIsLoading] = useState(false);
@@ -35,6 +42,7 @@ export function useChat() {
     if (!text.trim()) return;
 
     // Split into sentence chunks so the first chunk plays fast
+    // (the server pre-synthesises replies with the same split — keep backend/api/tts_cache.py in sync)
     const sentences = text.match(/[^.!?]+[.!?]+/g) || [text];
     const chunks: string[] = [];
     let current = '';
@@ -103,6 +111,16 @@ export function useChat() {
         if (line.startsWith('data: ') && line !== 'data: [DONE]') {
           try {
             const data = JSON.parse(line.slice(6));
+
+            // Still waiting for a free run slot — show our place in line
+            if (data.queue) {
+              const notice = `Roomie is busy helping others — you're #${data.queue.position} in line (about ${data.queue.estimated_wait}s)…`;
+              setMessages(prev =>
+                prev.map(msg => msg.id === assistantMessageId ? { ...msg, content: notice } : msg)
+              );
+              continue;
+            }
+
             fullContent = data.content || fullContent;
             toolCalls = data.tool_calls || toolCalls;
 
@@ -145,13 +163,13 @@ export function useChat() {
     return fullContent;
   }, []);
 
-  const sendMessage = useCallback(async (content: string, image?: string) => {
+  const sendMessage = useCallback(async (content: string, image?: UploadedImage) => {
     const userMessage: ChatMessage = {
       id: crypto.randomUUID(),
       role: 'user',
       content,
-      image: image,
-      imagePreview: image ? `data:image/jpeg;base64,${image}` : undefined,
+      imageId: image?.id,
+      imagePreview: image?.preview,
       timestamp: new Date(),
     };
 
@@ -159,21 +177,22 @@ export function useChat() {
     setIsLoading(true);
 
     try {
-      const apiMessages = [...messages, userMessage].map(msg => ({
-        role: msg.role,
-        content: msg.content,
-        image: msg.image || null,
-      }));
-
+      // Only the new turn goes up: the server keeps the thread's history
       const response = await fetch(API_URL, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          messages: apiMessages,
+          message: {
+            role: userMessage.role,
+            content: userMessage.content,
+            image_id: userMessage.imageId || null,
+          },
           thread_id: threadIdRef.current,
+          voice: voiceEnabledRef.current,
         }),
       });
 
+      if (response.status === 429) throw new BusyError(response.headers.get('Retry-After'));
       if (!response.ok) throw new Error(`API error: ${response.status}`);
 
       const assistantMessage: ChatMessage = {
@@ -194,7 +213,7 @@ export function useChat() {
       const errorMessage: ChatMessage = {
         id: crypto.randomUUID(),
         role: 'assistant',
-        content: 'Sorry, I encountered an error. Please try again.',
+        content: error instanceof BusyError ? error.message : 'Sorry, I encountered an error. Please try again.',
         timestamp: new Date(),
       };
       setMessages(prev => [...prev, errorMessage]);
@@ -202,7 +221,7 @@ export function useChat() {
     } finally {
       setIsLoading(false);
     }
-  }, [messages, _parseSSE]);
+  }, [_parseSSE]);
 
   const resumeWithApproval = useCallback(async (
     action: 'approve_all' | 'approve_selected' | 'reject',
@@ -232,9 +251,11 @@ export function useChat() {
           thread_id: threadIdRef.current,
           action,
           selected_ids: selectedIds || null,
+          voice: voiceEnabledRef.current,
         }),
       });
 
+      if (response.status === 429) throw new BusyError(response.headers.get('Retry-After'));
       if (!response.ok) throw new Error(`Resume error: ${response.status}`);
 
       const assistantMessage: ChatMessage = {
@@ -254,7 +275,7 @@ export function useChat() {
       const errorMessage: ChatMessage = {
         id: crypto.randomUUID(),
         role: 'assistant',
-        content: 'Sorry, I encountered an error processing your decision. Please try again.',
+        content: error instanceof BusyError ? error.message : 'Sorry, I encountered an error processing your decision. Please try again.',
         timestamp: new Date(),
       };
       setMessages(prev => [...prev, errorMessage]);
@@ -1,7 +1,7 @@
 export interface ProposalItem {
   id: string;
   title: string;
-  price: number;
+  price: number | null; // null when the listing has no parsable price
   source: string;
   url: string;
   image_url?: string;
@@ -20,8 +20,8 @@ export interface ChatMessage {
   id: string;
   role: 'user' | 'assistant';
   content: string;
-  image?: string; // base64
-  imagePreview?: string; // data URL for display
+  imageId?: string; // from /api/uploads/image
+  imagePreview?: string; // object URL for display
   toolCalls?: ToolCall[];
   products?: ProductListing[];
   colorPalette?: string[];
@@ -30,6 +30,11 @@ export interface ChatMessage {
   timestamp: Date;
 }
 
+export interface UploadedImage {
+  id: string;
+  preview: string;
+}
+
 export interface ToolCall {
   tool: string;
   args: Record<string, unknown>;
@@ -39,7 +44,7 @@ export interface ToolCall {
 export interface ProductListing {
   id: string;
   title: string;
-  price: number;
+  price: number | null; // null when the listing has no parsable price
   currency: string;
   image_url: string;
   source: 'ebay' | 'facebook' | 'gumtree';
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from backend import broker
+
+
+def test_holder_is_cancelled_when_the_broker_goes_away(monkeypatch, tmp_path):
+    path = str(tmp_path / "pool.sock")
+
+    async def dying_host(reader, writer):
+        await reader.readline()
+        writer.write(b'{"granted": "A"}\n')
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.close()  # the host process goes away mid-lease
+
+    async def run():
+        server = await asyncio.start_unix_server(dying_host, path=path)
+        monkeypatch.setattr(broker, "_connect", lambda: asyncio.open_unix_connection(path))
+        async with server:
+            async with broker.lease("browsers", ["A"]) as item:
+                assert item == "A"
+                await asyncio.sleep(5)
+
+    with pytest.raises(broker.LeaseLost):
+        asyncio.run(run())
@@ -0,0 +1,16 @@
+from backend.agent.graph import _group_messaging_tasks
+
+
+def _task(url, seller):
+    return {"product_url": url, "message": "Is this still available?", "seller_name": seller}
+
+
+def test_messages_are_grouped_by_listing_never_by_seller():
+    tasks = [
+        _task("https://www.facebook.com/marketplace/item/1/?ref=search", "Sam"),
+        _task("https://facebook.com/marketplace/item/2", "Sam"),
+        _task("https://facebook.com/marketplace/item/1", "Jo"),
+        _task("", "Alex"),
+        _task("", "Alex"),
+    ]
+    assert _group_messaging_tasks(tasks) == [[0, 2], [1], [3], [4]]
@@ -0,0 +1,74 @@
+import asyncio
+
+from backend.browser import prefetch
+from backend.browser.pool import BrowserPool, BrowserSlot, Priority
+
+
+class FakeTool:
+    def __init__(self, name, result="", delay=0.0):
+        self.name, self.result, self.delay = name, result, delay
+        self.calls = []
+
+    async def ainvoke(self, args):
+        self.calls.append(args)
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def _pool():
+    tools = [
+        FakeTool("browser_tabs", "- 0: (current) [Marketplace](https://www.facebook.com/marketplace)"),
+        FakeTool("browser_navigate", "- button \"Message\" [ref=e1]", delay=10),
+        FakeTool("browser_snapshot"),
+    ]
+    return BrowserPool([BrowserSlot(name="A", url="http://localhost:3001/sse", tools=tools)])
+
+
+def test_preempted_prefetch_is_discarded_without_raising():
+    async def run():
+        pool = _pool()
+        url = "https://www.facebook.com/marketplace/item/1"
+        prefetch.start_prefetch("t1", pool, [url])
+        await asyncio.sleep(0.05)  # the prefetch now holds the only browser
+
+        async with pool.lease(priority=Priority.MESSAGING) as slot:  # preempts it
+            assert slot.name == "A"
+        task = prefetch._prefetches["t1"][url]
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+        tabs = next(t for t in pool.slots[0].tools if t.name == "browser_tabs")
+        assert {"action": "close", "index": 0} in tabs.calls  # the prefetch's new tab
+
+        prefetch.discard_rejected("t1", pool, set())
+        assert "t1" not in prefetch._prefetches
+
+    asyncio.run(run())
+
+
+def test_claim_of_preempted_prefetch_returns_none():
+    async def run():
+        pool = _pool()
+        url = "https://www.facebook.com/marketplace/item/2"
+        prefetch.start_prefetch("t2", pool, [url])
+        await asyncio.sleep(0.05)
+        async with pool.lease(priority=Priority.MESSAGING):
+            pass
+        assert await prefetch.claim("t2", url) is None
+
+    asyncio.run(run())
+
+
+def test_unanswered_approval_expires(monkeypatch):
+    monkeypatch.setattr(prefetch, "PREFETCH_TTL", 0)
+
+    async def run():
+        pool = _pool()
+        prefetch.start_prefetch("t3", pool, ["https://www.facebook.com/marketplace/item/3"])
+        task = prefetch._prefetches["t3"]["https://www.facebook.com/marketplace/item/3"]
+        await asyncio.sleep(0.01)
+        prefetch.start_prefetch("t4", pool, [])
+        assert "t3" not in prefetch._prefetches and "t3" not in prefetch._started_at
+        await asyncio.gather(task, return_exceptions=True)
+        assert task.cancelled()
+
+    asyncio.run(run())
@@ -0,0 +1,23 @@
+from backend.agent.ranking import dedupe
+from backend.search.types import Listing
+
+
+def test_same_title_with_distinct_urls_is_not_merged():
+    picks = [
+        Listing(title="IKEA Malm queen bed frame", url="https://www.facebook.com/marketplace/item/111/"),
+        Listing(title="IKEA Malm queen bed frame", url="https://www.facebook.com/marketplace/item/222/"),
+    ]
+    unique, mapping = dedupe(picks)
+    assert len(unique) == 2 and mapping == [0, 1]
+
+
+def test_fuzzy_title_merges_only_when_a_url_is_missing():
+    picks = [
+        Listing(title="IKEA Malm queen bed frame", url="https://www.facebook.com/marketplace/item/111/?ref=search"),
+        Listing(title="Ikea MALM queen bed frame!", price=120),
+        Listing(title="Ikea Malm queen bed frame", url="https://www.facebook.com/marketplace/item/333"),
+        Listing(title="Bed frame", url="https://facebook.com/marketplace/item/111"),
+    ]
+    unique, mapping = dedupe(picks)
+    assert mapping == [0, 0, 1, 0]
+    assert unique[0].price == 120
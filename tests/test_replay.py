@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from backend import replay
+
+URL = "http://localhost:3001/sse"
+SEARCH = "https://www.facebook.com/marketplace/brisbane/search?query=bed+frame"
+
+
+def _use_cassette(monkeypatch, mode: str, name: str):
+    monkeypatch.setenv("ROOMIE_REPLAY_MODE", mode)
+    monkeypatch.setenv("ROOMIE_CASSETTE", name)
+    monkeypatch.setattr(replay, "_cassette", None)
+
+
+class FakeTool:
+    def __init__(self, name, result):
+        self.name = name
+        self.calls = []
+
+        async def call(**kwargs):
+            self.calls.append(kwargs)
+            return result
+
+        self.coroutine = call
+
+
+def test_replay_serves_model_and_tool_from_cassette(monkeypatch):
+    from langchain_core.messages import HumanMessage
+
+    _use_cassette(monkeypatch, "replay", "smoke.json")
+
+    async def run():
+        (navigate,) = replay.replay_tools(URL)
+        snapshot = await navigate.ainvoke({"url": SEARCH})
+        model = replay.wrap_model(object(), "worker")  # never called in replay
+        reply = await model.ainvoke([HumanMessage(content="Find me a bed frame")])
+        return snapshot, reply
+
+    snapshot, reply = asyncio.run(run())
+    assert "Queen bed frame $120" in snapshot
+    assert reply.content == "Searching Marketplace for bed frames."
+
+
+def test_replay_miss_raises(monkeypatch):
+    _use_cassette(monkeypatch, "replay", "smoke.json")
+    (navigate,) = replay.replay_tools(URL)
+
+    async def run():
+        await navigate.ainvoke({"url": SEARCH})
+        await navigate.ainvoke({"url": SEARCH})  # only one navigate was recorded
+
+    with pytest.raises(replay.CassetteMiss):
+        asyncio.run(run())
+
+
+def test_record_never_writes_private_calls(monkeypatch, tmp_path):
+    path = tmp_path / "recorded.json"
+    _use_cassette(monkeypatch, "record", str(path))
+
+    navigate = replay.wrap_tool(FakeTool("browser_navigate", "search results"))
+    typing = replay.wrap_tool(FakeTool("browser_type", "### Ran Playwright code\nfill('hunter2')"))
+    run_code = replay.wrap_tool(FakeTool("browser_run_code", '{"cookies": [{"name": "xs"}]}'))
+
+    async def run():
+        await navigate.coroutine(url=SEARCH)
+        with replay.private():
+            await typing.coroutine(ref="e2", text="hunter2")
+        await run_code.coroutine(code="async (page) => await page.context().storageState()")
+
+    asyncio.run(run())
+    replay.get_cassette().save()
+
+    text = path.read_text()
+    assert [i["channel"] for i in json.loads(text)["interactions"]] == ["tool:browser_navigate"]
+    assert "hunter2" not in text and "cookies" not in text
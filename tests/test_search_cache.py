@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from backend.search import cache
+from backend.search.types import Listing
+
+
+def test_queued_search_is_cancelled_not_awaited():
+    async def run():
+        never = asyncio.Event()
+        queued = asyncio.create_task(never.wait())
+        cache.put_pending("t1", "Sofas", queued)
+        assert await cache.get("t1", "Sofas", wait=90) is None
+        await asyncio.sleep(0)
+        assert queued.cancelled()
+        assert not cache.has("t1", "Sofas")
+
+    asyncio.run(run())
+
+
+def test_running_search_is_awaited_and_scoped_to_its_thread():
+    async def run():
+        async def search():
+            await asyncio.sleep(0.01)
+            return [Listing(title="Grey 3-seater")]
+
+        cache.put_pending("t1", "Sofas", asyncio.create_task(search()))
+        cache.mark_started("t1", "Sofas")
+        assert await cache.get("t2", "Sofas", wait=1) is None
+        assert await cache.get("t1", "Sofas", wait=1) == [Listing(title="Grey 3-seater")]
+
+    asyncio.run(run())
+
+
+def test_new_searches_sweep_expired_entries(monkeypatch):
+    async def run():
+        done = asyncio.get_running_loop().create_future()
+        done.set_result([])
+        cache.put_pending("t1", "Sofas", done)
+        later = time.monotonic() + cache.SEARCH_CACHE_TTL + 1
+        monkeypatch.setattr(cache.time, "monotonic", lambda: later)
+        cache.put_pending("t2", "Rugs", done)
+        assert cache.cache_key("t1", "Sofas") not in cache._entries
+        assert cache.cache_key("t2", "Rugs") in cache._entries
+
+    asyncio.run(run())
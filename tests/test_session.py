@@ -0,0 +1,60 @@
+import asyncio
+import json
+import stat
+
+from backend.browser import session
+from backend.browser.pool import BrowserSlot
+
+
+def test_storage_state_is_never_world_readable(monkeypatch, tmp_path):
+    monkeypatch.setattr(session, "SESSION_DIR", tmp_path)
+    slot = BrowserSlot(name="A", url="http://localhost:3001/sse", tools=[])
+
+    async def storage_state(slot, code):
+        return '### Result\n{"cookies": [{"name": "xs", "value": "secret"}]}'
+
+    monkeypatch.setattr(session, "_run_code", storage_state)
+    path = session._state_path(slot)
+    path.write_text("{}")
+    path.chmod(0o644)
+    path.with_suffix(".tmp").write_text("")  # leftover from a crash, default mode
+
+    asyncio.run(session.save_storage_state(slot))
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert json.loads(path.read_text())["cookies"][0]["value"] == "secret"
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_failed_login_backs_off_instead_of_retrying_every_lease(monkeypatch):
+    monkeypatch.setenv("FB_EMAIL", "me@example.com")
+    monkeypatch.setenv("FB_PASSWORD", "hunter2")
+    monkeypatch.setattr(session, "_restored", {"http://localhost:3001/sse"})
+    monkeypatch.setattr(session, "_verified_at", {})
+    monkeypatch.setattr(session, "_login_failures", {})
+    slot = BrowserSlot(name="A", url="http://localhost:3001/sse", tools=[])
+    attempts = []
+
+    async def call(tool, args=None):
+        return "- Page URL: https://www.facebook.com/login\n- textbox \"Password\" [ref=e2]"
+
+    async def login(slot):
+        attempts.append(slot.name)
+        return False
+
+    monkeypatch.setattr(slot, "call", call)
+    monkeypatch.setattr(session, "login", login)
+
+    async def leases(n):
+        for _ in range(n):
+            await session.ensure_logged_in(slot)
+
+    asyncio.run(leases(3))
+    assert attempts == ["A"]
+    first = session.login_backoff_remaining(slot.url)
+    assert 0 < first <= session.LOGIN_BACKOFF_SECONDS
+
+    session._login_failures[slot.url] = (1, 0.0)  # the first backoff has run out
+    asyncio.run(leases(2))
+    assert attempts == ["A", "A"]
+    assert session.login_backoff_remaining(slot.url) > first  # doubled
@@ -0,0 +1,52 @@
+import asyncio
+
+from backend.browser import snapshot_cache
+
+SEARCH = "https://www.facebook.com/marketplace/brisbane/search?query=kallax"
+
+
+class FakeTool:
+    def __init__(self, name, browser, log):
+        self.name = name
+
+        async def call(**kwargs):
+            log.append((browser, name, kwargs))
+            return f'{browser} {name}\n- link "IKEA Kallax shelf $40" [ref={browser}1]'
+
+        self.coroutine = call
+
+
+def _browser(name, log):
+    tools = [FakeTool(n, name, log) for n in ("browser_navigate", "browser_snapshot", "browser_press_key", "browser_click")]
+    return {t.name: t.coroutine for t in snapshot_cache.wrap_tools(tools, name)}
+
+
+def test_click_on_cached_refs_returns_a_real_snapshot(monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "cache", snapshot_cache.SnapshotCache(60, 16))
+    log = []
+    a, b = _browser("A", log), _browser("B", log)
+
+    async def run():
+        await a["browser_navigate"](url=SEARCH)
+        await a["browser_snapshot"]()
+        log.clear()
+
+        await b["browser_navigate"](url=SEARCH)
+        cached = await b["browser_snapshot"]()
+        assert "ref=A1" in cached and log == []  # served from A's results
+
+        result = await b["browser_click"](ref="A1")
+        assert snapshot_cache.STALE_REFS_NOTE in result and "ref=B1" in result
+        assert [call[1] for call in log] == ["browser_navigate", "browser_snapshot"]  # no click
+
+        log.clear()
+        await b["browser_click"](ref="B1")  # refs are real now
+        assert [call[1] for call in log] == ["browser_click"]
+
+    asyncio.run(run())
+
+
+def test_normalize_url_ignores_tracking_and_order():
+    assert snapshot_cache.normalize_url(SEARCH + "&utm_source=x") == snapshot_cache.normalize_url(
+        "https://m.facebook.com/marketplace/brisbane/search/?query=kallax"
+    )
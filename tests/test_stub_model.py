@@ -0,0 +1,37 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+from backend.bench.stub_model import StubChatModel
+from backend.browser import fake_marketplace
+
+
+class _Tool:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_search_worker_reads_picks_off_the_fake_marketplace():
+    model = StubChatModel().bind_tools([_Tool("browser_navigate"), _Tool("browser_snapshot")])
+    messages = [
+        SystemMessage(content="### Task 1: sofa\n- **Style**: \n- **Max Budget**: $300 AUD\n"),
+        HumanMessage(content="Search now."),
+    ]
+
+    async def run():
+        navigate = await model.ainvoke(messages)
+        (call,) = navigate.tool_calls
+        assert call["name"] == "browser_navigate" and "query=sofa" in call["args"]["url"]
+        tab = fake_marketplace.Tab()
+        tab.goto(call["args"]["url"])
+        page = fake_marketplace.page_state(tab)
+        messages.extend([navigate, ToolMessage(page, tool_call_id=call["id"], name="browser_navigate")])
+
+        snapshot = await model.ainvoke(messages)
+        (call,) = snapshot.tool_calls
+        messages.extend([snapshot, ToolMessage(page, tool_call_id=call["id"], name="browser_snapshot")])
+        return await model.ainvoke(messages)
+
+    done = asyncio.run(run())
+    assert not done.tool_calls and "[WORKER_RESULTS]" in done.content
+    assert "facebook.com/marketplace/item/" in done.content
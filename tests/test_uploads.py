@@ -0,0 +1,64 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+
+from backend.api import uploads
+
+
+async def _chunks(n: int, size: int):
+    for _ in range(n):
+        yield b"x" * size
+
+
+def test_spool_stops_reading_past_the_cap():
+    with pytest.raises(uploads.UploadTooLarge):
+        asyncio.run(uploads.spool(_chunks(10, 1024), max_bytes=4096))
+
+
+def test_decompression_bomb_is_too_large(monkeypatch, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 100)
+    png = io.BytesIO()
+    Image.new("RGB", (64, 64)).save(png, "PNG")
+    png.seek(0)
+    with pytest.raises(uploads.UploadTooLarge):
+        uploads._store_image(png)
+
+
+def test_corrupt_image_is_invalid(monkeypatch, tmp_path):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    with pytest.raises(uploads.InvalidImage):
+        uploads._store_image(io.BytesIO(b"\x89PNG\r\n\x1a\n" + b"\0" * 64))
+
+
+def test_spool_rolls_over_to_disk_past_the_memory_limit():
+    f = asyncio.run(uploads.spool(_chunks(3, uploads.SPOOL_MAX_MEMORY // 2)))
+    try:
+        assert f.read() == b"x" * (3 * (uploads.SPOOL_MAX_MEMORY // 2))
+    finally:
+        f.close()
+
+
+def test_failed_image_leaves_no_tmp_file(monkeypatch, tmp_path):
+    pytest.importorskip("PIL")
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    with pytest.raises(uploads.InvalidImage):
+        uploads._store_image(io.BytesIO(b"not an image"))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prune_removes_stale_tmp_files(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(uploads, "_last_prune", 0.0)
+    stale, fresh = tmp_path / "a.tmp", tmp_path / "b.jpg"
+    stale.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    old = time.time() - uploads.UPLOAD_TTL_HOURS * 3600 - 60
+    os.utime(stale, (old, old))
+    uploads._prune()
+    assert not stale.exists() and fresh.exists()